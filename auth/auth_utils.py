@@ -3,8 +3,8 @@ import bcrypt
 from datetime import datetime
 from auth.password_validator import PasswordValidator
 
-def init_db():
-    with sqlite3.connect("users.db") as conn:
+def init_db(db_path="users.db"):
+    with sqlite3.connect(db_path) as conn:
         cursor = conn.cursor()
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS users (
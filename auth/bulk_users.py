@@ -0,0 +1,257 @@
+"""
+Bulk user import/export for users.db
+
+Streams users from CSV or JSONL, hashes passwords in parallel worker processes
+and inserts them with executemany inside chunked transactions. Exports stream
+users back out as JSONL.
+
+Usage:
+    python -m auth.bulk_users import users.csv [--workers 8] [--chunk-size 500] [--validate]
+    python -m auth.bulk_users export users.jsonl [--include-hashes]
+
+Input columns / keys: name, email, password (plain text, optional),
+password_hash (pre-hashed bcrypt, optional), provider, provider_id,
+profile_picture, verified
+"""
+
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO
+
+import bcrypt
+
+from auth.auth_utils import init_db
+from auth.password_validator import PasswordValidator
+
+DEFAULT_DB = "users.db"
+DEFAULT_CHUNK_SIZE = 500
+BCRYPT_ROUNDS = 12  # bcrypt.gensalt() default, same cost as auth_utils.hash_password
+
+EXPORT_COLUMNS = ["id", "name", "email", "updated_at", "provider", "provider_id", "profile_picture", "verified"]
+
+
+def _hash_password(password: str, rounds: int = BCRYPT_ROUNDS) -> str:
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds)).decode()
+
+
+def _hash_chunk(passwords: List[str], rounds: int) -> List[str]:
+    """Worker entry point: hash a slice of passwords in one task to limit IPC"""
+    return [_hash_password(p, rounds) for p in passwords]
+
+
+def _parse_bool(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value or "").strip().lower() in ("1", "true", "yes", "y")
+
+
+def read_users(path: str) -> Iterator[Dict[str, Any]]:
+    """Stream user records from a .csv or .jsonl file (use '-' for JSONL on stdin)"""
+    if path == "-":
+        yield from _read_jsonl(sys.stdin)
+        return
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.lower().endswith(".csv"):
+            yield from csv.DictReader(f)
+        else:
+            yield from _read_jsonl(f)
+
+
+def _read_jsonl(f: TextIO) -> Iterator[Dict[str, Any]]:
+    for line in f:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def _chunks(iterable: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _hash_passwords(pool: Optional[ProcessPoolExecutor], passwords: List[str],
+                    workers: int, rounds: int) -> List[str]:
+    if not passwords:
+        return []
+    if pool is None:
+        return _hash_chunk(passwords, rounds)
+    # One task per worker keeps every core busy with minimal pickling overhead
+    step = max(1, -(-len(passwords) // workers))
+    slices = [passwords[i:i + step] for i in range(0, len(passwords), step)]
+    hashed: List[str] = []
+    for part in pool.map(_hash_chunk, slices, [rounds] * len(slices)):
+        hashed.extend(part)
+    return hashed
+
+
+def import_users(path: str, db_path: str = DEFAULT_DB, workers: Optional[int] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, validate: bool = False,
+                 rounds: int = BCRYPT_ROUNDS) -> Dict[str, Any]:
+    """
+    Import users from a CSV/JSONL file
+
+    Args:
+        path: Input file (.csv, otherwise JSONL; '-' reads JSONL from stdin)
+        db_path: SQLite database to insert into
+        workers: Hashing processes (defaults to the CPU count; 1 hashes in-process)
+        chunk_size: Rows per hashing batch and per transaction
+        validate: Skip rows whose password fails PasswordValidator.validate_password
+        rounds: bcrypt cost factor
+
+    Returns:
+        Dictionary with counts (read, inserted, duplicates, invalid) and throughput
+    """
+    workers = workers or os.cpu_count() or 1
+    init_db(db_path)
+    stats = {"read": 0, "inserted": 0, "duplicates": 0, "invalid": 0, "hashed": 0}
+    start = time.perf_counter()
+
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            for chunk in _chunks(read_users(path), chunk_size):
+                stats["read"] += len(chunk)
+                rows = [r for r in chunk if (r.get("email") or "").strip()]
+                stats["invalid"] += len(chunk) - len(rows)
+
+                # Drop emails that already exist (or repeat within the chunk) before
+                # paying for a bcrypt hash
+                emails = list({r["email"].strip() for r in rows})
+                placeholders = ", ".join("?" * len(emails))
+                seen = {e for (e,) in conn.execute(
+                    f"SELECT email FROM users WHERE email IN ({placeholders})", emails
+                )} if emails else set()
+                unique = []
+                for r in rows:
+                    email = r["email"].strip()
+                    if email in seen:
+                        stats["duplicates"] += 1
+                    else:
+                        seen.add(email)
+                        unique.append(r)
+                rows = unique
+
+                if validate:
+                    checks = PasswordValidator.validate_many(r["password"] for r in rows if r.get("password"))
+                    verdicts = iter(checks)
+                    kept = []
+                    for r in rows:
+                        if r.get("password") and not next(verdicts)[0]:
+                            stats["invalid"] += 1
+                        else:
+                            kept.append(r)
+                    rows = kept
+
+                to_hash = [r for r in rows if r.get("password") and not r.get("password_hash")]
+                hashes = _hash_passwords(pool, [r["password"] for r in to_hash], workers, rounds)
+                for r, hashed in zip(to_hash, hashes):
+                    r["password_hash"] = hashed
+                stats["hashed"] += len(hashes)
+
+                now = datetime.now().isoformat()
+                params = [(
+                    (r.get("name") or r["email"].split("@")[0]).strip(),
+                    r["email"].strip(),
+                    r.get("password_hash") or None,
+                    now,
+                    r.get("provider") or "email",
+                    r.get("provider_id") or None,
+                    r.get("profile_picture") or None,
+                    _parse_bool(r.get("verified")),
+                ) for r in rows]
+
+                before = conn.total_changes
+                conn.executemany("""
+                    INSERT OR IGNORE INTO users (name, email, password, updated_at, provider, provider_id, profile_picture, verified)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, params)
+                conn.commit()
+                inserted = conn.total_changes - before
+                stats["inserted"] += inserted
+                stats["duplicates"] += len(params) - inserted
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    elapsed = time.perf_counter() - start
+    stats["seconds"] = round(elapsed, 3)
+    stats["rows_per_second"] = round(stats["read"] / elapsed, 1) if elapsed else 0.0
+    stats["hashes_per_second"] = round(stats["hashed"] / elapsed, 1) if elapsed else 0.0
+    return stats
+
+
+def export_users(out: TextIO, db_path: str = DEFAULT_DB, include_hashes: bool = False,
+                 batch_size: int = 1000) -> int:
+    """Stream every user as one JSON object per line; returns the number written"""
+    columns = EXPORT_COLUMNS + (["password"] if include_hashes else [])
+    count = 0
+    with sqlite3.connect(db_path) as conn:
+        cursor = conn.execute(f"SELECT {', '.join(columns)} FROM users ORDER BY id")
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                record = dict(zip(columns, row))
+                record["verified"] = bool(record["verified"])
+                if include_hashes:
+                    record["password_hash"] = record.pop("password")
+                out.write(json.dumps(record) + "\n")
+            count += len(rows)
+    return count
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk import/export TalkHeal users")
+    parser.add_argument("--db", default=DEFAULT_DB, help="SQLite database (default: users.db)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    imp = sub.add_parser("import", help="Import users from a CSV or JSONL file")
+    imp.add_argument("path", help="Input .csv or .jsonl file, or '-' for JSONL on stdin")
+    imp.add_argument("--workers", type=int, default=None, help="Hashing processes (default: CPU count)")
+    imp.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per transaction")
+    imp.add_argument("--validate", action="store_true", help="Skip rows with weak passwords")
+    imp.add_argument("--rounds", type=int, default=BCRYPT_ROUNDS, help="bcrypt cost factor")
+
+    exp = sub.add_parser("export", help="Export users as JSONL")
+    exp.add_argument("path", help="Output .jsonl file, or '-' for stdout")
+    exp.add_argument("--include-hashes", action="store_true", help="Include bcrypt password hashes")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "import":
+        stats = import_users(args.path, db_path=args.db, workers=args.workers,
+                             chunk_size=args.chunk_size, validate=args.validate, rounds=args.rounds)
+        print(f"✅ Imported {stats['inserted']} users "
+              f"({stats['duplicates']} duplicates, {stats['invalid']} invalid) "
+              f"in {stats['seconds']}s")
+        print(f"📊 {stats['rows_per_second']} rows/s, {stats['hashes_per_second']} bcrypt hashes/s")
+        return 0
+
+    start = time.perf_counter()
+    if args.path == "-":
+        count = export_users(sys.stdout, db_path=args.db, include_hashes=args.include_hashes)
+    else:
+        with open(args.path, "w", encoding="utf-8") as f:
+            count = export_users(f, db_path=args.db, include_hashes=args.include_hashes)
+    elapsed = time.perf_counter() - start
+    print(f"✅ Exported {count} users in {elapsed:.2f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
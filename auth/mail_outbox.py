@@ -0,0 +1,292 @@
+"""
+Persistent outbound email queue for TalkHeal
+Messages are written to a SQLite outbox and delivered by a background sender
+that keeps one authenticated SMTP connection open across messages, retries
+failures with exponential backoff and rate-limits delivery.
+"""
+
+import os
+import smtplib
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from email.message import EmailMessage
+from typing import Any, Dict, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+OUTBOX_DB = os.getenv("MAIL_OUTBOX_DB", "outbox.db")
+
+SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "465"))
+SMTP_USE_SSL = os.getenv("SMTP_USE_SSL", "1") not in ("0", "false", "False")
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", "15"))
+
+MAX_ATTEMPTS = int(os.getenv("MAIL_MAX_ATTEMPTS", "5"))
+BACKOFF_BASE_SECONDS = float(os.getenv("MAIL_BACKOFF_BASE_SECONDS", "5"))
+BACKOFF_MAX_SECONDS = float(os.getenv("MAIL_BACKOFF_MAX_SECONDS", "600"))
+RATE_PER_MINUTE = float(os.getenv("MAIL_RATE_PER_MINUTE", "30"))
+IDLE_DISCONNECT_SECONDS = float(os.getenv("MAIL_IDLE_DISCONNECT_SECONDS", "60"))
+# A message claimed by a sender that died mid-delivery is picked up again after this
+CLAIM_TIMEOUT_SECONDS = float(os.getenv("MAIL_CLAIM_TIMEOUT_SECONDS", "300"))
+
+_initialized_paths = set()
+
+
+def init_outbox(db_path: str = OUTBOX_DB) -> None:
+    """Create the outbox table and its due-message index (once per process and path)"""
+    if db_path in _initialized_paths and os.path.exists(db_path):
+        return
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                to_email TEXT NOT NULL,
+                subject TEXT NOT NULL,
+                body TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL,
+                last_error TEXT,
+                created_at TEXT NOT NULL,
+                sent_at TEXT
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox (status, next_attempt_at)")
+        conn.commit()
+    _initialized_paths.add(db_path)
+
+
+def enqueue_email(to_email: str, subject: str, body: str, db_path: str = OUTBOX_DB) -> int:
+    """Persist a message for delivery and return its outbox id"""
+    init_outbox(db_path)
+    with sqlite3.connect(db_path) as conn:
+        cursor = conn.execute("""
+            INSERT INTO outbox (to_email, subject, body, next_attempt_at, created_at)
+            VALUES (?, ?, ?, ?, ?)
+        """, (to_email, subject, body, time.time(), datetime.now().isoformat()))
+        conn.commit()
+        return cursor.lastrowid
+
+
+def outbox_stats(db_path: str = OUTBOX_DB) -> Dict[str, int]:
+    """Return the number of messages per status"""
+    init_outbox(db_path)
+    with sqlite3.connect(db_path) as conn:
+        rows = conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall()
+    return dict(rows)
+
+
+def message_status(msg_id: int, db_path: str = OUTBOX_DB) -> Optional[Dict[str, Any]]:
+    """Delivery state of one message: status, attempts and last_error (None for unknown ids)"""
+    init_outbox(db_path)
+    with sqlite3.connect(db_path) as conn:
+        row = conn.execute("SELECT status, attempts, last_error FROM outbox WHERE id = ?", (msg_id,)).fetchone()
+    return None if row is None else {"status": row[0], "attempts": row[1], "last_error": row[2]}
+
+
+def _is_permanent(error: Exception) -> bool:
+    """5xx replies will not go away by retrying the same message; 4xx and network errors might"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 500 <= error.smtp_code < 600
+    return False
+
+
+class MailSender:
+    """Delivers queued messages over a single reused SMTP connection"""
+
+    def __init__(self, db_path: str = OUTBOX_DB, host: str = SMTP_HOST, port: int = SMTP_PORT,
+                 username: Optional[str] = None, password: Optional[str] = None,
+                 use_ssl: bool = SMTP_USE_SSL, from_address: Optional[str] = None,
+                 rate_per_minute: float = RATE_PER_MINUTE, max_attempts: int = MAX_ATTEMPTS,
+                 backoff_base: float = BACKOFF_BASE_SECONDS, poll_interval: float = 5.0):
+        self.db_path = db_path
+        self.host = host
+        self.port = port
+        self.username = username if username is not None else os.getenv("EMAIL_ADDRESS")
+        self.password = password if password is not None else os.getenv("EMAIL_PASSWORD")
+        self.use_ssl = use_ssl
+        self.from_address = from_address or self.username
+        self.min_interval = 60.0 / rate_per_minute if rate_per_minute else 0.0
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.poll_interval = poll_interval
+
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+        self._last_sent = 0.0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.connections_opened = 0
+
+        init_outbox(db_path)
+
+    # ---------- SMTP connection ----------
+
+    def _connect(self) -> smtplib.SMTP:
+        if self.use_ssl:
+            smtp = smtplib.SMTP_SSL(self.host, self.port, timeout=SMTP_TIMEOUT)
+        else:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=SMTP_TIMEOUT)
+        if self.username and self.password:
+            smtp.login(self.username, self.password)
+        self.connections_opened += 1
+        return smtp
+
+    def _disconnect(self) -> None:
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._smtp = None
+
+    def _send(self, msg: EmailMessage) -> None:
+        """Send on the open connection, reconnecting once if the server dropped it"""
+        reused = self._smtp is not None
+        if self._smtp is None:
+            self._smtp = self._connect()
+        try:
+            self._smtp.send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            self._smtp = None
+            if not reused:
+                raise
+            self._smtp = self._connect()
+            self._smtp.send_message(msg)
+        self._last_used = time.monotonic()
+
+    def _throttle(self) -> None:
+        wait = self._last_sent + self.min_interval - time.monotonic()
+        if wait > 0:
+            self._stop.wait(wait)
+        self._last_sent = time.monotonic()
+
+    # ---------- Queue processing ----------
+
+    def _build_message(self, to_email: str, subject: str, body: str) -> EmailMessage:
+        msg = EmailMessage()
+        msg['Subject'] = subject
+        msg['From'] = self.from_address
+        msg['To'] = to_email
+        msg.set_content(body)
+        return msg
+
+    def _next_due(self, conn: sqlite3.Connection):
+        # Stale 'sending' rows belong to a sender that stopped before finishing
+        return conn.execute("""
+            SELECT id, to_email, subject, body, attempts, status, next_attempt_at FROM outbox
+            WHERE status IN ('pending', 'sending') AND next_attempt_at <= ?
+            ORDER BY next_attempt_at, id LIMIT 1
+        """, (time.time(),)).fetchone()
+
+    def _claim(self, conn: sqlite3.Connection, msg_id: int, status: str, due: float) -> bool:
+        """Mark a message as being sent, unless another sender changed it since it was read"""
+        cursor = conn.execute("""
+            UPDATE outbox SET status = 'sending', next_attempt_at = ?
+            WHERE id = ? AND status = ? AND next_attempt_at = ?
+        """, (time.time() + CLAIM_TIMEOUT_SECONDS, msg_id, status, due))
+        conn.commit()
+        return cursor.rowcount == 1
+
+    def process_pending(self) -> int:
+        """Deliver every message that is currently due; returns the number sent"""
+        sent = 0
+        with sqlite3.connect(self.db_path) as conn:
+            # WAL keeps this durable across crashes; only power loss can drop the last commits
+            conn.execute("PRAGMA synchronous=NORMAL")
+            while not self._stop.is_set():
+                row = self._next_due(conn)
+                if row is None:
+                    break
+                msg_id, to_email, subject, body, attempts, status, due = row
+                if not self._claim(conn, msg_id, status, due):
+                    continue  # Another process is delivering it
+
+                self._throttle()
+                try:
+                    self._send(self._build_message(to_email, subject, body))
+                except Exception as e:
+                    permanent = _is_permanent(e)
+                    if not permanent:
+                        self._disconnect()
+                    attempts += 1
+                    if permanent or attempts >= self.max_attempts:
+                        print(f"Giving up on email {msg_id} to {to_email} after {attempts} attempt(s): {e}")
+                        conn.execute("""
+                            UPDATE outbox SET status = 'failed', attempts = ?, last_error = ? WHERE id = ?
+                        """, (attempts, str(e), msg_id))
+                    else:
+                        delay = min(self.backoff_base * 2 ** (attempts - 1), BACKOFF_MAX_SECONDS)
+                        print(f"Email {msg_id} to {to_email} failed (attempt {attempts}), retrying in {delay:.0f}s: {e}")
+                        conn.execute("""
+                            UPDATE outbox SET status = 'pending', attempts = ?, last_error = ?, next_attempt_at = ?
+                            WHERE id = ?
+                        """, (attempts, str(e), time.time() + delay, msg_id))
+                else:
+                    conn.execute("""
+                        UPDATE outbox SET status = 'sent', attempts = ?, last_error = NULL, sent_at = ? WHERE id = ?
+                    """, (attempts + 1, datetime.now().isoformat(), msg_id))
+                    sent += 1
+                conn.commit()
+        return sent
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.process_pending()
+            except sqlite3.Error:
+                pass
+            if self._smtp is not None and time.monotonic() - self._last_used > IDLE_DISCONNECT_SECONDS:
+                self._disconnect()
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+        self._disconnect()
+
+    # ---------- Lifecycle ----------
+
+    def start(self) -> "MailSender":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="mail-outbox-sender", daemon=True)
+            self._thread.start()
+        return self
+
+    def wake(self) -> None:
+        """Ask the sender to look at the queue now instead of at the next poll"""
+        self._wake.set()
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self._disconnect()
+
+
+_sender: Optional[MailSender] = None
+_sender_lock = threading.Lock()
+
+
+def get_sender() -> MailSender:
+    """Return the process-wide background sender, starting it on first use"""
+    global _sender
+    with _sender_lock:
+        if _sender is None:
+            _sender = MailSender()
+        return _sender.start()
+
+
+def queue_email(to_email: str, subject: str, body: str) -> int:
+    """Enqueue a message in the default outbox and wake the background sender"""
+    msg_id = enqueue_email(to_email, subject, body)
+    get_sender().wake()
+    return msg_id
@@ -1,7 +1,6 @@
-import smtplib
-from email.message import EmailMessage
 import os
 from dotenv import load_dotenv
+from auth.mail_outbox import queue_email
 
 load_dotenv()
 
@@ -13,20 +12,21 @@ BASE_URL = os.getenv("APP_BASE_URL", "http://localhost:8501")
 
 
 def send_reset_email(to_email, token):
+    """
+    Queue the reset email; the background outbox sender delivers it
+
+    Success means the message is in the outbox, not that it was delivered:
+    SMTP failures are retried, logged and recorded in the outbox (see
+    mail_outbox.message_status).
+    """
     reset_link = f"{BASE_URL}/reset?token={token}"
-    msg = EmailMessage()
-    msg['Subject'] = "TalkHeal Password Reset"
-    msg['From'] = EMAIL_ADDRESS
-    msg['To'] = to_email
-    msg.set_content(
+    body = (
         f"Use this link to reset your password:\n\n"
         f"{reset_link}\n\n"
         f"This link will expire in 15 mins."
     )
     try:
-        with smtplib.SMTP_SSL('smtp.gmail.com', 465) as smtp:
-            smtp.login(EMAIL_ADDRESS, EMAIL_PASSWORD)
-            smtp.send_message(msg)
-        return True, "Reset email sent successfully!"
+        queue_email(to_email, "TalkHeal Password Reset", body)
+        return True, "Reset email queued for delivery."
     except Exception as e:
         return False, str(e)
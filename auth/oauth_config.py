@@ -4,7 +4,7 @@ Supports Google, GitHub, and Microsoft OAuth providers
 """
 
 import os
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from dataclasses import dataclass
 
 @dataclass
@@ -17,6 +17,7 @@ class OAuthProvider:
     user_info_url: str
     scope: str
     redirect_uri: str
+    emails_url: Optional[str] = None
 
 class OAuthConfig:
     """OAuth configuration manager"""
@@ -50,7 +51,8 @@ class OAuthConfig:
                 token_url="https://github.com/login/oauth/access_token",
                 user_info_url="https://api.github.com/user",
                 scope="user:email",
-                redirect_uri=f"{self.base_redirect_uri}?provider=github"
+                redirect_uri=f"{self.base_redirect_uri}?provider=github",
+                emails_url="https://api.github.com/user/emails"
             )
         
         # Microsoft OAuth
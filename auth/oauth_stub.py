@@ -0,0 +1,141 @@
+"""
+Local stub OAuth provider for TalkHeal
+Serves token, user-info and GitHub-style email endpoints on 127.0.0.1 so the
+OAuth callback flow can be tested and benchmarked without network access.
+
+Usage:
+    with StubOAuthProvider() as stub:
+        oauth_config.providers["github"] = stub.as_provider("github")
+        ...
+"""
+
+import json
+import secrets
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qs
+
+from auth.oauth_config import OAuthProvider
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 so clients can keep connections alive between requests
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without TCP_NODELAY a kept-alive
+    # connection stalls on delayed ACKs
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):  # silence default stderr logging
+        pass
+
+    def _send_json(self, status: int, payload: Any) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _bearer_token(self) -> Optional[str]:
+        header = self.headers.get("Authorization", "")
+        return header[7:] if header.startswith("Bearer ") else None
+
+    def do_POST(self):
+        stub = self.server.stub
+        stub._record(self)
+        length = int(self.headers.get("Content-Length") or 0)
+        form = parse_qs(self.rfile.read(length).decode())
+        if self.path != "/token":
+            return self._send_json(404, {"error": "not_found"})
+
+        code = (form.get("code") or [None])[0]
+        if code is None or code in stub.used_codes:
+            return self._send_json(400, {"error": "invalid_grant"})
+        stub.used_codes.add(code)
+
+        access_token = secrets.token_urlsafe(24)
+        stub.tokens[access_token] = code
+        self._send_json(200, {"access_token": access_token, "token_type": "bearer", "expires_in": 3600})
+
+    def do_GET(self):
+        stub = self.server.stub
+        stub._record(self)
+        if self._bearer_token() not in stub.tokens:
+            return self._send_json(401, {"error": "invalid_token"})
+        if self.path == "/userinfo":
+            return self._send_json(200, stub.user)
+        if self.path == "/user/emails":
+            return self._send_json(200, stub.emails)
+        self._send_json(404, {"error": "not_found"})
+
+
+class StubOAuthProvider:
+    """In-process OAuth provider listening on an ephemeral localhost port"""
+
+    def __init__(self, user: Optional[Dict[str, Any]] = None, emails: Optional[list] = None):
+        self.user = user or {
+            "id": 4242,
+            "login": "stub-user",
+            "name": "Stub User",
+            "email": "stub.user@example.com",
+            "avatar_url": None,
+            "verified_email": True,
+        }
+        self.emails = emails if emails is not None else [
+            {"email": self.user.get("email") or "stub.user@example.com", "primary": True, "verified": True}
+        ]
+        self.used_codes = set()
+        self.tokens: Dict[str, str] = {}
+        self.request_counts: Dict[str, int] = {}
+        self.connections = set()
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _record(self, handler: BaseHTTPRequestHandler) -> None:
+        with self._lock:
+            self.request_counts[handler.path] = self.request_counts.get(handler.path, 0) + 1
+            self.connections.add(handler.client_address)
+
+    def start(self) -> "StubOAuthProvider":
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "StubOAuthProvider":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def issue_code(self) -> str:
+        """Return a fresh authorization code, as the provider would after consent"""
+        return secrets.token_urlsafe(16)
+
+    def as_provider(self, name: str = "github") -> OAuthProvider:
+        """Build an OAuthProvider config pointing at this stub"""
+        return OAuthProvider(
+            client_id="stub-client-id",
+            client_secret="stub-client-secret",
+            auth_url=f"{self.base_url}/authorize",
+            token_url=f"{self.base_url}/token",
+            user_info_url=f"{self.base_url}/userinfo",
+            scope="user:email",
+            redirect_uri=f"http://localhost:8501/oauth_callback?provider={name}",
+            emails_url=f"{self.base_url}/user/emails",
+        )
@@ -3,7 +3,6 @@ OAuth utility functions for TalkHeal
 Handles OAuth authentication flow and user data processing
 """
 
-import requests
 import streamlit as st
 from typing import Dict, Any, Optional, Tuple
 from datetime import datetime
@@ -11,6 +10,17 @@ import secrets
 import hashlib
 from auth.oauth_config import oauth_config
 from auth.auth_utils import init_db, register_user, authenticate_user, get_user_by_email
+from auth.http_client import get_http_session
+from core.ttl_cache import TTLCache
+
+# Normalized user-info responses, keyed by (provider, access token digest).
+# A Streamlit rerun during the callback must not cost another provider round trip.
+USER_INFO_TTL_SECONDS = 120
+_user_info_cache = TTLCache(ttl=USER_INFO_TTL_SECONDS, maxsize=512)
+
+def _token_digest(access_token: str) -> str:
+    """Hash access tokens so they are never kept in memory as cache keys"""
+    return hashlib.sha256(access_token.encode()).hexdigest()
 
 def generate_state() -> str:
     """Generate a secure random state for OAuth flow"""
@@ -63,7 +73,7 @@ def exchange_code_for_token(provider_name: str, code: str) -> Optional[Dict[str,
             "User-Agent": "TalkHeal-OAuth/1.0"
         }
         
-        response = requests.post(provider.token_url, data=data, headers=headers)
+        response = get_http_session().post(provider.token_url, data=data, headers=headers)
         response.raise_for_status()
         
         return response.json()
@@ -77,25 +87,32 @@ def get_user_info(provider_name: str, access_token: str) -> Optional[Dict[str, A
     try:
         provider = oauth_config.get_provider(provider_name)
         
+        cache_key = (provider_name, _token_digest(access_token))
+        cached = _user_info_cache.get(cache_key)
+        if cached is not None:
+            return dict(cached)
+        
         headers = {
             "Authorization": f"Bearer {access_token}",
             "Accept": "application/json",
             "User-Agent": "TalkHeal-OAuth/1.0"
         }
         
-        response = requests.get(provider.user_info_url, headers=headers)
+        response = get_http_session().get(provider.user_info_url, headers=headers)
         response.raise_for_status()
         
         user_data = response.json()
         
         # Normalize user data across providers
-        return normalize_user_data(provider_name, user_data)
+        normalized = normalize_user_data(provider_name, user_data, access_token)
+        _user_info_cache.set(cache_key, normalized)
+        return dict(normalized)
     
     except Exception as e:
         st.error(f"Error fetching user info: {str(e)}")
         return None
 
-def normalize_user_data(provider_name: str, user_data: Dict[str, Any]) -> Dict[str, Any]:
+def normalize_user_data(provider_name: str, user_data: Dict[str, Any], access_token: Optional[str] = None) -> Dict[str, Any]:
     """Normalize user data from different OAuth providers"""
     normalized = {
         "provider": provider_name,
@@ -124,12 +141,13 @@ def normalize_user_data(provider_name: str, user_data: Dict[str, Any]) -> Dict[s
             "verified": True  # GitHub emails are verified by default
         })
         
-        if not normalized["email"]:
+        if not normalized["email"] and access_token:
             # Try to get email from GitHub API
             try:
-                email_response = requests.get(
-                    "https://api.github.com/user/emails",
-                    headers={"Authorization": f"Bearer {access_token}"}
+                emails_url = oauth_config.get_provider(provider_name).emails_url
+                email_response = get_http_session().get(
+                    emails_url,
+                    headers={"Authorization": f"Bearer {access_token}", "Accept": "application/json"}
                 )
                 if email_response.status_code == 200:
                     emails = email_response.json()
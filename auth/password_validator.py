@@ -4,7 +4,8 @@ Implements NIST SP 800-63B password guidelines and strength calculation
 """
 
 import re
-from typing import Tuple, Dict, List
+import unicodedata
+from typing import Tuple, Dict, List, Iterable
 import os
 
 class PasswordValidator:
@@ -40,6 +41,89 @@ class PasswordValidator:
         '1234567890', 'abcdefgh', '12345', 'qwert', 'yuiop'
     ]
 
+    # Character classes used by the single-pass scanner
+    UPPERCASE_CHARS = frozenset('ABCDEFGHIJKLMNOPQRSTUVWXYZ')
+    LOWERCASE_CHARS = frozenset('abcdefghijklmnopqrstuvwxyz')
+    DIGIT_CHARS = frozenset('0123456789')
+    SPECIAL_CHARS = frozenset('!@#$%^&*()_+-=[]{};:\'",.<>?/\\|`~')
+
+    # Keyboard patterns and their reverses folded into one alternation, so the
+    # pattern check is a single scan of the lowered password
+    _KEYBOARD_RE = re.compile('|'.join(
+        re.escape(pattern)
+        for pattern in sorted({p for base in KEYBOARD_PATTERNS for p in (base, base[::-1])}, key=len)
+    ))
+
+    @staticmethod
+    def _scan(password: str, min_sequence: int = 4, max_repeat: int = 3) -> Dict[str, bool]:
+        """
+        Walk the password once and collect every character-class and pattern check
+
+        Args:
+            password: Password string to analyze
+            min_sequence: Length of a run of consecutive characters that counts as sequential
+            max_repeat: Length of a run of identical characters that counts as repeated
+
+        Returns:
+            Dictionary of raw scan results (uppercase, lowercase, digit, special,
+            letter, sequential, repeated, keyboard_pattern)
+        """
+        lowered = password.lower()
+        chars = set(password)
+        digits = PasswordValidator.DIGIT_CHARS
+        letters = PasswordValidator.LOWERCASE_CHARS
+
+        sequential = repeated = False
+        ascending = descending = repeat = 1
+        prev_char = None
+        prev_code = prev_kind = 0
+
+        for char, lower in zip(password, lowered):
+            # Repeated characters are case sensitive (aaaa, 1111)
+            if char == prev_char:
+                repeat += 1
+                if repeat >= max_repeat:
+                    repeated = True
+            else:
+                repeat = 1
+
+            # Sequential runs only count inside all-digit or all-letter stretches;
+            # digits compare by numeric value, letters by code point
+            if lower in digits:
+                kind, code = 1, ord(lower) - 48
+            elif lower in letters:
+                kind, code = 2, ord(lower)
+            elif lower.isdigit():
+                kind, code = 1, unicodedata.digit(lower, -2)
+            elif lower.isalpha():
+                kind, code = 2, ord(lower)
+            else:
+                kind, code = 0, 0
+
+            if kind and kind == prev_kind:
+                step = code - prev_code
+                ascending = ascending + 1 if step == 1 else 1
+                descending = descending + 1 if step == -1 else 1
+                if ascending >= min_sequence or descending >= min_sequence:
+                    sequential = True
+            else:
+                ascending = descending = 1
+
+            prev_char, prev_code, prev_kind = char, code, kind
+
+        has_upper = not PasswordValidator.UPPERCASE_CHARS.isdisjoint(chars)
+        has_lower = not letters.isdisjoint(chars)
+        return {
+            'uppercase': has_upper,
+            'lowercase': has_lower,
+            'digit': not digits.isdisjoint(chars),
+            'special': not PasswordValidator.SPECIAL_CHARS.isdisjoint(chars),
+            'letter': has_upper or has_lower,
+            'sequential': sequential,
+            'repeated': repeated,
+            'keyboard_pattern': PasswordValidator._KEYBOARD_RE.search(lowered) is not None,
+        }
+
     @staticmethod
     def calculate_strength(password: str) -> Dict[str, any]:
         """
@@ -55,17 +139,18 @@ class PasswordValidator:
                 - feedback: List[str] - suggestions for improvement
                 - checks: Dict - individual requirement checks
         """
+        scan = PasswordValidator._scan(password)
         checks = {
             'length': len(password) >= PasswordValidator.MIN_LENGTH,
             'max_length': len(password) <= PasswordValidator.MAX_LENGTH,
-            'uppercase': bool(re.search(r'[A-Z]', password)),
-            'lowercase': bool(re.search(r'[a-z]', password)),
-            'digit': bool(re.search(r'[0-9]', password)),
-            'special': bool(re.search(r'[!@#$%^&*()_+\-=\[\]{};:\'",.<>?/\\|`~]', password)),
+            'uppercase': scan['uppercase'],
+            'lowercase': scan['lowercase'],
+            'digit': scan['digit'],
+            'special': scan['special'],
             'not_common': password.lower() not in PasswordValidator.COMMON_PASSWORDS,
-            'no_sequential': not PasswordValidator._has_sequential_chars(password),
-            'no_repeated': not PasswordValidator._has_repeated_chars(password),
-            'no_keyboard_pattern': not PasswordValidator._has_keyboard_pattern(password)
+            'no_sequential': not scan['sequential'],
+            'no_repeated': not scan['repeated'],
+            'no_keyboard_pattern': not scan['keyboard_pattern']
         }
 
         # Calculate score (0-100)
@@ -144,8 +229,10 @@ class PasswordValidator:
         if len(password) > PasswordValidator.MAX_LENGTH:
             return False, f"Password must not exceed {PasswordValidator.MAX_LENGTH} characters"
 
+        scan = PasswordValidator._scan(password)
+
         # Check for at least one letter
-        if not re.search(r'[A-Za-z]', password):
+        if not scan['letter']:
             return False, "Password must contain at least one letter"
 
         # Check against common passwords
@@ -153,19 +240,41 @@ class PasswordValidator:
             return False, "This password is too common. Please choose a stronger password"
 
         # Check for sequential characters
-        if PasswordValidator._has_sequential_chars(password):
+        if scan['sequential']:
             return False, "Password contains sequential characters (e.g., 12345, abcde). Please choose a stronger password"
 
         # Check for repeated characters
-        if PasswordValidator._has_repeated_chars(password):
+        if scan['repeated']:
             return False, "Password contains too many repeated characters. Please choose a stronger password"
 
         # Check for keyboard patterns
-        if PasswordValidator._has_keyboard_pattern(password):
+        if scan['keyboard_pattern']:
             return False, "Password contains keyboard patterns (e.g., qwerty). Please choose a stronger password"
 
         return True, "Valid password"
 
+    @staticmethod
+    def validate_many(passwords: Iterable[str]) -> List[Tuple[bool, str]]:
+        """
+        Validate a batch of passwords (e.g. for bulk user imports)
+
+        Duplicate passwords in the batch are only analyzed once.
+
+        Args:
+            passwords: Iterable of password strings
+
+        Returns:
+            List of (is_valid: bool, message: str) tuples in input order
+        """
+        seen: Dict[str, Tuple[bool, str]] = {}
+        results = []
+        for password in passwords:
+            outcome = seen.get(password)
+            if outcome is None:
+                outcome = seen[password] = PasswordValidator.validate_password(password)
+            results.append(outcome)
+        return results
+
     @staticmethod
     def _has_sequential_chars(password: str, min_length: int = 4) -> bool:
         """Check for sequential characters (numbers or letters)"""
@@ -272,3 +381,16 @@ def validate_password_strength(password: str) -> Tuple[bool, str]:
         Tuple of (is_valid: bool, message: str)
     """
     return PasswordValidator.validate_password(password)
+
+
+def validate_passwords(passwords: Iterable[str]) -> List[Tuple[bool, str]]:
+    """
+    Convenience function to validate many passwords at once
+
+    Args:
+        passwords: Iterable of password strings
+
+    Returns:
+        List of (is_valid: bool, message: str) tuples in input order
+    """
+    return PasswordValidator.validate_many(passwords)
@@ -1,12 +1,14 @@
 """
 Session management using cookies for persistent authentication across page refreshes.
 Uses extra-streamlit-components for reliable cookie handling.
+Cookies hold signed session tokens (see auth/session_tokens.py), so restoring a
+session is a local signature check rather than a database or localStorage lookup.
 """
 import streamlit as st
 import json
 from datetime import datetime, timedelta
-from auth.auth_utils import get_user_by_email
 from extra_streamlit_components import CookieManager
+from auth.session_tokens import issue_session_token, verify_session_token, revoke_session_token
 
 # Cookie name for storing session data
 SESSION_COOKIE_NAME = "talkheal_session"
@@ -25,28 +27,34 @@ def set_session_cookie(email, user_data):
         email (str): User's email
         user_data (dict): User profile data
     """
+    token = issue_session_token(email, user_data, ttl_seconds=SESSION_EXPIRY_DAYS * 24 * 3600)
+    st.session_state["session_token"] = token
     try:
         cookie_manager = get_cookie_manager()
         
-        session_data = {
-            "email": email,
-            "authenticated": True,
-            "user_profile": user_data,
-            "expires_at": (datetime.now() + timedelta(days=SESSION_EXPIRY_DAYS)).isoformat()
-        }
-        
-        # Convert to JSON string
-        session_json = json.dumps(session_data)
-        
         # Set cookie (expires in 7 days)
         cookie_manager.set(
             SESSION_COOKIE_NAME,
-            session_json,
+            token,
             expires_at=datetime.now() + timedelta(days=SESSION_EXPIRY_DAYS)
         )
     except Exception as e:
         # If cookie manager fails, fall back to localStorage
-        _set_session_storage_fallback(email, user_data)
+        _set_session_storage_fallback(token)
+
+
+def _session_data_from_token(token):
+    """Turn a verified token payload into the session data shape used by the app"""
+    payload = verify_session_token(token)
+    if payload is None:
+        return None
+    return {
+        "email": payload["sub"],
+        "authenticated": True,
+        "user_profile": dict(payload.get("prf") or {}),
+        "expires_at": datetime.fromtimestamp(payload["exp"]).isoformat(),
+        "token": token
+    }
 
 
 def get_session_cookie():
@@ -59,33 +67,28 @@ def get_session_cookie():
     try:
         cookie_manager = get_cookie_manager()
         cookie_value = cookie_manager.get(SESSION_COOKIE_NAME)
-        
-        if not cookie_value:
-            # Try fallback to localStorage
-            return _get_session_storage_fallback()
-        
-        # Parse JSON data
-        session_data = json.loads(cookie_value)
-        
-        # Check if session has expired
-        expires_at_str = session_data.get("expires_at")
-        if expires_at_str:
-            expires_at = datetime.fromisoformat(expires_at_str)
-            if datetime.now() > expires_at:
-                # Session expired, clear cookie
-                clear_session_cookie()
-                return None
-        
-        return session_data
     except Exception as e:
-        # If there's any error, try fallback
+        # Cookies are unavailable in this browser; only then ask localStorage
         return _get_session_storage_fallback()
+    
+    if not cookie_value:
+        # No cookie simply means no session - no JS round trip needed
+        return None
+    
+    session_data = _session_data_from_token(cookie_value)
+    if session_data is None:
+        # Expired, revoked, tampered or legacy unsigned cookie
+        clear_session_cookie()
+    return session_data
 
 
 def clear_session_cookie():
     """
-    Clear the session cookie.
+    Clear the session cookie and revoke its token.
     """
+    token = st.session_state.pop("session_token", None)
+    if token:
+        revoke_session_token(token)
     try:
         cookie_manager = get_cookie_manager()
         cookie_manager.delete(SESSION_COOKIE_NAME)
@@ -122,44 +125,27 @@ def restore_session_from_storage():
         email = session_data.get("email")
         user_profile = session_data.get("user_profile", {})
         
-        # Handle guest users (they don't exist in database)
+        # The token is signed and checked against the revocation list, so the
+        # profile it carries is trusted without a database lookup
+        st.session_state.authenticated = True
+        st.session_state.user_profile = user_profile
+        st.session_state.session_token = session_data["token"]
         if email == "guest@talkheal.app":
-            # Restore guest session directly
-            st.session_state.authenticated = True
-            st.session_state.user_profile = user_profile
             st.session_state.user_name = user_profile.get("name", "Guest Healer")
-            return True
-        
-        # For regular users, verify they still exist in database
-        user = get_user_by_email(email)
-        if user:
-            # Restore session state
-            st.session_state.authenticated = True
-            st.session_state.user_profile = user_profile
-            st.session_state.user_name = user_profile.get("name", email)
-            return True
         else:
-            # User doesn't exist anymore, clear cookie
-            clear_session_cookie()
-            return False
+            st.session_state.user_name = user_profile.get("name", email)
+        return True
     
     return False
 
 
 # Fallback functions using localStorage (in case cookies don't work)
-def _set_session_storage_fallback(email, user_data):
+def _set_session_storage_fallback(token):
     """Fallback: Set localStorage using JavaScript"""
-    session_data = {
-        "email": email,
-        "authenticated": True,
-        "user_profile": user_data,
-        "expires_at": (datetime.now() + timedelta(days=SESSION_EXPIRY_DAYS)).isoformat()
-    }
-    session_json = json.dumps(session_data)
     js_code = f"""
     <script>
         try {{
-            localStorage.setItem("{SESSION_COOKIE_NAME}", {json.dumps(session_json)});
+            localStorage.setItem("{SESSION_COOKIE_NAME}", {json.dumps(token)});
         }} catch(e) {{
             console.error("Error setting session storage:", e);
         }}
@@ -186,16 +172,9 @@ def _get_session_storage_fallback():
             if not storage_str:
                 return None
         
-        session_data = json.loads(storage_str)
-        
-        # Check expiration
-        expires_at_str = session_data.get("expires_at")
-        if expires_at_str:
-            expires_at = datetime.fromisoformat(expires_at_str)
-            if datetime.now() > expires_at:
-                _clear_session_storage_fallback()
-                return None
-        
+        session_data = _session_data_from_token(storage_str)
+        if session_data is None:
+            _clear_session_storage_fallback()
         return session_data
     except Exception:
         return None
@@ -0,0 +1,157 @@
+"""
+Signed session tokens for TalkHeal
+Compact HMAC-SHA256 tokens that carry the session payload, so a session can be
+restored by verifying a cookie locally instead of reading storage or the database.
+
+Token format: v1.<base64url(json payload)>.<base64url(hmac)>
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from dotenv import load_dotenv
+
+from core.ttl_cache import TTLCache
+
+load_dotenv()
+
+TOKEN_VERSION = "v1"
+SESSION_TTL_SECONDS = 7 * 24 * 3600
+SESSION_DB = "users.db"
+
+# Without a configured secret, tokens are signed with a per-process key and
+# simply stop verifying after a restart (users log in again)
+_SECRET = (os.getenv("SESSION_SECRET") or os.getenv("JWT_SECRET") or secrets.token_hex(32)).encode()
+
+# Verified payloads by token; expiry and revocation are still checked on every hit
+_verified = TTLCache(ttl=300, maxsize=1024)
+
+# How long a token id's revocation status is trusted before SESSION_DB is
+# asked again, which bounds how long a logout in another process goes unseen
+REVOCATION_RECHECK_SECONDS = 15
+
+# Token id -> revoked? as last read from SESSION_DB
+_revocation_checks = TTLCache(ttl=REVOCATION_RECHECK_SECONDS, maxsize=4096)
+_revocation_db: Optional[str] = None
+_revoked_lock = threading.Lock()
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(message: str) -> bytes:
+    return hmac.new(_SECRET, message.encode(), hashlib.sha256).digest()
+
+
+def init_revocation_table(db_path: str = SESSION_DB) -> None:
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS revoked_sessions (
+                jti TEXT PRIMARY KEY,
+                expires_at REAL NOT NULL
+            )
+        """)
+        conn.commit()
+
+
+def _ensure_revocation_table() -> None:
+    """Create the table and drop expired revocations, once per process and database"""
+    global _revocation_db
+    if _revocation_db != SESSION_DB:
+        with _revoked_lock:
+            if _revocation_db != SESSION_DB:
+                init_revocation_table(SESSION_DB)
+                with sqlite3.connect(SESSION_DB) as conn:
+                    conn.execute("DELETE FROM revoked_sessions WHERE expires_at < ?", (time.time(),))
+                    conn.commit()
+                _revocation_checks.clear()
+                _revocation_db = SESSION_DB
+
+
+def _is_revoked(jti: str) -> bool:
+    """Whether a token id is revoked in SESSION_DB, by any process (cached briefly)"""
+    revoked = _revocation_checks.get(jti)
+    if revoked is None:
+        _ensure_revocation_table()
+        with sqlite3.connect(SESSION_DB) as conn:
+            revoked = conn.execute("SELECT 1 FROM revoked_sessions WHERE jti = ?", (jti,)).fetchone() is not None
+        _revocation_checks.set(jti, revoked)
+    return revoked
+
+
+def issue_session_token(email: str, user_profile: Dict[str, Any],
+                        ttl_seconds: int = SESSION_TTL_SECONDS) -> str:
+    """Create a signed session token for a user"""
+    now = int(time.time())
+    payload = {
+        "jti": secrets.token_urlsafe(12),
+        "sub": email,
+        "iat": now,
+        "exp": now + ttl_seconds,
+        "prf": user_profile,
+    }
+    body = _b64encode(json.dumps(payload, separators=(",", ":")).encode())
+    signing_input = f"{TOKEN_VERSION}.{body}"
+    return f"{signing_input}.{_b64encode(_sign(signing_input))}"
+
+
+def verify_session_token(token: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    Verify a session token
+
+    Returns:
+        The token payload (jti, sub, iat, exp, prf) if the signature is valid and
+        the token is neither expired nor revoked, None otherwise
+    """
+    if not token or not isinstance(token, str):
+        return None
+
+    now = time.time()
+    payload = _verified.get(token)
+    if payload is None:
+        try:
+            version, body, signature = token.split(".")
+            if version != TOKEN_VERSION:
+                return None
+            if not hmac.compare_digest(_b64decode(signature), _sign(f"{version}.{body}")):
+                return None
+            payload = json.loads(_b64decode(body))
+        except (ValueError, TypeError):
+            return None
+        _verified.set(token, payload)
+
+    if payload["exp"] <= now or _is_revoked(payload["jti"]):
+        _verified.pop(token)
+        return None
+    return payload
+
+
+def revoke_session_token(token: Optional[str]) -> bool:
+    """Revoke a token by id so it no longer verifies; returns False for invalid tokens"""
+    payload = verify_session_token(token)
+    if payload is None:
+        return False
+
+    _ensure_revocation_table()
+    with sqlite3.connect(SESSION_DB) as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO revoked_sessions (jti, expires_at) VALUES (?, ?)",
+            (payload["jti"], payload["exp"])
+        )
+        conn.commit()
+    _revocation_checks.set(payload["jti"], True)
+    _verified.pop(token)
+    return True
@@ -0,0 +1,138 @@
+"""
+Local stand-in SMTP server for TalkHeal
+A minimal plain-text SMTP server (EHLO, AUTH PLAIN, MAIL, RCPT, DATA)
+on 127.0.0.1 that stores received messages in memory, so the mail outbox can
+be tested and its throughput measured without a real mail server.
+
+Usage:
+    with StubSMTPServer() as server:
+        sender = MailSender(host=server.host, port=server.port, use_ssl=False, ...)
+"""
+
+import socketserver
+import threading
+from typing import List, Optional, Set
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    disable_nagle_algorithm = True
+
+    def _reply(self, line: str) -> None:
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def _readline(self) -> Optional[str]:
+        raw = self.rfile.readline()
+        if not raw:
+            return None
+        return raw.decode("utf-8", "replace").rstrip("\r\n")
+
+    def handle(self):
+        server = self.server.stub
+        server._connection_opened()
+        self._reply("220 talkheal-stub ESMTP ready")
+        sender, recipients = None, []
+
+        while True:
+            line = self._readline()
+            if line is None:
+                return
+            command = line.split(" ", 1)[0].upper()
+
+            if command in ("EHLO", "HELO"):
+                if command == "EHLO":
+                    self._reply("250-talkheal-stub")
+                    self._reply("250-AUTH PLAIN")
+                    self._reply("250 8BITMIME")
+                else:
+                    self._reply("250 talkheal-stub")
+            elif command == "AUTH":
+                server._logged_in()
+                self._reply("235 2.7.0 Authentication successful")
+            elif command == "MAIL":
+                if server.fail_next > 0:
+                    server.fail_next -= 1
+                    self._reply("421 4.3.0 Temporary failure, closing connection")
+                    return
+                sender, recipients = line[10:].strip(), []
+                self._reply("250 OK")
+            elif command == "RCPT":
+                recipients.append(line[8:].strip().strip("<>"))
+                self._reply("250 OK")
+            elif command == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                lines: List[str] = []
+                while True:
+                    data_line = self._readline()
+                    if data_line is None:
+                        return
+                    if data_line == ".":
+                        break
+                    lines.append(data_line[1:] if data_line.startswith("..") else data_line)
+                server._received(sender, recipients, "\n".join(lines))
+                self._reply("250 OK queued")
+            elif command in ("RSET", "NOOP"):
+                sender, recipients = None, []
+                self._reply("250 OK")
+            elif command == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+
+class _ThreadingTCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class StubSMTPServer:
+    """In-process SMTP server listening on an ephemeral localhost port"""
+
+    def __init__(self):
+        self.messages: List[dict] = []
+        self.connections = 0
+        self.logins = 0
+        # Number of upcoming MAIL commands to answer with a 421 and hang up
+        self.fail_next = 0
+        self.recipients: Set[str] = set()
+        self._lock = threading.Lock()
+        self._server: Optional[_ThreadingTCPServer] = None
+
+    @property
+    def host(self) -> str:
+        return self._server.server_address[0]
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def _connection_opened(self) -> None:
+        with self._lock:
+            self.connections += 1
+
+    def _logged_in(self) -> None:
+        with self._lock:
+            self.logins += 1
+
+    def _received(self, sender: str, recipients: List[str], data: str) -> None:
+        with self._lock:
+            self.messages.append({"from": sender, "to": recipients, "data": data})
+            self.recipients.update(recipients)
+
+    def start(self) -> "StubSMTPServer":
+        self._server = _ThreadingTCPServer(("127.0.0.1", 0), _SMTPHandler)
+        self._server.stub = self
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "StubSMTPServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
@@ -0,0 +1,177 @@
+"""
+Rolling-origin backtest of the mood forecasters
+
+Each series is cut at successive origins (the first after --initial days, then
+every --step days); every model is fitted on the days before the origin and
+scored on the next --horizon days. Reports per model the MAE, how often the
+actual mood fell inside the 95% prediction interval, and fit+forecast time.
+Series x model jobs run in parallel across cores.
+
+Series come from the synthetic generator in bench_forecast (default), from every
+user partition in the mood store (--store), or from mood CSV exports (--csv).
+
+Run from the repository root:
+    python -m benchmarks.backtest_forecast [--models ets arima] [--series 30] [--workers 4]
+    python -m benchmarks.backtest_forecast --store --json backtest.json
+"""
+
+import argparse
+import json
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_forecast import make_series
+from components import predictive_analytics as pa
+from components.forecast_batch import read_mood_log
+from components.fast_forecast import forecast_ets
+from core.mood_store import list_mood_partitions
+
+
+def _naive(train: pd.Series, horizon: int) -> Dict[str, Any]:
+    index = pd.date_range(train.index[-1] + pd.Timedelta(days=1), periods=horizon, freq="D")
+    return {"forecast": pd.Series(np.repeat(train.iloc[-7:].mean(), horizon), index=index)}
+
+
+# Uncached forecasters, so every fold pays for a full fit
+MODELS = {
+    "naive": (_naive, True),
+    "ets": (forecast_ets, True),
+    "arima": (pa.forecast_arima, pa.ARIMA_AVAILABLE),
+    "prophet": (pa.forecast_prophet, pa.PROPHET_AVAILABLE),
+}
+
+
+def synthetic_series(count: int, days: int, seed: int = 7) -> List[Tuple[str, pd.Series]]:
+    rng = np.random.default_rng(seed)
+    return [(f"synthetic-{i}", make_series(rng, days)) for i in range(count)]
+
+
+def _daily(mood_log: pd.DataFrame) -> pd.Series:
+    if mood_log.empty:
+        return pd.Series(dtype=float)
+    return mood_log.set_index(pd.to_datetime(mood_log["timestamp"]))["mood_score"].resample("D").mean().dropna()
+
+
+def store_series(window_days: int) -> List[Tuple[str, pd.Series]]:
+    return [(os.path.basename(path), _daily(read_mood_log(path, window_days))) for path in list_mood_partitions()]
+
+
+def csv_series(paths: List[str]) -> List[Tuple[str, pd.Series]]:
+    """Series from CSV mood exports (timestamp plus mood_numeric or mood_score columns)"""
+    series = []
+    for path in paths:
+        df = pd.read_csv(path)
+        score = "mood_numeric" if "mood_numeric" in df.columns else "mood_score"
+        series.append((os.path.basename(path), _daily(df[["timestamp", score]].rename(columns={score: "mood_score"}))))
+    return series
+
+
+def backtest(model: str, series: pd.Series, horizon: int, initial: int, step: int) -> Dict[str, Any]:
+    """Score one model on one series at every origin; returns raw error and timing tallies"""
+    warnings.simplefilter("ignore")  # statsmodels convergence chatter
+    forecaster = MODELS[model][0]
+    errors, inside, intervals, seconds = [], 0, 0, []
+    for origin in range(initial, len(series) - 1, step):
+        train = series.iloc[:origin]
+        cutoff = train.index[-1]
+        actual = series[(series.index > cutoff) & (series.index <= cutoff + pd.Timedelta(days=horizon))]
+        if actual.empty:
+            continue
+        start = time.perf_counter()
+        result = forecaster(train, horizon)
+        seconds.append(time.perf_counter() - start)
+        if not result:
+            continue
+        # Days without entries have no actual to score against
+        positions = result["forecast"].index.get_indexer(actual.index)
+        found = positions >= 0
+        predicted = result["forecast"].to_numpy()[positions[found]]
+        errors.extend(np.abs(predicted - actual.to_numpy()[found]))
+        bounds = result.get("confidence_intervals")
+        if bounds is not None:
+            bounds = np.asarray(bounds)[positions[found]]
+            observed = actual.to_numpy()[found]
+            inside += int(((bounds[:, 0] <= observed) & (observed <= bounds[:, 1])).sum())
+            intervals += len(observed)
+    return {"model": model, "folds": len(seconds), "errors": errors, "inside": inside,
+            "intervals": intervals, "seconds": seconds}
+
+
+def _job(args) -> Dict[str, Any]:
+    return backtest(*args)
+
+
+def summarize(results: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    report: Dict[str, Dict[str, Any]] = {}
+    for model in dict.fromkeys(r["model"] for r in results):
+        runs = [r for r in results if r["model"] == model]
+        errors = np.concatenate([r["errors"] for r in runs]) if any(r["errors"] for r in runs) else np.array([])
+        seconds = np.concatenate([r["seconds"] for r in runs]) if any(r["seconds"] for r in runs) else np.array([])
+        intervals = sum(r["intervals"] for r in runs)
+        report[model] = {
+            "folds": int(sum(r["folds"] for r in runs)),
+            "mae": float(errors.mean()) if errors.size else None,
+            "coverage": sum(r["inside"] for r in runs) / intervals if intervals else None,
+            "fit_ms_median": float(np.median(seconds) * 1000) if seconds.size else None,
+            "fit_ms_p95": float(np.percentile(seconds, 95) * 1000) if seconds.size else None,
+        }
+    return report
+
+
+def _fmt(value, pattern):
+    return "n/a".rjust(len(pattern.format(0))) if value is None else pattern.format(value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rolling-origin backtest of the mood forecasters")
+    parser.add_argument("--models", nargs="+", choices=list(MODELS), default=list(MODELS))
+    parser.add_argument("--store", action="store_true", help="Backtest every user's series in the mood store")
+    parser.add_argument("--csv", nargs="+", default=None, help="Backtest mood CSV exports")
+    parser.add_argument("--series", type=int, default=20, help="Synthetic series to generate")
+    parser.add_argument("--days", type=int, default=90, help="Length of each synthetic series")
+    parser.add_argument("--window", type=int, default=365, help="Days of history to read per store user")
+    parser.add_argument("--horizon", type=int, default=7)
+    parser.add_argument("--initial", type=int, default=21, help="Days before the first origin")
+    parser.add_argument("--step", type=int, default=7, help="Days between origins")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--json", default=None, help="Also write the report to this file")
+    args = parser.parse_args(argv)
+
+    if args.store:
+        series = store_series(args.window)
+    elif args.csv:
+        series = csv_series(args.csv)
+    else:
+        series = synthetic_series(args.series, args.days)
+    series = [(name, s) for name, s in series if len(s) > args.initial]
+    models = [m for m in args.models if MODELS[m][1]]
+    skipped = sorted(set(args.models) - set(models))
+    print(f"{len(series)} series, origins from day {args.initial} every {args.step} days, "
+          f"{args.horizon}-day horizon" + (f" (not installed: {', '.join(skipped)})" if skipped else ""))
+    if not series:
+        print("Nothing to backtest: no series longer than --initial days")
+        return
+
+    # Slowest models first so they do not straggle at the end
+    jobs = [(m, s, args.horizon, args.initial, args.step) for m in reversed(models) for _, s in series]
+    with ProcessPoolExecutor(max_workers=args.workers or os.cpu_count()) as executor:
+        report = summarize(list(executor.map(_job, jobs)))
+
+    print(f"{'model':<10}{'folds':>7}{'MAE':>8}{'coverage':>10}{'fit ms (median)':>17}{'p95':>9}")
+    for model in models:
+        row = report[model]
+        print(f"{model:<10}{row['folds']:>7}{_fmt(row['mae'], '{:8.3f}')}{_fmt(row['coverage'], '{:10.1%}')}"
+              f"{_fmt(row['fit_ms_median'], '{:17.1f}')}{_fmt(row['fit_ms_p95'], '{:9.1f}')}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"settings": {k: v for k, v in vars(args).items() if k != "json"}, "models": report}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark: per-activity mood statistics via explode() + groupby vs. the sparse
+activity matrix (core.activity_matrix)
+
+Run from the repository root:
+    python -m benchmarks.bench_activity_correlation [entries] [tags]
+"""
+
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from core.activity_matrix import activity_mood_stats
+
+
+def make_entries(n, n_tags, seed=11):
+    rng = np.random.default_rng(seed)
+    tags = np.array([f"activity_{i}" for i in range(n_tags)], dtype=object)
+    # Popularity is skewed, as with real tags
+    weights = 1 / np.arange(1, n_tags + 1)
+    lengths = rng.integers(0, 6, n)
+    flat = rng.choice(tags, lengths.sum(), p=weights / weights.sum())
+    activities = [list(a) for a in np.split(flat, np.cumsum(lengths)[:-1])]
+    return activities, rng.integers(1, 6, n).astype(float)
+
+
+def explode_groupby(activities, scores):
+    df = pd.DataFrame({"activities": activities, "mood_numeric": scores}).explode("activities")
+    df = df[df["activities"].notna() & (df["activities"] != "")]
+    return df.groupby("activities").agg({"mood_numeric": ["mean", "count", "std"]})
+
+
+def measure(name, fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    seconds = time.perf_counter() - start
+    # Separate run: tracing allocations slows Python-heavy code down
+    tracemalloc.start()
+    fn(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{name:<18} {seconds * 1000:8.1f} ms   peak {peak / 2 ** 20:7.1f} MB")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    n_tags = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    activities, scores = make_entries(n, n_tags)
+    print(f"{n} entries, {n_tags} activity tags")
+    measure("explode + groupby", explode_groupby, activities, scores)
+    measure("sparse matrix", activity_mood_stats, activities, scores)
+
+
+if __name__ == "__main__":
+    main()
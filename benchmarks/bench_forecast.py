@@ -0,0 +1,64 @@
+"""
+Benchmark: NumPy damped Holt-Winters vs. statsmodels ARIMA(1,1,1) (and Prophet if installed)
+
+Fits each model on synthetic daily mood series (weekly pattern, slow drift, noise,
+scores in 1-5), forecasts the held-out final week and reports fit latency and MAE.
+
+Run from the repository root:
+    python -m benchmarks.bench_forecast
+"""
+
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from components import predictive_analytics as pa
+from components.fast_forecast import forecast_ets
+
+HORIZON = 7
+
+
+def make_series(rng, days):
+    t = np.arange(days)
+    weekly = rng.normal(0, 0.6, 7)[t % 7]
+    drift = np.cumsum(rng.normal(0, 0.05, days))
+    values = np.clip(3 + weekly + drift + rng.normal(0, 0.5, days), 1, 5)
+    return pd.Series(values, index=pd.date_range("2024-01-01", periods=days, freq="D"))
+
+
+def evaluate(name, forecaster, cases):
+    errors, seconds = [], []
+    for train, test in cases:
+        start = time.perf_counter()
+        result = forecaster(train, HORIZON)
+        seconds.append(time.perf_counter() - start)
+        if result:
+            errors.append(np.abs(result["forecast"].to_numpy() - test.to_numpy()).mean())
+    if not errors:
+        print(f"{name:<22} unavailable")
+        return
+    print(f"{name:<22} fit+forecast {np.median(seconds) * 1000:7.1f} ms (median)   MAE {np.mean(errors):.3f}")
+
+
+def main():
+    warnings.simplefilter("ignore")  # statsmodels convergence chatter
+    rng = np.random.default_rng(7)
+    cases = []
+    for days in (30, 60, 120) * 20:
+        series = make_series(rng, days + HORIZON)
+        cases.append((series[:-HORIZON], series[-HORIZON:]))
+    print(f"{len(cases)} series of 30/60/120 days, forecasting {HORIZON} days ahead")
+
+    naive = lambda train, h: {"forecast": pd.Series(np.repeat(train.iloc[-7:].mean(), h))}
+    evaluate("last-week mean", naive, cases)
+    evaluate("NumPy Holt-Winters", forecast_ets, cases)
+    if pa.ARIMA_AVAILABLE:
+        evaluate("statsmodels ARIMA", pa.forecast_arima, cases)
+    if pa.PROPHET_AVAILABLE:
+        evaluate("Prophet", pa.forecast_prophet, cases[:10])
+
+
+if __name__ == "__main__":
+    main()
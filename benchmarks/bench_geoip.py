@@ -0,0 +1,66 @@
+"""
+Benchmark: offline IP and coordinate lookups (core.geoip)
+
+Builds a synthetic IPv4 table and country grid of realistic size in a
+temporary directory, then times uncached lookups (binary search in the
+memory-mapped table, one grid index) and lookups served by the TTL cache.
+
+Run from the repository root:
+    python -m benchmarks.bench_geoip [ranges] [lookups]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from core import geoip
+
+
+def make_datasets(directory, n_ranges, seed=5):
+    rng = np.random.default_rng(seed)
+    starts = np.unique(rng.integers(0, 2 ** 32, n_ranges, dtype=np.uint64)).astype(np.uint32)
+    table = np.zeros(len(starts), dtype=geoip.IP_DTYPE)
+    table["start"] = starts
+    table["end"] = np.r_[starts[1:] - 1, 2 ** 32 - 1]
+    codes = np.array([a + b for a in "ABCDEFGHIJ" for b in "KLMNOPQRST"])
+    table["country"] = codes[rng.integers(0, len(codes), len(starts))]
+    table["latitude"] = rng.uniform(-60, 70, len(starts))
+    table["longitude"] = rng.uniform(-180, 180, len(starts))
+    np.save(os.path.join(directory, "ipv4.npy"), table)
+    grid = rng.integers(0, 2 ** 15, (1800, 3600)).astype("<u2")
+    np.save(os.path.join(directory, "countries.npy"), grid)
+
+
+def timed(name, fn, queries):
+    start = time.perf_counter()
+    for query in queries:
+        fn(query)
+    seconds = time.perf_counter() - start
+    print(f"{name:<28} {seconds / len(queries) * 1e6:8.2f} µs per lookup")
+
+
+def main():
+    n_ranges = int(sys.argv[1]) if len(sys.argv) > 1 else 3_000_000
+    n_lookups = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+    rng = np.random.default_rng(1)
+    ips = [f"{a}.{b}.{c}.{d}" for a, b, c, d in rng.integers(1, 224, (n_lookups, 4))]
+    coords = list(zip(rng.uniform(-89, 89, n_lookups), rng.uniform(-180, 180, n_lookups)))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        make_datasets(tmp, n_ranges)
+        geoip.IP_DATABASE = os.path.join(tmp, "ipv4.npy")
+        geoip.COUNTRY_GRID = os.path.join(tmp, "countries.npy")
+        geoip.reset()
+        geoip._ip_cache.maxsize = 2 * n_lookups
+        print(f"{n_ranges:,} IPv4 ranges, 0.1° country grid, {n_lookups:,} lookups")
+        timed("IP (uncached)", geoip.lookup_ip, ips)
+        timed("IP (TTL cache hit)", geoip.lookup_ip, ips)
+        timed("coordinates (grid)", lambda c: geoip.country_for_coords(*c), coords)
+        geoip.reset()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark: reset-email delivery, connection per message vs. the outbox sender
+
+Uses the local stub SMTP server (plain TCP, so the saving on a real TLS
+connection to smtp.gmail.com is larger than shown here).
+
+Run from the repository root:
+    python -m benchmarks.bench_mail_outbox
+"""
+
+import os
+import smtplib
+import tempfile
+import time
+from email.message import EmailMessage
+
+from auth.mail_outbox import MailSender, enqueue_email
+from auth.smtp_stub import StubSMTPServer
+
+MESSAGES = 300
+
+
+def build_message(i):
+    msg = EmailMessage()
+    msg['Subject'] = "TalkHeal Password Reset"
+    msg['From'] = "talkheal@example.com"
+    msg['To'] = f"user{i}@example.com"
+    msg.set_content("Use this link to reset your password")
+    return msg
+
+
+def main():
+    with StubSMTPServer() as server, tempfile.TemporaryDirectory() as tmpdir:
+        # Previous behaviour: connect, log in and send inside the request
+        start = time.perf_counter()
+        for i in range(MESSAGES):
+            with smtplib.SMTP(server.host, server.port) as smtp:
+                smtp.login("talkheal@example.com", "secret")
+                smtp.send_message(build_message(i))
+        direct = time.perf_counter() - start
+
+        db_path = os.path.join(tmpdir, "outbox.db")
+        start = time.perf_counter()
+        for i in range(MESSAGES):
+            enqueue_email(f"user{i}@example.com", "TalkHeal Password Reset",
+                          "Use this link to reset your password", db_path=db_path)
+        enqueue = time.perf_counter() - start
+
+        sender = MailSender(db_path=db_path, host=server.host, port=server.port,
+                            username="talkheal@example.com", password="secret",
+                            use_ssl=False, rate_per_minute=0)
+        connections_before = server.connections
+        start = time.perf_counter()
+        sender.process_pending()
+        drain = time.perf_counter() - start
+        sender.stop()
+
+        print(f"connection per message: {MESSAGES / direct:8.0f} msg/s, "
+              f"{direct / MESSAGES * 1000:.2f} ms blocking per request")
+        print(f"outbox enqueue:         {enqueue / MESSAGES * 1000:8.2f} ms blocking per request")
+        print(f"outbox sender:          {MESSAGES / drain:8.0f} msg/s over "
+              f"{server.connections - connections_before} connection(s)")
+
+
+if __name__ == "__main__":
+    main()
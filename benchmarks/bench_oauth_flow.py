@@ -0,0 +1,60 @@
+"""
+Benchmark: OAuth callback HTTP round trips, bare requests vs. the pooled session
+
+Runs the token exchange + user-info requests against the local stub provider,
+so no network access or provider credentials are needed.
+
+Run from the repository root:
+    python -m benchmarks.bench_oauth_flow
+"""
+
+import time
+
+import requests
+
+from auth import oauth_utils
+from auth.http_client import reset_http_session
+from auth.oauth_config import oauth_config
+from auth.oauth_stub import StubOAuthProvider
+
+ITERATIONS = 200
+
+
+def bare_flow(provider, code):
+    """The previous implementation: a fresh connection for every request"""
+    token = requests.post(provider.token_url, data={"code": code}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    requests.get(provider.user_info_url, headers=headers).json()
+    requests.get(provider.user_info_url, headers=headers).json()  # rerun during callback
+
+
+def pooled_flow(provider, code):
+    token = oauth_utils.exchange_code_for_token("github", code)["access_token"]
+    oauth_utils.get_user_info("github", token)
+    oauth_utils.get_user_info("github", token)  # rerun during callback, served from cache
+
+
+def timed(flow, stub, provider):
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        flow(provider, stub.issue_code())
+    return (time.perf_counter() - start) / ITERATIONS * 1000
+
+
+def main():
+    with StubOAuthProvider() as stub:
+        provider = stub.as_provider("github")
+        oauth_config.providers["github"] = provider
+        reset_http_session()
+
+        bare = timed(bare_flow, stub, provider)
+        connections_before = len(stub.connections)
+        pooled = timed(pooled_flow, stub, provider)
+
+        print(f"bare requests:   {bare:6.2f} ms/callback, {connections_before} connections")
+        print(f"pooled session:  {pooled:6.2f} ms/callback, "
+              f"{len(stub.connections) - connections_before} connections ({bare / pooled:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Micro-benchmark: single-pass password scanner vs. the legacy multi-pass checks
+
+Run from the repository root:
+    python -m benchmarks.bench_password_validator
+"""
+
+import random
+import re
+import string
+import timeit
+
+from auth.password_validator import PasswordValidator
+
+
+def legacy_checks(password):
+    """The pre-scanner implementation: six regex passes plus three pattern scans"""
+    return {
+        'uppercase': bool(re.search(r'[A-Z]', password)),
+        'lowercase': bool(re.search(r'[a-z]', password)),
+        'digit': bool(re.search(r'[0-9]', password)),
+        'special': bool(re.search(r'[!@#$%^&*()_+\-=\[\]{};:\'",.<>?/\\|`~]', password)),
+        'letter': bool(re.search(r'[A-Za-z]', password)),
+        'sequential': PasswordValidator._has_sequential_chars(password),
+        'repeated': PasswordValidator._has_repeated_chars(password),
+        'keyboard_pattern': PasswordValidator._has_keyboard_pattern(password),
+    }
+
+
+def make_corpus(size=5000, seed=42):
+    rng = random.Random(seed)
+    alphabet = string.ascii_letters + string.digits + "!@#$%^&*"
+    return [
+        ''.join(rng.choice(alphabet) for _ in range(rng.randint(8, 24)))
+        for _ in range(size)
+    ]
+
+
+def main():
+    corpus = make_corpus()
+
+    mismatches = sum(legacy_checks(p) != PasswordValidator._scan(p) for p in corpus)
+    print(f"Corpus: {len(corpus)} passwords, mismatches: {mismatches}")
+
+    legacy = min(timeit.repeat(lambda: [legacy_checks(p) for p in corpus], number=1, repeat=5))
+    scan = min(timeit.repeat(lambda: [PasswordValidator._scan(p) for p in corpus], number=1, repeat=5))
+    batch = min(timeit.repeat(lambda: PasswordValidator.validate_many(corpus), number=1, repeat=5))
+
+    per_item = lambda seconds: seconds / len(corpus) * 1e6
+    print(f"legacy checks:   {per_item(legacy):7.2f} µs/password")
+    print(f"single-pass:     {per_item(scan):7.2f} µs/password ({legacy / scan:.2f}x)")
+    print(f"validate_many:   {per_item(batch):7.2f} µs/password")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark: importing a minute-level wearable CSV export
+
+Compares the old Wearables page import (read the whole file, build a dict per
+row with df.iterrows(), normalize timestamps one by one in append_records)
+with core.wearable_ingest, which reads the file in chunks and parses each
+chunk with whole-column operations. Reports wall time, and peak traced
+memory from a second, re-importing run.
+
+Run from the repository root:
+    python -m benchmarks.bench_wearable_ingest [days]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from core import wearable_store
+from core.wearable_ingest import import_wearable_csv
+
+
+def write_export(path, days, seed=7):
+    """Minute-level export with sparse metrics, written a day at a time"""
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp("2023-01-01")
+    for day in range(days):
+        index = pd.date_range(start + pd.Timedelta(days=day), periods=1440, freq="min")
+        frame = pd.DataFrame({
+            "timestamp": index.strftime("%Y-%m-%dT%H:%M:%S"),
+            "hrv_ms": np.where(rng.random(1440) < 0.2, rng.normal(55, 8, 1440).round(1), np.nan),
+            "resting_hr": np.nan,
+            "steps": rng.poisson(6, 1440),
+            "active_minutes": (rng.random(1440) < 0.1).astype(int),
+        })
+        frame.loc[0, "resting_hr"] = rng.normal(60, 3)
+        frame.to_csv(path, mode="a", header=day == 0, index=False)
+
+
+def legacy_import(email, path, provider):
+    df = pd.read_csv(path)
+    colmap = {c.lower().strip().replace("_", ""): c for c in df.columns}
+    records = []
+    for _, row in df.iterrows():
+        records.append({
+            "timestamp": row[colmap["timestamp"]],
+            "hrv_ms": row.get(colmap.get("hrvms")),
+            "resting_hr": row.get(colmap.get("restinghr")),
+            "sleep_minutes": row.get(colmap.get("sleepminutes")),
+            "sleep_efficiency": row.get(colmap.get("sleepefficiency")),
+            "steps": row.get(colmap.get("steps")),
+            "active_minutes": row.get(colmap.get("activeminutes")),
+        })
+    return wearable_store.append_records(email, records, provider)
+
+
+def measure(name, fn):
+    start = time.perf_counter()
+    count = fn()
+    elapsed = time.perf_counter() - start
+    # Traced separately: tracemalloc slows the import down several times
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{name:<28} {count:>9} rows {elapsed:8.2f} s   peak {peak / 2**20:8.1f} MiB")
+
+
+def main():
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 90
+    with tempfile.TemporaryDirectory() as tmp:
+        wearable_store.WEARABLE_DIR = os.path.join(tmp, "wearables")
+        path = os.path.join(tmp, "export.csv")
+        write_export(path, days)
+        print(f"{days} days of minute data, {os.path.getsize(path) / 2**20:.1f} MiB CSV\n")
+
+        wearable_store.set_consent("legacy@x.com", True)
+        wearable_store.set_consent("chunked@x.com", True)
+        measure("iterrows + append_records", lambda: legacy_import("legacy@x.com", path, "fitbit"))
+        measure("chunked import", lambda: import_wearable_csv("chunked@x.com", path, "fitbit")[0])
+
+
+if __name__ == "__main__":
+    main()
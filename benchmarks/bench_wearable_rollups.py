@@ -0,0 +1,78 @@
+"""
+Benchmark: reading wearable history through the rollup tiers
+
+A year of minute-level readings sits in one user's store. Compares what the
+dashboard and the Wearables page used to do (load raw records and regroup them
+to days with pandas on every view) with reading the daily rollup tier, and
+times a day's import including the rollup refresh.
+
+Run from the repository root:
+    python -m benchmarks.bench_wearable_rollups [days]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from itertools import repeat
+
+import numpy as np
+import pandas as pd
+
+from components.physio_correlation import _prepare_wearable_df
+from core import wearable_store
+
+
+def minute_rows(start, days, seed=3):
+    rng = np.random.default_rng(seed)
+    stamps = np.datetime_as_string(np.datetime64(start, "m") + np.arange(days * 1440), unit="s").tolist()
+    n = len(stamps)
+    hrv = np.where(rng.random(n) < 0.2, rng.normal(55, 8, n).round(1), np.nan)
+    hrv = np.where(np.isnan(hrv), None, hrv).tolist()
+    steps = rng.poisson(6, n).tolist()
+    return list(zip(stamps, repeat("fitbit"), hrv, repeat(None), repeat(None), repeat(None), steps, repeat(None)))
+
+
+def legacy_daily(records):
+    """The per-view regrouping physio_correlation did before the rollups"""
+    df = pd.DataFrame(records)
+    df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce")
+    df = df.dropna(subset=["timestamp"]).sort_values("timestamp")
+    df["date"] = df["timestamp"].dt.date
+    return df.groupby("date").agg({"hrv_ms": "mean", "resting_hr": "mean", "sleep_minutes": "sum",
+                                   "sleep_efficiency": "mean", "steps": "sum", "active_minutes": "sum"}).reset_index()
+
+
+def timed(name, fn, repeat=3):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    print(f"{name:<44} {(time.perf_counter() - start) / repeat * 1000:9.1f} ms")
+
+
+def main():
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 365
+    end = datetime(2025, 1, 1) + timedelta(days=days)
+    start_90 = (end - timedelta(days=90)).date().isoformat()
+    with tempfile.TemporaryDirectory() as tmp:
+        wearable_store.WEARABLE_DIR = os.path.join(tmp, "wearables")
+        wearable_store.set_consent("a@x.com", True)
+        wearable_store.append_rows("a@x.com", minute_rows(datetime(2025, 1, 1), days), "fitbit")
+        print(f"{days * 1440} minute-level records\n")
+
+        timed("dashboard, raw 90 days + pandas regroup",
+              lambda: legacy_daily(wearable_store.load_wearable_records("a@x.com", start=start_90)))
+        timed("dashboard, daily tier 90 days",
+              lambda: _prepare_wearable_df(wearable_store.load_wearable_rollup("a@x.com", "daily", start=start_90)))
+        timed("Wearables page, all raw records", lambda: pd.DataFrame(wearable_store.load_user_wearables("a@x.com")["records"]), 1)
+        timed("Wearables page, daily tier", lambda: pd.DataFrame(wearable_store.load_wearable_rollup("a@x.com", "daily")))
+        timed("Wearables page, hourly tier for 7 days",
+              lambda: wearable_store.load_wearable_rollup("a@x.com", "hourly", start=(end - timedelta(days=7)).isoformat()))
+
+        day = minute_rows(end, 1, seed=4)
+        timed("import one day, rollups refreshed", lambda: wearable_store.append_rows("a@x.com", day, "fitbit"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark: importing a small batch into a large wearable history
+
+Compares the old single-JSON-document store (load everything, rebuild the
+(timestamp, provider) index, merge, rewrite the file) with the SQLite store
+in core.wearable_store, where a batch is an upsert through the persistent
+index. Also times a consent change, which used to rewrite the whole file.
+
+Run from the repository root:
+    python -m benchmarks.bench_wearable_store [history_records] [batch]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from core import wearable_store
+
+
+def make_records(start, count, provider="fitbit"):
+    return [
+        {"timestamp": (start + timedelta(hours=i)).isoformat(), "provider": provider, "hrv_ms": 50.0 + i % 7,
+         "resting_hr": 60 + i % 5, "sleep_minutes": 420, "sleep_efficiency": 0.9, "steps": 300 * (i % 24),
+         "active_minutes": i % 30}
+        for i in range(count)
+    ]
+
+
+def legacy_append(path, new_records, provider):
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    existing = {(r.get("timestamp"), r.get("provider")): i for i, r in enumerate(data.get("records", []))}
+    for rec in new_records:
+        key = (rec["timestamp"], provider)
+        if key in existing:
+            data["records"][existing[key]] = {**data["records"][existing[key]],
+                                              **{k: v for k, v in rec.items() if v is not None}}
+        else:
+            data["records"].append(dict(rec, provider=provider))
+    data["updated_at"] = datetime.utcnow().isoformat()
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+
+def legacy_set_consent(path, consent):
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    data["consent"] = consent
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+
+def timed(name, fn, repeat=5):
+    start = time.perf_counter()
+    for i in range(repeat):
+        fn(i)
+    print(f"{name:<34} {(time.perf_counter() - start) / repeat * 1000:9.2f} ms")
+
+
+def main():
+    history = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    batch = int(sys.argv[2]) if len(sys.argv) > 2 else 48
+    start = datetime(2020, 1, 1)
+    records = make_records(start, history)
+    document = {"consent": True, "providers": {"fitbit": {"connected": True}}, "records": records}
+    # Each batch is half updates of recent records, half new ones
+    batches = [make_records(start + timedelta(hours=history - batch // 2 + i * batch), batch) for i in range(5)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_path = os.path.join(tmp, "legacy.json")
+        with open(legacy_path, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=2)
+        wearable_store.WEARABLE_DIR = tmp
+        wearable_store.save_user_wearables("bench@example.com", document)
+
+        print(f"{history:,} stored records, batches of {batch}")
+        timed("JSON document: import batch", lambda i: legacy_append(legacy_path, batches[i], "fitbit"))
+        timed("SQLite store: import batch",
+              lambda i: wearable_store.append_records("bench@example.com", batches[i], "fitbit"))
+        timed("JSON document: set consent", lambda i: legacy_set_consent(legacy_path, True))
+        timed("SQLite store: set consent", lambda i: wearable_store.set_consent("bench@example.com", True))
+        timed("SQLite store: read last 30 days", lambda i: wearable_store.load_wearable_records(
+            "bench@example.com", start=(start + timedelta(hours=history) - timedelta(days=30)).isoformat()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Benchmark: weather-mood analysis with the on-disk weather cache, offline
+
+A synthetic fixture provider stands in for meteostat, with a fixed delay per
+request to model the network round trip. Compares a cold cache, a warm cache
+and a window that moved forward by one day (only that day is fetched).
+
+Run from the repository root:
+    python -m benchmarks.bench_weather_cache [latency_seconds] [days]
+"""
+
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from components.weather_correlation import FixtureWeatherProvider, analyze_weather_mood_correlation, get_weather_data
+from core import weather_cache
+
+
+class SlowProvider(FixtureWeatherProvider):
+    latency = 0.0
+
+    def __call__(self, *args):
+        time.sleep(self.latency)
+        return super().__call__(*args)
+
+
+def make_mood(start, days, seed=2):
+    rng = np.random.default_rng(seed)
+    timestamps = pd.date_range(start, periods=days, freq="D") + pd.to_timedelta(rng.integers(8, 22, days), unit="h")
+    levels = np.array(["very_low", "low", "okay", "good", "great"])[rng.integers(0, 5, days)]
+    return pd.DataFrame({"timestamp": timestamps, "mood_level": levels})
+
+
+def measure(name, provider, start, end, mood):
+    calls = len(provider.calls)
+    began = time.perf_counter()
+    weather = get_weather_data(40.71, -74.01, start, end, provider=provider)
+    analyze_weather_mood_correlation(mood, weather)
+    seconds = time.perf_counter() - began
+    print(f"{name:<22} {seconds * 1000:8.1f} ms   {len(provider.calls) - calls} fetches")
+
+
+def main():
+    latency = float(sys.argv[1]) if len(sys.argv) > 1 else 0.5
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 90
+    end = datetime(2025, 6, 30)
+    start = end - timedelta(days=days)
+    fixture = FixtureWeatherProvider.synthetic(start - timedelta(days=30), end + timedelta(days=30))
+    provider = SlowProvider(fixture.frame.reset_index())
+    provider.latency = latency
+    mood = make_mood(start, days + 1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        weather_cache.WEATHER_DIR = tmp
+        print(f"{days} days, {latency * 1000:.0f} ms per fetch")
+        measure("cold cache", provider, start, end, mood)
+        measure("warm cache", provider, start, end, mood)
+        measure("window moved 1 day", provider, start + timedelta(days=1), end + timedelta(days=1), mood)
+
+
+if __name__ == "__main__":
+    main()
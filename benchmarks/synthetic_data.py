@@ -0,0 +1,353 @@
+"""
+Seeded synthetic data for benchmarks and demos
+
+Generates mood entries, wearable records, a water log, journal entries and chat
+conversations for many users with vectorized NumPy sampling, and writes each in
+its store's native format under --out, laid out like the app's working
+directory (data/mood/, data/wearables/, data/conversations_*.json,
+water_intake_log.json, journals.db). The same arguments always produce the
+same files, whatever the machine.
+
+Mood, sleep and activity share a per-user daily state, so mood tracks sleep
+and weekday patterns and some activity tags lift mood, giving the analytics
+and forecasters realistic structure to find.
+
+Run from the repository root:
+    python -m benchmarks.synthetic_data --users 2000 --days 365 --out /tmp/synthetic
+    python -m benchmarks.synthetic_data --users 1 --stores mood water --out .
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from core.mood_rollups import WEEKDAYS
+from core.mood_store import LEGACY_MOOD_FILE, MOOD_DIR, MOOD_LEVELS, SCHEMA_FILE_NAME, SCHEMA_VERSION, user_mood_path
+from core.water_tracker import WATER_LOG_FILE
+from core.wearable_store import DATA_DIR, WEARABLE_DIR, _safe_id, save_wearable_file
+
+STORES = ("mood", "wearables", "water", "journals", "conversations")
+# pages/Journaling.py keeps journals here
+JOURNAL_DB = "journals.db"
+# Users generated together; fixed so output does not depend on memory limits
+CHUNK_USERS = 256
+# Default first day: fixed rather than today, so reruns are byte-identical
+START_DATE = date(2025, 1, 1)
+
+CONTEXT_REASONS = ["Work", "Family", "Health", "Relationships", "Personal goals", "No specific reason"]
+NOTES = {
+    "very_low": ["Feeling overwhelmed today", "Had a tough day at work", "Not feeling my best"],
+    "low": ["A bit down today", "Could be better", "Feeling a little off"],
+    "okay": ["Just an average day", "Feeling neutral", "Nothing special today"],
+    "good": ["Had a productive day", "Feeling positive", "Things went well"],
+    "great": ["Amazing day!", "Feeling fantastic", "Everything is going great"],
+}
+BASE_ACTIVITIES = ["Exercise", "Socialized", "Ate healthy", "Slept well", "Meditated", "Worked late",
+                   "Read", "Walked outside", "Screen time", "Cooked", "Therapy", "Journaled"]
+JOURNAL_TEXT = {
+    "Positive": ["Today was a good day and I felt grateful.", "I made progress on something that matters to me."],
+    "Neutral": ["An ordinary day, nothing much to report.", "Went through my routine today."],
+    "Negative": ["I felt anxious and tired most of the day.", "Things did not go the way I hoped today."],
+}
+JOURNAL_TAGS = ["work", "family", "health", "sleep", "gratitude", "stress", "friends"]
+USER_MESSAGES = ["I've been feeling stressed lately.", "Can you help me calm down?", "I couldn't sleep last night.",
+                 "Work has been overwhelming.", "I had a good day today!", "How can I stop overthinking?"]
+BOT_MESSAGES = ["That sounds really hard. Would you like to try a short breathing exercise?",
+                "Thank you for sharing that with me. What do you think triggered it?",
+                "It's great to hear that! What made today feel good?",
+                "Let's take it one step at a time. What's on your mind right now?"]
+
+_STORE_IDS = {name: i for i, name in enumerate(("daily",) + STORES)}
+
+
+def user_emails(count: int) -> List[str]:
+    return [f"user{i:05d}@example.com" for i in range(count)]
+
+
+def _rng(seed: int, stream: str, chunk: int) -> np.random.Generator:
+    return np.random.default_rng([seed, _STORE_IDS[stream], chunk])
+
+
+def _chunks(users: Sequence[Optional[str]]):
+    for chunk, start in enumerate(range(0, len(users), CHUNK_USERS)):
+        yield chunk, list(users[start:start + CHUNK_USERS])
+
+
+def daily_state(seed: int, chunk: int, n_users: int, days: int,
+                start: date = START_DATE) -> Dict[str, np.ndarray]:
+    """Per user and day (n_users x days): baseline mood and the physiology behind it"""
+    rng = _rng(seed, "daily", chunk)
+    day_index = np.arange(days)
+    baseline = rng.normal(3.2, 0.4, (n_users, 1))
+    weekly = rng.normal(0, 0.3, (n_users, 7))[:, (day_index + start.weekday()) % 7]
+    drift = np.cumsum(rng.normal(0, 0.04, (n_users, days)), axis=1)
+    sleep = np.clip(rng.normal(420, 45, (n_users, days)), 180, 660)
+    sleep_z = (sleep - 420) / 45
+    hrv = np.clip(rng.normal(55, 12, (n_users, 1)) + 4 * sleep_z + rng.normal(0, 5, (n_users, days)), 10, 150)
+    active = np.clip(rng.gamma(2.0, 15, (n_users, days)), 0, 240)
+    return {
+        # Yesterday's sleep carries into today's mood
+        "mood": baseline + weekly + drift + 0.25 * np.roll(sleep_z, 1, axis=1) + 0.004 * (active - 30),
+        "sleep_minutes": sleep,
+        "sleep_efficiency": np.clip(rng.normal(0.88, 0.05, (n_users, days)) + 0.01 * sleep_z, 0.5, 1.0),
+        "hrv_ms": hrv,
+        "resting_hr": np.clip(rng.normal(62, 6, (n_users, 1)) - 0.15 * (hrv - 55) + rng.normal(0, 2, (n_users, days)), 40, 110),
+        "steps": np.clip(rng.normal(7000, 2500, (n_users, days)) + 60 * active, 0, None),
+        "active_minutes": active,
+    }
+
+
+def _dates(days: int, start: date) -> np.ndarray:
+    return np.datetime64(start.isoformat(), "D") + np.arange(days)
+
+
+def _json_strings(values: Sequence[str]) -> np.ndarray:
+    return np.array([json.dumps(v) for v in values], dtype=object)
+
+
+def write_mood(out: str, users: Sequence[Optional[str]], days: int, seed: int = 0,
+               entries_per_day: int = 3, n_activities: int = 40, start: date = START_DATE) -> int:
+    """One append-only JSONL partition per user, as core.mood_store writes them"""
+    mood_dir = os.path.join(out, MOOD_DIR)
+    if os.path.exists(os.path.join(out, LEGACY_MOOD_FILE)):
+        raise RuntimeError(f"{os.path.join(out, LEGACY_MOOD_FILE)} has not been migrated yet; start the app once first")
+    os.makedirs(mood_dir, exist_ok=True)
+    schema_path = os.path.join(mood_dir, SCHEMA_FILE_NAME)
+    if not os.path.exists(schema_path):
+        with open(schema_path, "w", encoding="utf-8") as f:
+            json.dump({"version": SCHEMA_VERSION, "migrated_at": datetime(2025, 1, 1).isoformat()}, f)
+
+    # Tag vocabulary, popularity (Zipf-like) and effect on mood are shared by all users
+    tags = (BASE_ACTIVITIES + [f"Activity {i}" for i in range(len(BASE_ACTIVITIES), n_activities)])[:n_activities]
+    tag_rng = np.random.default_rng([seed, 99])
+    popularity = 1 / np.arange(1, len(tags) + 1)
+    popularity /= popularity.sum()
+    tag_effect = tag_rng.normal(0, 0.3, len(tags))
+    tag_json = _json_strings(tags)
+    levels = np.array(MOOD_LEVELS, dtype=object)
+    notes_json = np.array([_json_strings(NOTES[level]) for level in MOOD_LEVELS], dtype=object)
+    contexts_json = _json_strings(CONTEXT_REASONS)
+    dates = _dates(days, start)
+
+    written = 0
+    for chunk, chunk_users in _chunks(users):
+        n = len(chunk_users)
+        state = daily_state(seed, chunk, n, days, start)
+        rng = _rng(seed, "mood", chunk)
+
+        counts = rng.integers(1, entries_per_day + 1, (n, days)).ravel()
+        user_idx = np.repeat(np.repeat(np.arange(n), days), counts)
+        day_idx = np.repeat(np.tile(np.arange(days), n), counts)
+        total = len(user_idx)
+        seconds = rng.integers(7 * 3600, 23 * 3600, total)
+
+        # Draw up to 3 tags per entry, then drop repeats within an entry
+        drawn = rng.integers(0, 4, total)
+        keys = np.unique(np.repeat(np.arange(total), drawn) * len(tags)
+                         + rng.choice(len(tags), drawn.sum(), p=popularity))
+        tag_owner, flat_tags = np.divmod(keys, len(tags))
+        n_tags = np.bincount(tag_owner, minlength=total)
+        score = (state["mood"][user_idx, day_idx]
+                 + np.bincount(tag_owner, weights=tag_effect[flat_tags], minlength=total)
+                 - 0.3 * (seconds >= 21 * 3600)
+                 + rng.normal(0, 0.6, total))
+        level_idx = np.clip(np.rint(score), 1, 5).astype(int) - 1
+        note_idx = rng.integers(0, 3, total)
+        context_idx = rng.integers(0, len(CONTEXT_REASONS), total)
+
+        timestamps = dates[day_idx].astype("datetime64[s]") + seconds
+        order = np.lexsort((timestamps, user_idx))
+        stamps = np.datetime_as_string(timestamps, unit="s").tolist()
+        level_text = levels[level_idx].tolist()
+        note_text = np.concatenate(notes_json)[level_idx * 3 + note_idx].tolist()
+        context_text = contexts_json[context_idx].tolist()
+        weekday_text = np.array(WEEKDAYS, dtype=object)[(dates[day_idx].astype("int64") + 3) % 7].tolist()  # 1970-01-01 was a Thursday
+        tag_text = tag_json[flat_tags].tolist()
+        tag_starts = np.concatenate([[0], np.cumsum(n_tags)]).tolist()
+        user_starts = np.searchsorted(user_idx[order], np.arange(n + 1)).tolist()
+        order = order.tolist()
+
+        for u, user in enumerate(chunk_users):
+            lines = [
+                f'{{"timestamp": "{stamps[i]}", "mood_level": "{level_text[i]}", "notes": {note_text[i]}, '
+                f'"context_reason": {context_text[i]}, "activities": [{", ".join(tag_text[tag_starts[i]:tag_starts[i + 1]])}], '
+                f'"date": "{stamps[i][:10]}", "time": "{stamps[i][11:16]}", "day_of_week": "{weekday_text[i]}"}}\n'
+                for i in order[user_starts[u]:user_starts[u + 1]]
+            ]
+            with open(os.path.join(out, user_mood_path(user)), "w", encoding="utf-8") as f:
+                f.writelines(lines)
+        written += total
+    return written
+
+
+def write_wearables(out: str, users: Sequence[Optional[str]], days: int, seed: int = 0,
+                    start: date = START_DATE) -> int:
+    """One SQLite store per user, as core.wearable_store saves them (consent given)"""
+    os.makedirs(os.path.join(out, WEARABLE_DIR), exist_ok=True)
+    stamps = [f"{d}T07:00:00" for d in _dates(days, start).astype(str)]
+    written = 0
+    for chunk, chunk_users in _chunks(users):
+        state = daily_state(seed, chunk, len(chunk_users), days, start)
+        columns = {
+            "hrv_ms": np.round(state["hrv_ms"], 1),
+            "resting_hr": np.round(state["resting_hr"]).astype(int),
+            "sleep_minutes": np.round(state["sleep_minutes"]).astype(int),
+            "sleep_efficiency": np.round(state["sleep_efficiency"], 3),
+            "steps": np.round(state["steps"]).astype(int),
+            "active_minutes": np.round(state["active_minutes"]).astype(int),
+        }
+        for u, user in enumerate(chunk_users):
+            rows = zip(stamps, *(columns[k][u].tolist() for k in columns))
+            records = [dict(timestamp=ts, provider="synthetic", **dict(zip(columns, values))) for ts, *values in rows]
+            document = {
+                "consent": True,
+                "consent_updated_at": "2025-01-01T00:00:00",
+                "providers": {"synthetic": {"connected": True}},
+                "records": records,
+                "updated_at": "2025-01-01T00:00:00",
+            }
+            save_wearable_file(os.path.join(out, WEARABLE_DIR, f"wearables_{_safe_id(user, None)}.db"), document)
+            written += len(records)
+    return written
+
+
+def write_water(out: str, days: int, seed: int = 0, start: date = START_DATE) -> int:
+    """The water log is a single file shared by the whole installation, keyed by date"""
+    rng = _rng(seed, "water", 0)
+    counts = rng.integers(4, 11, days)
+    day_idx = np.repeat(np.arange(days), counts)
+    amounts = (rng.integers(3, 11, len(day_idx)) * 50).tolist()
+    seconds = np.sort(rng.integers(7 * 3600, 23 * 3600, len(day_idx)))
+    stamps = np.datetime_as_string(_dates(days, start)[day_idx].astype("datetime64[s]") + seconds, unit="s")
+    notes = np.array(["", "Morning", "After workout", "With lunch"], dtype=object)[rng.integers(0, 4, len(day_idx))]
+    log: Dict[str, list] = {}
+    for ts, amount, note in zip(stamps.tolist(), amounts, notes.tolist()):
+        log.setdefault(ts[:10], []).append({"amount_ml": amount, "timestamp": ts, "note": note})
+    with open(os.path.join(out, WATER_LOG_FILE), "w") as f:
+        json.dump(log, f, indent=2)
+    return len(day_idx)
+
+
+def write_journals(out: str, users: Sequence[Optional[str]], days: int, seed: int = 0,
+                   start: date = START_DATE) -> int:
+    """Rows of the journal_entries SQLite table used by pages/Journaling.py"""
+    sentiments = np.array(list(JOURNAL_TEXT), dtype=object)
+    dates = _dates(days, start).astype(str)
+    written = 0
+    with sqlite3.connect(os.path.join(out, JOURNAL_DB)) as conn:
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS journal_entries (
+            id TEXT PRIMARY KEY,
+            email TEXT,
+            entry TEXT,
+            sentiment TEXT,
+            date TEXT,
+            tags TEXT
+        )
+        """)
+        for chunk, chunk_users in _chunks(users):
+            state = daily_state(seed, chunk, len(chunk_users), days, start)
+            rng = _rng(seed, "journals", chunk)
+            user_idx, day_idx = np.nonzero(rng.random((len(chunk_users), days)) < 0.3)
+            mood = state["mood"][user_idx, day_idx]
+            sentiment_idx = np.where(mood >= 3.5, 0, np.where(mood >= 2.8, 1, 2))
+            text_idx = rng.integers(0, 2, len(user_idx))
+            tag_masks = rng.random((len(user_idx), len(JOURNAL_TAGS))) < 0.2
+            ids = rng.bytes(16 * len(user_idx))
+            rows = (
+                (str(uuid.UUID(bytes=ids[16 * i:16 * i + 16], version=4)), chunk_users[user_idx[i]],
+                 JOURNAL_TEXT[sentiments[sentiment_idx[i]]][text_idx[i]], sentiments[sentiment_idx[i]],
+                 dates[day_idx[i]], ", ".join(t for t, on in zip(JOURNAL_TAGS, tag_masks[i]) if on))
+                for i in range(len(user_idx))
+            )
+            conn.executemany("INSERT OR REPLACE INTO journal_entries (id, email, entry, sentiment, date, tags) "
+                             "VALUES (?, ?, ?, ?, ?, ?)", rows)
+            written += len(user_idx)
+    return written
+
+
+def write_conversations(out: str, users: Sequence[Optional[str]], days: int, seed: int = 0,
+                        start: date = START_DATE) -> int:
+    """One data/conversations_<user>.json list per user, newest first, as core.utils saves them"""
+    os.makedirs(os.path.join(out, DATA_DIR), exist_ok=True)
+    written = 0
+    for chunk, chunk_users in _chunks(users):
+        rng = _rng(seed, "conversations", chunk)
+        n_convos = rng.poisson(max(days / 14, 1), len(chunk_users))
+        for u, user in enumerate(chunk_users):
+            convo_days = np.sort(rng.integers(0, days, n_convos[u]))
+            turns = rng.integers(1, 7, n_convos[u])
+            conversations = []
+            for convo_id, (day, n_turns) in enumerate(zip(convo_days.tolist(), turns.tolist()), 1):
+                minute = int(rng.integers(8 * 60, 23 * 60))
+                user_lines = rng.integers(0, len(USER_MESSAGES), n_turns)
+                bot_lines = rng.integers(0, len(BOT_MESSAGES), n_turns)
+                messages = []
+                for turn in range(n_turns):
+                    clock = datetime(2000, 1, 1) + timedelta(minutes=minute + 2 * turn)
+                    time_text = clock.strftime("%I:%M %p").lstrip("0")
+                    messages.append({"sender": "user", "message": USER_MESSAGES[user_lines[turn]], "time": time_text})
+                    messages.append({"sender": "bot", "message": BOT_MESSAGES[bot_lines[turn]], "time": time_text})
+                title = messages[0]["message"]
+                conversations.insert(0, {
+                    "id": convo_id,
+                    "user_key": user,
+                    "title": title[:30] + "..." if len(title) > 30 else title,
+                    "date": (start + timedelta(days=day)).strftime("%B %d, %Y"),
+                    "messages": messages,
+                })
+                written += len(messages)
+            path = os.path.join(out, DATA_DIR, f"conversations_{_safe_id(user, None)}.json")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(json.dumps(conversations))
+    return written
+
+
+def generate(out: str, users: Sequence[Optional[str]], days: int, seed: int = 0,
+             stores: Sequence[str] = STORES, entries_per_day: int = 3, n_activities: int = 40,
+             start: date = START_DATE) -> Dict[str, int]:
+    """Write the chosen stores; returns records written per store"""
+    os.makedirs(out, exist_ok=True)
+    writers = {
+        "mood": lambda: write_mood(out, users, days, seed, entries_per_day, n_activities, start),
+        "wearables": lambda: write_wearables(out, users, days, seed, start),
+        "water": lambda: write_water(out, days, seed, start),
+        "journals": lambda: write_journals(out, users, days, seed, start),
+        "conversations": lambda: write_conversations(out, users, days, seed, start),
+    }
+    return {store: writers[store]() for store in stores}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Generate reproducible synthetic data for every tracker")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="synthetic_data", help="Directory laid out like the app's working directory")
+    parser.add_argument("--stores", nargs="+", choices=STORES, default=list(STORES))
+    parser.add_argument("--entries-per-day", type=int, default=3, help="Maximum mood entries per user and day")
+    parser.add_argument("--activities", type=int, default=40, help="Size of the activity tag vocabulary")
+    parser.add_argument("--start", type=date.fromisoformat, default=START_DATE, help="First day (YYYY-MM-DD)")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    counts = generate(args.out, user_emails(args.users), args.days, args.seed, args.stores,
+                      args.entries_per_day, args.activities, args.start)
+    for store, count in counts.items():
+        print(f"{store:<14} {count:>10,} records")
+    print(f"✅ {args.users} users x {args.days} days in {time.perf_counter() - started:.1f}s -> {args.out}",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,18 +2,27 @@
 # analytics.py: Provides analytics and insights for mood/activity data.
 import pandas as pd
 import plotly.graph_objs as go
-from typing import Tuple, List, Dict, Any
+from typing import Tuple, List, Dict, Any, Hashable, Optional
+
+from core.figure_cache import cached_figure
+from core.mood_stats import MoodStats
+from core.activity_matrix import activity_mood_stats
 
 # Example: mood_log should be a DataFrame with columns: ['timestamp', 'mood_score']
 # timestamp: datetime, mood_score: int or float
 
-def analyze_mood_trends(mood_log: pd.DataFrame) -> Dict[str, Any]:
+def analyze_mood_trends(mood_log: pd.DataFrame, cache_key: Optional[Hashable] = None,
+                        stats: Optional[MoodStats] = None) -> Dict[str, Any]:
     """
     Analyze mood trends using rolling averages and day/time patterns.
     Returns a dictionary with insights, recommendations, and charts.
 
     Args:
         mood_log (pd.DataFrame): DataFrame with columns ['timestamp', 'mood_score']
+        cache_key: Identifies this exact data (e.g. user and data version) so the
+            chart can be reused from the figure cache; None always rebuilds it
+        stats: Online statistics kept up to date by the caller (see
+            core.mood_stats); built from mood_log when not given
 
     Returns:
         dict: {"insights": list, "recommendations": list, "charts": [plotly.Figure]}
@@ -21,45 +30,25 @@ def analyze_mood_trends(mood_log: pd.DataFrame) -> Dict[str, Any]:
     if mood_log.empty:
         return {"insights": [], "recommendations": [], "charts": []}
 
-    # Copy to avoid mutating input
-    mood_log = mood_log.copy()
-    mood_log['timestamp'] = pd.to_datetime(mood_log['timestamp'])
-    mood_log['day_of_week'] = mood_log['timestamp'].dt.day_name()
-    mood_log['hour'] = mood_log['timestamp'].dt.hour
-
-    # Calculate rolling average (7-day window)
-    mood_log = mood_log.sort_values('timestamp')
-    mood_log['rolling_avg'] = mood_log['mood_score'].rolling(window=7, min_periods=1).mean()
-
-    # Analyze mood by day of week
-    dow_avg = mood_log.groupby('day_of_week')['mood_score'].mean().sort_values()
-    lowest_day = dow_avg.idxmin()
-    highest_day = dow_avg.idxmax()
-
-    # Analyze mood by hour of day
-    hod_avg = mood_log.groupby('hour')['mood_score'].mean().sort_values()
-    lowest_hour = hod_avg.idxmin()
-    highest_hour = hod_avg.idxmax()
-
-    insights = [
-        f"Your average mood is lowest on {lowest_day} (score: {dow_avg[lowest_day]:.2f}).",
-        f"Your average mood is highest on {highest_day} (score: {dow_avg[highest_day]:.2f}).",
-        f"Mood tends to dip at {lowest_hour}:00 (score: {hod_avg[lowest_hour]:.2f}).",
-        f"Mood peaks at {highest_hour}:00 (score: {hod_avg[highest_hour]:.2f})."
-    ]
-
-    # Generate simple recommendations based on analysis
-    recommendations = []
-    if dow_avg[lowest_day] < dow_avg.mean() - 0.5:
-        recommendations.append(f"Consider scheduling a Focus Session or Yoga on {lowest_day}.")
-    if hod_avg[lowest_hour] < hod_avg.mean() - 0.5:
-        recommendations.append(f"Try a Breathing Exercise around {lowest_hour}:00 when mood dips.")
+    # Weekday/hour means and the EW trend come from the accumulators
+    if stats is None:
+        stats = MoodStats.from_frame(mood_log)
+    insights = stats.insights()
+    recommendations = stats.recommendations()
 
     # Create Plotly line chart for mood and rolling average
-    chart = go.Figure()
-    chart.add_trace(go.Scatter(x=mood_log['timestamp'], y=mood_log['mood_score'], mode='lines+markers', name='Mood Score'))
-    chart.add_trace(go.Scatter(x=mood_log['timestamp'], y=mood_log['rolling_avg'], mode='lines', name='7-Day Rolling Avg'))
-    chart.update_layout(title='Mood Over Time', xaxis_title='Date', yaxis_title='Mood Score')
+    def build_chart():
+        df = mood_log.copy()
+        df['timestamp'] = pd.to_datetime(df['timestamp'])
+        df = df.sort_values('timestamp')
+        df['rolling_avg'] = df['mood_score'].rolling(window=7, min_periods=1).mean()
+        chart = go.Figure()
+        chart.add_trace(go.Scatter(x=df['timestamp'], y=df['mood_score'], mode='lines+markers', name='Mood Score'))
+        chart.add_trace(go.Scatter(x=df['timestamp'], y=df['rolling_avg'], mode='lines', name='7-Day Rolling Avg'))
+        chart.update_layout(title='Mood Over Time', xaxis_title='Date', yaxis_title='Mood Score')
+        return chart
+
+    chart = cached_figure(None if cache_key is None else ("mood_trends", cache_key), build_chart)
 
     return {
         "insights": insights,
@@ -95,17 +84,12 @@ def analyze_activity_mood_correlation(mood_data: pd.DataFrame) -> Dict[str, Any]
         "great": 5
     }
 
-    mood_data = mood_data.copy()
-    mood_data['mood_numeric'] = mood_data['mood_level'].map(mood_mapping)
-
-    # Expand activities so each row is a single activity
-    activity_mood = mood_data.explode('activities')
+    mood_numeric = mood_data['mood_level'].astype(str).map(mood_mapping)
 
-    # Remove rows with empty or missing activities
-    activity_mood = activity_mood[activity_mood['activities'].notna()]
-    activity_mood = activity_mood[activity_mood['activities'] != '']
+    # Per-activity statistics from a sparse one-hot activity matrix
+    activity_stats = activity_mood_stats(mood_data['activities'], mood_numeric)
 
-    if activity_mood.empty:
+    if activity_stats.empty:
         return {
             "top_activities": [],
             "activity_insights": ["No activity data available for analysis."],
@@ -113,14 +97,7 @@ def analyze_activity_mood_correlation(mood_data: pd.DataFrame) -> Dict[str, Any]
             "activity_chart": None
         }
 
-    # Calculate average mood for each activity
-    activity_stats = activity_mood.groupby('activities').agg({
-        'mood_numeric': ['mean', 'count', 'std']
-    }).round(2)
-
-    # Flatten column names for easier access
-    activity_stats.columns = ['avg_mood', 'count', 'std_dev']
-    activity_stats = activity_stats.reset_index()
+    activity_stats = activity_stats.round(2)
 
     # Sort by average mood (descending) and filter activities with at least 2 occurrences
     activity_stats = activity_stats[activity_stats['count'] >= 2].sort_values('avg_mood', ascending=False)
@@ -139,11 +116,15 @@ def analyze_activity_mood_correlation(mood_data: pd.DataFrame) -> Dict[str, Any]
             avg_mood = activity['avg_mood']
             count = activity['count']
             mood_label = {1: "Very Low", 2: "Low", 3: "Okay", 4: "Good", 5: "Great"}.get(round(avg_mood), "Unknown")
-            insights.append(f"{i}. **{activity_name}** - Average mood: {mood_label} ({avg_mood:.1f}/5, {count} times)")
+            lift = f", {activity['lift']:+.1f} vs. without" if pd.notna(activity['lift']) else ""
+            insights.append(f"{i}. **{activity_name}** - Average mood: {mood_label} ({avg_mood:.1f}/5, {count} times{lift})")
 
         # Add overall insight
         best_activity = top_activities[0]['activities']
         insights.append(f"💡 **{best_activity}** has the strongest positive impact on your mood!")
+        if top_activities[0]['lift_ci_low'] > 0:
+            insights.append(f"📈 Entries with **{best_activity}** are reliably better: "
+                            f"+{top_activities[0]['lift_ci_low']:.1f} to +{top_activities[0]['lift_ci_high']:.1f} points (95% CI).")
 
         # Generate recommendations
         recommendations.append(f"🎯 Try incorporating **{best_activity}** into your routine when you need a mood boost.")
@@ -167,7 +148,10 @@ def analyze_activity_mood_correlation(mood_data: pd.DataFrame) -> Dict[str, Any]
         import plotly.express as px
 
         # Sort for better visualization
-        chart_data = activity_stats.sort_values('avg_mood', ascending=True)
+        chart_data = activity_stats.sort_values('avg_mood', ascending=True).assign(
+            ci_plus=lambda d: (d['ci_high'] - d['avg_mood']).fillna(0),
+            ci_minus=lambda d: (d['avg_mood'] - d['ci_low']).fillna(0),
+        )
 
         chart = px.bar(
             chart_data,
@@ -177,7 +161,10 @@ def analyze_activity_mood_correlation(mood_data: pd.DataFrame) -> Dict[str, Any]
             title='Activity-Mood Correlation',
             labels={'avg_mood': 'Average Mood Score', 'activities': 'Activity'},
             color='count',
-            color_continuous_scale='Blues'
+            color_continuous_scale='Blues',
+            error_x='ci_plus',
+            error_x_minus='ci_minus',
+            hover_data={'lift': ':+.2f', 'ci_plus': False, 'ci_minus': False}
         )
 
         chart.update_layout(
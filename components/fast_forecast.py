@@ -0,0 +1,119 @@
+"""
+NumPy-only exponential smoothing for daily mood series.
+
+Additive damped-trend Holt-Winters (ETS(A,Ad,A)) with a weekly season, or
+damped Holt when there are fewer than two weeks of data. Smoothing parameters
+are chosen by grid search, running the recursion for every candidate at once
+as vector operations, and prediction intervals use the analytic ETS variance.
+"""
+
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+SEASON_LENGTH = 7
+INTERVAL_Z = 1.96  # 95% prediction intervals
+MOOD_MIN, MOOD_MAX = 1.0, 5.0
+
+_ALPHAS = np.array([0.05, 0.1, 0.2, 0.3, 0.4, 0.5, 0.7, 0.9])
+_BETAS = np.array([0.0, 0.01, 0.03, 0.05, 0.1, 0.2])
+_GAMMAS = np.array([0.0, 0.05, 0.1, 0.2, 0.3])
+_PHIS = np.array([0.8, 0.9, 0.95, 0.98])
+
+
+def _parameter_grid(seasonal: bool) -> np.ndarray:
+    gammas = _GAMMAS if seasonal else np.array([0.0])
+    alpha, beta, gamma, phi = (g.ravel() for g in np.meshgrid(_ALPHAS, _BETAS, gammas, _PHIS, indexing="ij"))
+    # Usual admissible region: the trend and season adapt more slowly than the level
+    keep = (beta <= alpha) & (gamma <= 1 - alpha)
+    return np.stack([alpha[keep], beta[keep], gamma[keep], phi[keep]], axis=1)
+
+
+def _initial_state(y: np.ndarray, m: int, seasonal: bool):
+    if seasonal:
+        first, second = y[:m].mean(), y[m:2 * m].mean()
+        return first, (second - first) / m, y[:m] - first
+    trend = (y[min(len(y), m) - 1] - y[0]) / max(min(len(y), m) - 1, 1)
+    return y[0], trend, np.zeros(m)
+
+
+def _run(y: np.ndarray, params: np.ndarray, m: int, seasonal: bool):
+    """Filter y through every parameter row at once; returns SSE and final states"""
+    alpha, beta, gamma, phi = params.T
+    l0, b0, s0 = _initial_state(y, m, seasonal)
+    k = len(params)
+    level = np.full(k, l0)
+    trend = np.full(k, b0)
+    season = np.tile(s0, (k, 1))
+    sse = np.zeros(k)
+    for t, value in enumerate(y):
+        i = t % m
+        error = value - (level + phi * trend + season[:, i])
+        sse += error * error
+        level = level + phi * trend + alpha * error
+        trend = phi * trend + beta * error
+        season[:, i] += gamma * error
+    return sse, level, trend, season
+
+
+def fit_ets(y: np.ndarray, m: int = SEASON_LENGTH) -> Dict[str, Any]:
+    """Pick the smoothing parameters with the lowest one-step SSE and return the fitted state"""
+    y = np.asarray(y, dtype=float)
+    seasonal = len(y) >= 2 * m
+    params = _parameter_grid(seasonal)
+    sse, level, trend, season = _run(y, params, m, seasonal)
+    best = int(np.argmin(sse))
+    n_params = 4 + (m if seasonal else 0)
+    return {
+        "alpha": params[best, 0],
+        "beta": params[best, 1],
+        "gamma": params[best, 2],
+        "phi": params[best, 3],
+        "level": level[best],
+        "trend": trend[best],
+        "season": season[best],
+        "sigma2": sse[best] / max(len(y) - n_params, 1),
+        "n": len(y),
+        "m": m,
+        "seasonal": seasonal,
+    }
+
+
+def predict_ets(state: Dict[str, Any], horizon: int):
+    """Point forecasts and 95% interval bounds for the next `horizon` steps"""
+    h = np.arange(1, horizon + 1)
+    phi, m = state["phi"], state["m"]
+    damped = np.cumsum(phi ** h)  # phi + phi^2 + ... + phi^h
+    season = state["season"][(state["n"] + h - 1) % m]
+    mean = state["level"] + damped * state["trend"] + season
+
+    # ETS(A,Ad,A): var_h = sigma^2 * (1 + sum_{j<h} c_j^2), c_j = alpha + beta*phi_j + gamma*[j % m == 0]
+    c = state["alpha"] + state["beta"] * damped + state["gamma"] * (h % m == 0)
+    variance = state["sigma2"] * (1 + np.concatenate([[0.0], np.cumsum(c[:-1] ** 2)]))
+    half_width = INTERVAL_Z * np.sqrt(variance)
+    return mean, mean - half_width, mean + half_width
+
+
+def regularize_daily(series: pd.Series) -> pd.Series:
+    """Daily series without gaps (missing days interpolated) so weekdays line up with the season"""
+    series = series.sort_index()
+    full = pd.date_range(series.index[0], series.index[-1], freq="D")
+    return series.reindex(full).interpolate(limit_direction="both")
+
+
+def forecast_ets(mood_series: pd.Series, forecast_days: int = 7) -> Dict[str, Any]:
+    """Forecast a daily mood series; same result shape as forecast_arima"""
+    if len(mood_series) < 3:
+        return {}
+    daily = regularize_daily(mood_series)
+    state = fit_ets(daily.to_numpy(dtype=float))
+    mean, lower, upper = predict_ets(state, forecast_days)
+
+    forecast_index = pd.date_range(start=daily.index[-1] + pd.Timedelta(days=1), periods=forecast_days, freq="D")
+    return {
+        "forecast": pd.Series(np.clip(mean, MOOD_MIN, MOOD_MAX), index=forecast_index),
+        "confidence_intervals": np.clip(np.column_stack([lower, upper]), MOOD_MIN, MOOD_MAX),
+        "model_type": "Holt-Winters (damped, weekly)" if state["seasonal"] else "Holt (damped)",
+        "params": {k: float(state[k]) for k in ("alpha", "beta", "gamma", "phi")},
+    }
@@ -0,0 +1,227 @@
+"""
+Nightly batch forecasting.
+
+Forecasts every user's last 30 days of mood, detects dips and prepares
+alerts in parallel across cores, and writes the result to a small JSON file
+per user under data/forecasts/. The dashboard then only has to look the
+forecast up; it falls back to forecasting live when the user has logged
+moods since the batch ran.
+
+Usage:
+    python -m components.forecast_batch [--workers 4] [--days 7] [--threshold 2.8] [--force]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from functools import partial
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from components.predictive_analytics import (
+    FORECAST_MODEL, compute_forecast, create_forecast_chart, detect_mood_dips,
+    generate_predictive_alerts, prepare_time_series_data,
+)
+from core.mood_store import DATA_DIR, MOOD_SCORES, iter_partition, list_mood_partitions, user_mood_path, window_start
+
+FORECAST_DIR = os.path.join(DATA_DIR, "forecasts")
+CACHE_VERSION = 1
+WINDOW_DAYS = 30
+# The dashboard's forecast settings
+FORECAST_DAYS = 7
+ALERT_THRESHOLD = 2.8
+
+
+def forecast_cache_path(partition_path: str) -> str:
+    """data/mood/mood_<id>.jsonl -> data/forecasts/forecast_<id>.json"""
+    name = os.path.basename(partition_path)[len("mood_"):-len(".jsonl")]
+    return os.path.join(FORECAST_DIR, f"forecast_{name}.json")
+
+
+def partition_version(path: str) -> Tuple[int, int]:
+    """Same (size, mtime) snapshot the dashboard's MoodTracker keeps as its data_version"""
+    try:
+        stat = os.stat(path)
+        return (stat.st_size, stat.st_mtime_ns)
+    except OSError:
+        return (0, 0)
+
+
+def read_mood_log(path: str, window_days: int = WINDOW_DAYS) -> pd.DataFrame:
+    """timestamp/mood_score frame of a partition's last window_days, the same day-aligned window as the dashboard"""
+    cutoff = window_start(window_days)
+    rows = []
+    for entry in iter_partition(path):
+        try:
+            ts = datetime.fromisoformat(entry["timestamp"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if ts >= cutoff:
+            rows.append((ts, MOOD_SCORES.get(entry.get("mood_level"), 3)))
+    return pd.DataFrame(rows, columns=["timestamp", "mood_score"])
+
+
+def _load_cache(cache_path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return cached if cached.get("version") == CACHE_VERSION else None
+
+
+def _is_current(cached: Optional[Dict[str, Any]], data_version: Tuple[int, int], model: str,
+                forecast_days: int, alert_threshold: float) -> bool:
+    return (
+        cached is not None
+        and tuple(cached["data_version"]) == tuple(data_version)
+        and cached["generated_on"] == date.today().isoformat()
+        and cached["model"] == model
+        and cached["forecast_days"] == forecast_days
+        and cached["alert_threshold"] == alert_threshold
+    )
+
+
+def _round(values) -> List[float]:
+    return [round(float(v), 3) for v in values]
+
+
+def forecast_partition(path: str, forecast_days: int = FORECAST_DAYS, alert_threshold: float = ALERT_THRESHOLD,
+                       model: Optional[str] = None, force: bool = False) -> Tuple[str, str]:
+    """Forecast one partition and write its cache file; returns (path, status)"""
+    model = model or FORECAST_MODEL
+    cache_path = forecast_cache_path(path)
+    # Snapshot before reading, so an append during the read leaves the cache stale
+    data_version = partition_version(path)
+    if not force and _is_current(_load_cache(cache_path), data_version, model, forecast_days, alert_threshold):
+        return path, "unchanged"
+
+    record: Dict[str, Any] = {
+        "version": CACHE_VERSION,
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "generated_on": date.today().isoformat(),
+        "data_version": list(data_version),
+        "model": model,
+        "forecast_days": forecast_days,
+        "alert_threshold": alert_threshold,
+        "forecast": None,
+        "dips": [],
+        "alerts": [],
+    }
+    mood_series = prepare_time_series_data(read_mood_log(path))
+    forecast_result = compute_forecast(mood_series, forecast_days, model) if not mood_series.empty else {}
+    if mood_series.empty:
+        record["model_info"] = "Need at least 7 days of mood data for forecasting"
+    elif not forecast_result:
+        record["model_info"] = "Forecasting models failed to fit the data"
+    else:
+        forecast = forecast_result["forecast"]
+        intervals = forecast_result.get("confidence_intervals")
+        historical_avg = float(mood_series.mean())
+        dips = detect_mood_dips(forecast, intervals, alert_threshold)
+        record.update({
+            "model_info": f"Using {forecast_result['model_type']} model",
+            "historical_avg": round(historical_avg, 3),
+            "forecast": {
+                "dates": [d.date().isoformat() for d in forecast.index],
+                "values": _round(forecast.to_numpy()),
+                "intervals": None if intervals is None else [_round(row) for row in np.asarray(intervals)],
+            },
+            "dips": [
+                {
+                    "date": dip["date"].date().isoformat(),
+                    "predicted_mood": round(float(dip["predicted_mood"]), 3),
+                    "severity": dip["severity"],
+                    "confidence": dip["confidence"] and {k: round(float(v), 3) for k, v in dip["confidence"].items()},
+                }
+                for dip in dips
+            ],
+            "alerts": generate_predictive_alerts(dips, historical_avg),
+        })
+
+    os.makedirs(FORECAST_DIR, exist_ok=True)
+    tmp_path = cache_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(record, f, separators=(",", ":"))
+    os.replace(tmp_path, cache_path)
+    return path, "forecast" if record["forecast"] else "skipped"
+
+
+def run_batch(workers: Optional[int] = None, forecast_days: int = FORECAST_DAYS,
+              alert_threshold: float = ALERT_THRESHOLD, model: Optional[str] = None,
+              force: bool = False) -> Dict[str, str]:
+    """Forecast every user partition; returns {partition path: status}"""
+    paths = list_mood_partitions()
+    job = partial(forecast_partition, forecast_days=forecast_days, alert_threshold=alert_threshold,
+                  model=model, force=force)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(paths) <= 1:
+        return dict(map(job, paths))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunksize = max(1, len(paths) // (workers * 4))
+        return dict(executor.map(job, paths, chunksize=chunksize))
+
+
+def load_cached_prediction(user_email: Optional[str], mood_log: pd.DataFrame, data_version: Tuple[int, int],
+                           forecast_days: int = FORECAST_DAYS, alert_threshold: float = ALERT_THRESHOLD,
+                           model: Optional[str] = None, cache_key: Optional[Hashable] = None,
+                           anon_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    The batch result for the user in predict_mood_trends' shape, or None
+
+    None means there is no cache file or it was made from other data or
+    settings (data_version is the partition snapshot the caller loaded).
+    mood_log is only used to draw the history in the chart.
+    """
+    model = model or FORECAST_MODEL
+    cached = _load_cache(forecast_cache_path(user_mood_path(user_email, anon_id)))
+    if not _is_current(cached, data_version, model, forecast_days, alert_threshold):
+        return None
+    if cached["forecast"] is None:
+        return {'forecast': None, 'alerts': [], 'dips': [], 'charts': [], 'model_info': cached["model_info"]}
+
+    forecast = pd.Series(cached["forecast"]["values"], index=pd.to_datetime(cached["forecast"]["dates"]))
+    intervals = cached["forecast"]["intervals"]
+    intervals = None if intervals is None else np.asarray(intervals)
+    dips = [dict(dip, date=pd.Timestamp(dip["date"])) for dip in cached["dips"]]
+    chart = create_forecast_chart(
+        prepare_time_series_data(mood_log), forecast, intervals, dips,
+        cache_key=None if cache_key is None else (cache_key, "batch", cached["generated_at"])
+    )
+    return {
+        'forecast': forecast,
+        'alerts': cached["alerts"],
+        'dips': dips,
+        'charts': [chart],
+        'model_info': cached["model_info"],
+        'historical_avg': cached["historical_avg"],
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Precompute mood forecasts and alerts for every user")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--days", type=int, default=FORECAST_DAYS, help="Forecast horizon in days")
+    parser.add_argument("--threshold", type=float, default=ALERT_THRESHOLD, help="Mood dip alert threshold")
+    parser.add_argument("--model", choices=["ets", "arima", "prophet"], default=None)
+    parser.add_argument("--force", action="store_true", help="Recompute even if the cache is current")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    results = run_batch(args.workers, args.days, args.threshold, args.model, args.force)
+    counts: Dict[str, int] = {}
+    for status in results.values():
+        counts[status] = counts.get(status, 0) + 1
+    summary = ", ".join(f"{n} {status}" for status, n in sorted(counts.items())) or "no users"
+    print(f"✅ {len(results)} users in {time.perf_counter() - started:.1f}s: {summary}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
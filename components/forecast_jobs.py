@@ -0,0 +1,163 @@
+"""
+Background forecasting jobs.
+
+Model fits run in a bounded process pool instead of the Streamlit script
+thread. A job id is derived from the model key and the data being forecast,
+so page reruns attach to the job already in flight; until it lands, callers
+show the last finished forecast for the same key (or a placeholder). Failed
+jobs are not cached as results; they are retried after a short delay.
+"""
+
+import hashlib
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Hashable, Optional
+
+import pandas as pd
+
+from core.ttl_cache import TTLCache
+
+# Leave a core for the Streamlit server itself
+FORECAST_WORKERS = int(os.getenv("FORECAST_WORKERS", str(max(1, min(4, (os.cpu_count() or 2) - 1)))))
+# Submissions beyond this many unfinished jobs are refused until some complete
+MAX_PENDING_JOBS = int(os.getenv("FORECAST_MAX_PENDING", str(FORECAST_WORKERS * 4)))
+# A failed job (worker exception or crash) is resubmitted after this long
+FAILED_JOB_RETRY_SECONDS = 60
+
+_lock = threading.Lock()
+_executor: Optional[ProcessPoolExecutor] = None
+_jobs: Dict[str, Future] = {}
+_job_keys: Dict[str, Hashable] = {}
+# Finished results by job id, and the newest finished result per (model_key, model, days)
+_results = TTLCache(ttl=24 * 3600, maxsize=1024)
+_latest = TTLCache(ttl=24 * 3600, maxsize=256)
+# Errors of failed jobs by job id, kept only until the job may be retried
+_failures = TTLCache(ttl=FAILED_JOB_RETRY_SECONDS, maxsize=1024)
+
+
+def job_id_for(mood_series: pd.Series, forecast_days: int, model: str, model_key: Optional[Hashable]) -> str:
+    from components.predictive_analytics import series_hash
+    raw = f"{model_key!r}|{model}|{forecast_days}|{series_hash(mood_series)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def _run_forecast(mood_series: pd.Series, forecast_days: int, model: str,
+                  model_key: Optional[Hashable]) -> Dict[str, Any]:
+    """Worker entry point; each worker keeps its own fitted-model cache"""
+    from components.predictive_analytics import compute_forecast
+    result = compute_forecast(mood_series, forecast_days, model, model_key)
+    # Fitted model objects stay in the worker; only the forecast is sent back
+    return {k: v for k, v in result.items() if k != "model"}
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # Forking a process that is running Streamlit's threads can deadlock
+        _executor = ProcessPoolExecutor(max_workers=FORECAST_WORKERS,
+                                        mp_context=multiprocessing.get_context("spawn"))
+    return _executor
+
+
+def _finish(job_id: str, future: Future) -> None:
+    """Move a completed future's result into the result caches (idempotent)"""
+    global _executor
+    error = future.exception() if not future.cancelled() else None
+    with _lock:
+        if _jobs.pop(job_id, None) is None:
+            return
+        if isinstance(error, BrokenProcessPool):
+            # A worker died; start a fresh pool on the next submission
+            _executor = None
+        latest_key = _job_keys.pop(job_id)
+        if error is not None or future.cancelled():
+            print(f"Forecast job {job_id} failed: {error or 'cancelled'}")
+            _failures.set(job_id, repr(error))
+            return
+        result = future.result()
+        _results.set(job_id, result)
+        if result and latest_key is not None:
+            _latest.set(latest_key, result)
+
+
+def submit_forecast(mood_series: pd.Series, forecast_days: int, model: str,
+                    model_key: Optional[Hashable] = None) -> Optional[str]:
+    """
+    Queue a forecast and return its job id without waiting
+
+    Resubmitting the same data returns the existing job, and reruns a failed
+    one once FAILED_JOB_RETRY_SECONDS have passed. Returns None when
+    MAX_PENDING_JOBS jobs are already unfinished; the caller can retry later.
+    """
+    job_id = job_id_for(mood_series, forecast_days, model, model_key)
+    with _lock:
+        if job_id in _jobs or _results.get(job_id) is not None or _failures.get(job_id) is not None:
+            return job_id
+        if len(_jobs) >= MAX_PENDING_JOBS:
+            return None
+        future = _get_executor().submit(_run_forecast, mood_series, forecast_days, model, model_key)
+        _jobs[job_id] = future
+        _job_keys[job_id] = None if model_key is None else (model_key, model, forecast_days)
+    future.add_done_callback(lambda f: _finish(job_id, f))
+    return job_id
+
+
+def job_status(job_id: str) -> str:
+    """Job state: pending, running, done, failed or unknown (never submitted, or expired)"""
+    with _lock:
+        future = _jobs.get(job_id)
+    if future is not None:
+        if not future.done():
+            return "running" if future.running() else "pending"
+        _finish(job_id, future)
+    if _results.get(job_id) is not None:
+        return "done"
+    return "failed" if _failures.get(job_id) is not None else "unknown"
+
+
+def job_result(job_id: str, timeout: Optional[float] = 0) -> Optional[Dict[str, Any]]:
+    """
+    The job's forecast result, or None if it has not finished
+
+    timeout=0 never blocks; timeout=None waits for the job. An empty dict
+    means the forecasters could not fit the data, or that the job failed and
+    is not due for a retry yet.
+    """
+    with _lock:
+        future = _jobs.get(job_id)
+    if future is not None:
+        if timeout == 0 and not future.done():
+            return None
+        try:
+            future.exception(timeout=timeout)
+        except TimeoutError:
+            return None
+        _finish(job_id, future)
+    result = _results.get(job_id)
+    if result is None and _failures.get(job_id) is not None:
+        return {}
+    return result
+
+
+def latest_forecast(model_key: Hashable, model: str, forecast_days: int) -> Optional[Dict[str, Any]]:
+    """Most recent finished forecast for the key, whatever data it was made from"""
+    return _latest.get((model_key, model, forecast_days))
+
+
+def pending_jobs() -> int:
+    with _lock:
+        return len(_jobs)
+
+
+def shutdown(wait: bool = True) -> None:
+    """Stop the worker processes and forget in-flight jobs"""
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+        _jobs.clear()
+        _job_keys.clear()
+    if executor is not None:
+        executor.shutdown(wait=wait, cancel_futures=True)
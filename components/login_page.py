@@ -390,14 +390,14 @@ def show_login_page():
                     try:
                         success, updated_at = check_user(email)
                         if success:
-                            mail_status = send_reset_email(email,create_reset_token(email,updated_at))
-                            if mail_status: 
-                                st.success("Password Email sent!")
+                            queued, mail_message = send_reset_email(email,create_reset_token(email,updated_at))
+                            if queued:
+                                st.success("Password reset email is on its way! It can take a few minutes to arrive.")
                                 st.session_state.show_forget_page = False
                                 st.session_state.notify_page=True
                                 st.rerun()
                             else:
-                                st.error("**Error while Sending Email!**")
+                                st.error(f"**Error while Sending Email!** {mail_message}")
                         else:
                             st.error("**User does not exist ! Please Sign Up First**")
                     except Exception as e:
@@ -3,60 +3,75 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
-import json
 import os
 from collections import Counter, defaultdict
 from components.analytics import analyze_mood_trends, analyze_activity_mood_correlation
 from components.predictive_analytics import predict_mood_trends
+from components.forecast_batch import load_cached_prediction
 from components.weather_correlation import render_weather_mood_analysis
 from components.physio_correlation import correlate_mood_with_physio
-from core.wearable_store import load_user_wearables
+from core.wearable_store import load_wearable_rollup, wearable_data_version
+from core.mood_store import (
+    MOOD_LABELS, MOOD_LEVELS, MOOD_SCORES, adopt_unattributed_moods, append_mood_entry, ensure_migrated,
+    load_user_moods, normalize_entry, rewrite_user_moods, user_mood_path, window_start,
+)
+from core.mood_rollups import WEEKDAYS, MoodRollups, tally_means
+from core.mood_stats import MoodStats
+from core.figure_cache import cached_figure
+from core.mood_export import days_to_start, stream_export
 
 class MoodTracker:
-    def __init__(self):
-        self.data_file = "data/mood_data.json"
+    def __init__(self, user_email=None):
+        if user_email is None:
+            user_email = st.session_state.get("user_profile", {}).get("email")
+        self.user_email = user_email
+        self.data_file = user_mood_path(user_email)
+        # Typed, time-sorted frame of every entry; built lazily, then appended to
+        self._mood_df = None
+        self._rollups = None
+        # days -> (window start, MoodStats of the entries since then)
+        self._window_stats = {}
         self.ensure_data_directory()
         self.load_mood_data()
     
     def ensure_data_directory(self):
-        """Ensure the data directory exists"""
-        os.makedirs("data", exist_ok=True)
+        """Ensure the mood store exists and is migrated to the per-user layout"""
+        ensure_migrated()
     
     def load_mood_data(self):
-        """Load mood data from JSON file"""
-        if os.path.exists(self.data_file):
-            try:
-                with open(self.data_file, 'r') as f:
-                    st.session_state.mood_data = json.load(f)
-                # Migrate existing data to include new fields
-                self.migrate_old_data()
-            except:
-                st.session_state.mood_data = []
-        else:
+        """Load this user's mood entries from their partition"""
+        try:
+            if self.user_email:
+                # Entries from the old shared file belong to the first account that signs in
+                adopt_unattributed_moods(self.user_email)
+            st.session_state.mood_data = load_user_moods(self.user_email)
+        except OSError:
             st.session_state.mood_data = []
+        self._mood_df = None
+        self._rollups = None
+        self._window_stats = {}
+        self.migrate_old_data()
+        self._update_data_version()
     
     def migrate_old_data(self):
         """Migrate old mood data to include new fields"""
+        changed = False
         for entry in st.session_state.mood_data:
-            # Add context_reason if missing
-            if 'context_reason' not in entry:
-                entry['context_reason'] = "No specific reason"
-            
-            # Add activities if missing
-            if 'activities' not in entry:
-                entry['activities'] = []
-            
-            # Ensure activities is a list
-            if not isinstance(entry['activities'], list):
-                entry['activities'] = []
+            before = (entry.get('context_reason'), entry.get('activities'))
+            normalize_entry(entry)
+            changed = changed or before != (entry['context_reason'], entry['activities'])
         
-        # Save migrated data
-        self.save_mood_data()
+        # Only rewrite the partition if an entry actually needed new fields
+        if changed:
+            self.save_mood_data()
     
     def save_mood_data(self):
-        """Save mood data to JSON file"""
-        with open(self.data_file, 'w') as f:
-            json.dump(st.session_state.mood_data, f, indent=2)
+        """Rewrite this user's partition with the in-memory entries"""
+        rewrite_user_moods(self.user_email, st.session_state.mood_data)
+        self._mood_df = None
+        self._rollups = None
+        self._window_stats = {}
+        self._update_data_version()
     
     def add_mood_entry(self, mood_level, notes="", context_reason="", activities=None, timestamp=None):
         """Add a new mood entry with enhanced context"""
@@ -66,202 +81,144 @@ class MoodTracker:
         if activities is None:
             activities = []
         
+        parsed = datetime.fromisoformat(timestamp)
         entry = {
             "timestamp": timestamp,
             "mood_level": mood_level,
             "notes": notes,
             "context_reason": context_reason,
             "activities": activities,
-            "date": datetime.fromisoformat(timestamp).strftime("%Y-%m-%d"),
-            "time": datetime.fromisoformat(timestamp).strftime("%H:%M"),
-            "day_of_week": datetime.fromisoformat(timestamp).strftime("%A")
+            "date": parsed.strftime("%Y-%m-%d"),
+            "time": parsed.strftime("%H:%M"),
+            "day_of_week": parsed.strftime("%A")
         }
         
         st.session_state.mood_data.append(entry)
-        self.save_mood_data()
+        append_mood_entry(self.user_email, entry)
+        self._update_data_version()
+        if self._mood_df is not None:
+            self._mood_df = self._append_to_frame(self._mood_df, entry)
+        if self._rollups is not None:
+            self._rollups.add(entry)
+        for start, stats in self._window_stats.values():
+            if parsed >= start:
+                stats.add(entry)
+    
+    def _build_frame(self, entries, categories=None):
+        """Typed frame for entries: datetime index, categorical mood level, numeric score"""
+        df = pd.DataFrame(entries)
+        index = pd.DatetimeIndex(pd.to_datetime(df['timestamp'], format='ISO8601', errors='coerce'))
+        df.index = index.rename(None)
+        df = df[index.notna()]
+        
+        levels = df['mood_level']
+        if categories is None:
+            categories = MOOD_LEVELS + sorted(set(levels.dropna()) - set(MOOD_LEVELS))
+        df['mood_numeric'] = levels.map(MOOD_SCORES).fillna(3).astype(int)
+        df['mood_label'] = levels.map(lambda level: MOOD_LABELS.get(level, level))
+        df['mood_level'] = pd.Categorical(levels, categories=categories)
+        df['datetime'] = df.index
+        df['date'] = df.index.normalize()
+        df['hour'] = df.index.hour
+        return df.sort_index(kind='stable')
+    
+    def _append_to_frame(self, df, entry):
+        if df.empty:
+            return self._build_frame([entry])
+        categories = list(df['mood_level'].cat.categories)
+        if entry['mood_level'] not in categories:
+            categories.append(entry['mood_level'])
+            df = df.assign(mood_level=df['mood_level'].cat.set_categories(categories))
+        row = self._build_frame([entry], categories)
+        combined = pd.concat([df, row])
+        if not row.empty and row.index[0] < df.index[-1]:
+            # Back-dated entry; everything else arrives in order
+            combined = combined.sort_index(kind='stable')
+        return combined
+    
+    def get_full_mood_dataframe(self):
+        """All entries as a typed DataFrame sorted by time (cached per tracker)"""
+        if self._mood_df is None:
+            entries = st.session_state.mood_data
+            self._mood_df = self._build_frame(entries) if entries else pd.DataFrame()
+        return self._mood_df
+    
+    def _update_data_version(self):
+        """Snapshot the partition's size and mtime, which change on every append or rewrite"""
+        try:
+            stat = os.stat(self.data_file)
+            self.data_version = (stat.st_size, stat.st_mtime_ns)
+        except OSError:
+            self.data_version = (0, 0)
+    
+    def figure_key(self, chart, *params):
+        """Figure cache key for a chart of this user's current data and view"""
+        # Windows like "last 7 days" move with the calendar day as well as the data
+        return (self.user_email, self.data_version, datetime.now().date(), chart) + params
+    
+    def get_mood_rollups(self):
+        """Daily aggregates of all entries (cached per tracker)"""
+        if self._rollups is None:
+            self._rollups = MoodRollups(st.session_state.mood_data)
+        return self._rollups
+    
+    def get_mood_stats(self, days=30):
+        """Weekday/hour statistics and EW trend of the last N days (the entries get_mood_dataframe(days) shows)
+
+        Built from the frame once per window start, which moves with the
+        calendar day; add_mood_entry then updates it online in O(1).
+        """
+        start = window_start(days)
+        cached = self._window_stats.get(days)
+        if cached is None or cached[0] != start:
+            df = self.get_mood_dataframe(days)
+            frame = (df[['timestamp', 'mood_numeric']].rename(columns={'mood_numeric': 'mood_score'})
+                     if not df.empty else pd.DataFrame(columns=['timestamp', 'mood_score']))
+            cached = (start, MoodStats.from_frame(frame))
+            self._window_stats[days] = cached
+        return cached[1]
     
     def get_mood_dataframe(self, days=30):
         """Get mood data as pandas DataFrame for the last N days"""
-        if not st.session_state.mood_data:
+        df = self.get_full_mood_dataframe()
+        if df.empty:
             return pd.DataFrame()
         
-        cutoff_date = datetime.now() - timedelta(days=days)
-        recent_data = [
-            entry for entry in st.session_state.mood_data
-            if datetime.fromisoformat(entry["timestamp"]) >= cutoff_date
-        ]
-        
-        if not recent_data:
+        # The index is sorted, so the window is a binary-searched slice
+        # Same day-aligned window as the rollups and exports
+        cutoff_date = pd.Timestamp(window_start(days))
+        recent = df.loc[cutoff_date:]
+        if recent.empty:
             return pd.DataFrame()
-        
-        df = pd.DataFrame(recent_data)
-        df['datetime'] = pd.to_datetime(df['timestamp'])
-        df['date'] = pd.to_datetime(df['date'])
-        return df.sort_values('datetime')
-    
-    def export_mood_data_csv(self, days=None):
-        """Export mood data as CSV string for the specified number of days"""
-        if days is not None:
-            df = self.get_mood_dataframe(days)
-        else:
-            # Export all data
-            if not st.session_state.mood_data:
-                return ""
-            df = pd.DataFrame(st.session_state.mood_data)
-            df['datetime'] = pd.to_datetime(df['timestamp'])
-            df['date'] = pd.to_datetime(df['date'])
-            df = df.sort_values('datetime')
-        
-        if df.empty:
-            return ""
-        
-        # Convert activities list to comma-separated string for CSV
-        df_export = df.copy()
-        df_export['activities'] = df_export['activities'].apply(lambda x: ', '.join(x) if isinstance(x, list) else str(x))
-        
-        # Select and reorder columns for export
-        export_columns = ['date', 'time', 'day_of_week', 'mood_level', 'notes', 'context_reason', 'activities', 'timestamp']
-        df_export = df_export[export_columns]
-        
-        return df_export.to_csv(index=False)
-    
-    def export_mood_data_json(self, days=None):
-        """Export mood data as JSON string for the specified number of days"""
-        if days is not None:
-            df = self.get_mood_dataframe(days)
-            if df.empty:
-                return "[]"
-            export_data = df.to_dict('records')
-        else:
-            # Export all data
-            if not st.session_state.mood_data:
-                return "[]"
-            export_data = st.session_state.mood_data
-        
-        return json.dumps(export_data, indent=2)
+        return recent.copy()
     
     def get_mood_numeric(self, mood_level):
         """Convert mood level to numeric value for analysis"""
-        mood_mapping = {
-            "very_low": 1,
-            "low": 2,
-            "okay": 3,
-            "good": 4,
-            "great": 5
-        }
-        return mood_mapping.get(mood_level, 3)
+        return MOOD_SCORES.get(mood_level, 3)
     
     def get_mood_label(self, mood_level):
         """Convert mood level to display label"""
-        mood_labels = {
-            "very_low": "😔 Very Low",
-            "low": "😐 Low",
-            "okay": "😊 Okay",
-            "good": "😄 Good",
-            "great": "🌟 Great"
-        }
-        return mood_labels.get(mood_level, mood_level)
+        return MOOD_LABELS.get(mood_level, mood_level)
+    
+    def stream_export(self, fmt="csv", days=None, start=None, end=None, compress=False):
+        """Stream this user's export as encoded chunks (see core.mood_export.stream_export)"""
+        if days is not None:
+            start = days_to_start(days)
+        return stream_export(self.user_email, fmt, start=start, end=end, compress=compress)
     
     def export_mood_data_csv(self, days=None):
         """Export mood data as CSV string for download"""
         if not st.session_state.mood_data:
             return ""
-        
-        # Filter data if days specified
-        data_to_export = st.session_state.mood_data
-        if days is not None:
-            cutoff_date = datetime.now() - timedelta(days=days)
-            data_to_export = [
-                entry for entry in st.session_state.mood_data
-                if datetime.fromisoformat(entry["timestamp"]) >= cutoff_date
-            ]
-        
-        if not data_to_export:
-            return ""
-        
-        # Convert to DataFrame for easy CSV export
-        df = pd.DataFrame(data_to_export)
-        
-        # Add numeric mood column for analysis
-        df['mood_numeric'] = df['mood_level'].apply(self.get_mood_numeric)
-        df['mood_label'] = df['mood_level'].apply(self.get_mood_label)
-        
-        # Convert activities list to string for CSV compatibility
-        df['activities'] = df['activities'].apply(lambda x: ', '.join(x) if isinstance(x, list) else str(x))
-        
-        # Reorder columns for better readability
-        columns_order = ['date', 'time', 'day_of_week', 'mood_level', 'mood_label', 'mood_numeric', 
-                        'notes', 'context_reason', 'activities', 'timestamp']
-        df = df[columns_order]
-        
-        # Convert to CSV string
-        return df.to_csv(index=False)
+        data = b"".join(self.stream_export("csv", days)).decode("utf-8")
+        # Header only means nothing fell in the window
+        return data if data.count("\n") > 1 else ""
     
     def export_mood_data_json(self, days=None):
         """Export mood data as JSON string for download"""
         if not st.session_state.mood_data:
             return "[]"
-        
-        # Filter data if days specified
-        data_to_export = st.session_state.mood_data
-        if days is not None:
-            cutoff_date = datetime.now() - timedelta(days=days)
-            data_to_export = [
-                entry for entry in st.session_state.mood_data
-                if datetime.fromisoformat(entry["timestamp"]) >= cutoff_date
-            ]
-        
-        if not data_to_export:
-            return "[]"
-        
-        # Add additional computed fields for analysis
-        enhanced_data = []
-        for entry in data_to_export:
-            enhanced_entry = entry.copy()
-            enhanced_entry['mood_numeric'] = self.get_mood_numeric(entry['mood_level'])
-            enhanced_entry['mood_label'] = self.get_mood_label(entry['mood_level'])
-            enhanced_data.append(enhanced_entry)
-        
-        # Sort by timestamp (most recent first)
-        enhanced_data.sort(key=lambda x: x['timestamp'], reverse=True)
-        
-        return json.dumps(enhanced_data, indent=2)
-    
-    def get_export_summary(self, days=None):
-        """Get summary of data being exported"""
-        if not st.session_state.mood_data:
-            return {"total_entries": 0, "date_range": "No data", "file_size": "0 KB"}
-        
-        # Filter data if days specified
-        data_to_export = st.session_state.mood_data
-        if days is not None:
-            cutoff_date = datetime.now() - timedelta(days=days)
-            data_to_export = [
-                entry for entry in st.session_state.mood_data
-                if datetime.fromisoformat(entry["timestamp"]) >= cutoff_date
-            ]
-        
-        if not data_to_export:
-            return {"total_entries": 0, "date_range": "No data in range", "file_size": "0 KB"}
-        
-        total_entries = len(data_to_export)
-        
-        # Get date range
-        timestamps = [datetime.fromisoformat(entry["timestamp"]) for entry in data_to_export]
-        start_date = min(timestamps).strftime("%Y-%m-%d")
-        end_date = max(timestamps).strftime("%Y-%m-%d")
-        date_range = f"{start_date} to {end_date}"
-        
-        # Estimate file size (rough calculation)
-        json_size = len(self.export_mood_data_json(days)) / 1024  # KB
-        csv_size = len(self.export_mood_data_csv(days)) / 1024    # KB
-        
-        return {
-            "total_entries": total_entries,
-            "date_range": date_range,
-            "json_size": ".1f",
-            "csv_size": ".1f"
-        }
+        return b"".join(self.stream_export("json", days)).decode("utf-8")
 
 def render_mood_dashboard():
     """Render the main mood tracking dashboard"""
@@ -301,8 +258,9 @@ def render_mood_dashboard():
             st.rerun()
     
     # Initialize mood tracker
-    if "mood_tracker" not in st.session_state:
-        st.session_state.mood_tracker = MoodTracker()
+    current_email = st.session_state.get("user_profile", {}).get("email")
+    if "mood_tracker" not in st.session_state or st.session_state.mood_tracker.user_email != current_email:
+        st.session_state.mood_tracker = MoodTracker(current_email)
     
     tracker = st.session_state.mood_tracker
     
@@ -361,52 +319,54 @@ def render_mood_history(tracker):
         return
     
     # Apply mood filter
+    selected_level = None
     if mood_filter != "All moods":
         mood_level_map = {"Very Low": "very_low", "Low": "low", "Okay": "okay", "Good": "good", "Great": "great"}
-        df = df[df['mood_level'] == mood_level_map[mood_filter]]
+        selected_level = mood_level_map[mood_filter]
+        df = df[df['mood_level'] == selected_level]
     
     if df.empty:
         st.markdown(f'<div style="color: black;">No {mood_filter.lower()} mood entries found for the selected period.</div>', unsafe_allow_html=True)
         return
     
-    # Add numeric mood values for charts
-    df['mood_numeric'] = df['mood_level'].apply(tracker.get_mood_numeric)
-    df['mood_label'] = df['mood_level'].apply(tracker.get_mood_label)
-    
     # Line chart for mood over time
     st.markdown("#### 📈 Mood Trend Over Time")
-    fig_line = px.line(
-        df, 
-        x='datetime', 
-        y='mood_numeric',
-        title="Mood Progression",
-        labels={'mood_numeric': 'Mood Level', 'datetime': 'Date'},
-        markers=True
-    )
-    fig_line.update_yaxes(tickvals=[1, 2, 3, 4, 5], 
-                         ticktext=['😔 Very Low', '😐 Low', '😊 Okay', '😄 Good', '🌟 Great'],
-                         tickfont=dict(color='black'))
-    fig_line.update_xaxes(tickfont=dict(color='black'))
-    fig_line.update_layout(
-        height=400,
-        plot_bgcolor='rgba(255, 255, 255, 0.1)',
-        paper_bgcolor='rgba(255, 255, 255, 0.05)',
-        font=dict(color='black'),
-        title=dict(font=dict(size=18, color='black')),
-        xaxis=dict(
-            gridcolor='rgba(255, 255, 255, 0.1)',
-            linecolor='rgba(255, 255, 255, 0.2)',
-            showline=True,
-            linewidth=1
-        ),
-        yaxis=dict(
-            gridcolor='rgba(255, 255, 255, 0.1)',
-            linecolor='rgba(255, 255, 255, 0.2)',
-            showline=True,
-            linewidth=1
-        ),
-        margin=dict(l=50, r=50, t=80, b=50)
-    )
+    def build_line_chart():
+        fig_line = px.line(
+            df, 
+            x='datetime', 
+            y='mood_numeric',
+            title="Mood Progression",
+            labels={'mood_numeric': 'Mood Level', 'datetime': 'Date'},
+            markers=True
+        )
+        fig_line.update_yaxes(tickvals=[1, 2, 3, 4, 5], 
+                             ticktext=['😔 Very Low', '😐 Low', '😊 Okay', '😄 Good', '🌟 Great'],
+                             tickfont=dict(color='black'))
+        fig_line.update_xaxes(tickfont=dict(color='black'))
+        fig_line.update_layout(
+            height=400,
+            plot_bgcolor='rgba(255, 255, 255, 0.1)',
+            paper_bgcolor='rgba(255, 255, 255, 0.05)',
+            font=dict(color='black'),
+            title=dict(font=dict(size=18, color='black')),
+            xaxis=dict(
+                gridcolor='rgba(255, 255, 255, 0.1)',
+                linecolor='rgba(255, 255, 255, 0.2)',
+                showline=True,
+                linewidth=1
+            ),
+            yaxis=dict(
+                gridcolor='rgba(255, 255, 255, 0.1)',
+                linecolor='rgba(255, 255, 255, 0.2)',
+                showline=True,
+                linewidth=1
+            ),
+            margin=dict(l=50, r=50, t=80, b=50)
+        )
+        return fig_line
+    
+    fig_line = cached_figure(tracker.figure_key("history_trend", days, mood_filter), build_line_chart)
     
     # Create a box-like container for the chart
     with st.container():
@@ -426,36 +386,46 @@ def render_mood_history(tracker):
     
     # Bar chart for mood distribution
     st.markdown("#### 📊 Mood Distribution")
-    mood_counts = df['mood_label'].value_counts()
-    fig_bar = px.bar(
-        x=mood_counts.values,
-        y=mood_counts.index,
-        orientation='h',
-        title="Mood Frequency",
-        labels={'x': 'Count', 'y': 'Mood Level'}
-    )
-    fig_bar.update_xaxes(tickfont=dict(color='black'))
-    fig_bar.update_yaxes(tickfont=dict(color='black'))
-    fig_bar.update_layout(
-        height=300,
-        plot_bgcolor='rgba(255, 255, 255, 0.1)',
-        paper_bgcolor='rgba(255, 255, 255, 0.05)',
-        font=dict(color='black'),
-        title=dict(font=dict(size=18, color='black')),
-        xaxis=dict(
-            gridcolor='rgba(255, 255, 255, 0.1)',
-            linecolor='rgba(255, 255, 255, 0.2)',
-            showline=True,
-            linewidth=1
-        ),
-        yaxis=dict(
-            gridcolor='rgba(255, 255, 255, 0.1)',
-            linecolor='rgba(255, 255, 255, 0.2)',
-            showline=True,
-            linewidth=1
-        ),
-        margin=dict(l=50, r=50, t=80, b=50)
-    )
+    rollups = tracker.get_mood_rollups()
+    level_counts = rollups.summary(days)["levels"]
+    if selected_level is not None:
+        level_counts = {selected_level: level_counts[selected_level]}
+    mood_counts = pd.Series(
+        {tracker.get_mood_label(level): count for level, count in level_counts.items() if count}
+    ).sort_values(ascending=False)
+    def build_bar_chart():
+        fig_bar = px.bar(
+            x=mood_counts.values,
+            y=mood_counts.index,
+            orientation='h',
+            title="Mood Frequency",
+            labels={'x': 'Count', 'y': 'Mood Level'}
+        )
+        fig_bar.update_xaxes(tickfont=dict(color='black'))
+        fig_bar.update_yaxes(tickfont=dict(color='black'))
+        fig_bar.update_layout(
+            height=300,
+            plot_bgcolor='rgba(255, 255, 255, 0.1)',
+            paper_bgcolor='rgba(255, 255, 255, 0.05)',
+            font=dict(color='black'),
+            title=dict(font=dict(size=18, color='black')),
+            xaxis=dict(
+                gridcolor='rgba(255, 255, 255, 0.1)',
+                linecolor='rgba(255, 255, 255, 0.2)',
+                showline=True,
+                linewidth=1
+            ),
+            yaxis=dict(
+                gridcolor='rgba(255, 255, 255, 0.1)',
+                linecolor='rgba(255, 255, 255, 0.2)',
+                showline=True,
+                linewidth=1
+            ),
+            margin=dict(l=50, r=50, t=80, b=50)
+        )
+        return fig_bar
+    
+    fig_bar = cached_figure(tracker.figure_key("history_distribution", days, mood_filter), build_bar_chart)
     
     # Create a box-like container for the chart
     with st.container():
@@ -475,8 +445,7 @@ def render_mood_history(tracker):
     
     # Daily mood summary
     st.markdown("#### 📅 Daily Mood Summary")
-    daily_mood = df.groupby('date')['mood_numeric'].mean().reset_index()
-    daily_mood['date'] = pd.to_datetime(daily_mood['date'])
+    daily_mood = rollups.daily_frame(days, mood_level=selected_level).rename(columns={'mean': 'mood_numeric'})
     daily_mood['mood_label'] = daily_mood['mood_numeric'].apply(
         lambda x: tracker.get_mood_label({1: "very_low", 2: "low", 3: "okay", 4: "good", 5: "great"}.get(round(x), "okay"))
     )
@@ -528,7 +497,7 @@ def render_mood_history(tracker):
     with col1:
         export_format = st.selectbox(
             "Export Format",
-            ["CSV", "JSON"],
+            ["CSV", "JSON", "JSON Lines"],
             help="Choose the format for your exported data"
         )
     
@@ -538,6 +507,8 @@ def render_mood_history(tracker):
             ["All Data", "Last 7 days", "Last 30 days", "Last 90 days"],
             help="Choose which data to export"
         )
+        compress_export = st.checkbox("Compress (gzip)", value=False,
+                                      help="Smaller download for long histories")
     
     # Export buttons
     col1, col2, col3 = st.columns([1, 1, 2])
@@ -562,7 +533,7 @@ def render_mood_history(tracker):
                     date_range = f"{preview_df['date'].min().strftime('%Y-%m-%d')} to {preview_df['date'].max().strftime('%Y-%m-%d')}"
                     st.metric("Date Range", date_range)
                 with col_c:
-                    avg_mood = preview_df['mood_level'].apply(tracker.get_mood_numeric).mean()
+                    avg_mood = preview_df['mood_numeric'].mean()
                     st.metric("Avg Mood", f"{avg_mood:.1f}/5")
                 
                 # Show sample of data
@@ -575,47 +546,34 @@ def render_mood_history(tracker):
     with col2:
         export_button_text = f"📥 Export as {export_format}"
         if st.button(export_button_text, use_container_width=True, type="primary"):
-            # Get the data to export
-            if export_period == "All Data":
-                if export_format == "CSV":
-                    export_data = tracker.export_mood_data_csv()
-                    file_extension = "csv"
-                    mime_type = "text/csv"
-                else:  # JSON
-                    export_data = tracker.export_mood_data_json()
-                    file_extension = "json"
-                    mime_type = "application/json"
-            else:
-                days_map = {"Last 7 days": 7, "Last 30 days": 30, "Last 90 days": 90}
-                days = days_map[export_period]
-                if export_format == "CSV":
-                    export_data = tracker.export_mood_data_csv(days)
-                    file_extension = "csv"
-                    mime_type = "text/csv"
-                else:  # JSON
-                    export_data = tracker.export_mood_data_json(days)
-                    file_extension = "json"
-                    mime_type = "application/json"
+            days_map = {"Last 7 days": 7, "Last 30 days": 30, "Last 90 days": 90}
+            days = days_map.get(export_period)  # None exports everything
+            fmt, file_extension, mime_type = {
+                "CSV": ("csv", "csv", "text/csv"),
+                "JSON": ("json", "json", "application/json"),
+                "JSON Lines": ("jsonl", "jsonl", "application/jsonl"),
+            }[export_format]
+            if compress_export:
+                file_extension += ".gz"
+                mime_type = "application/gzip"
             
-            if export_data:
+            entry_count = tracker.get_mood_rollups().summary(days)["count"]
+            if entry_count:
                 # Create filename with timestamp
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                 filename = f"mood_data_{export_period.lower().replace(' ', '_')}_{timestamp}.{file_extension}"
                 
-                # Create download button
+                # The export is generated from the stream only when the download starts
                 st.download_button(
                     label=f"⬇️ Download {filename}",
-                    data=export_data,
+                    data=lambda: b"".join(tracker.stream_export(fmt, days, compress=compress_export)),
                     file_name=filename,
                     mime=mime_type,
                     use_container_width=True
                 )
                 
                 st.success(f"✅ Ready to download {filename}")
-                
-                # Show file size estimate
-                file_size_kb = len(export_data.encode('utf-8')) / 1024
-                st.info(f"📁 File size: {file_size_kb:.1f} KB")
+                st.info(f"📁 {entry_count} mood entries")
             else:
                 st.error("❌ No data available to export")
     
@@ -624,6 +582,8 @@ def render_mood_history(tracker):
         **💡 Export Tips:**
         - CSV format works well with Excel, Google Sheets
         - JSON format preserves all data structure
+        - JSON Lines (one entry per line) suits scripts and large histories
+        - Tick "Compress" to download a much smaller .gz file
         - Use "All Data" for complete backup
         - Exported files include all mood details and activities
         """)
@@ -632,70 +592,70 @@ def render_mood_analytics(tracker):
     """Render mood analytics and statistics"""
     st.markdown("### 📊 Mood Analytics")
     
-    df = tracker.get_mood_dataframe(30)  # Last 30 days
+    summary = tracker.get_mood_rollups().summary(30)  # Last 30 days
     
-    if df.empty:
+    if not summary["count"]:
         st.info("No mood data available for analytics.")
         return
     
-    df['mood_numeric'] = df['mood_level'].apply(tracker.get_mood_numeric)
-    
     # Key statistics
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        avg_mood = df['mood_numeric'].mean()
+        avg_mood = summary["mean"]
         st.metric("Average Mood", f"{avg_mood:.1f}/5", f"{avg_mood:.1f}")
     
     with col2:
-        total_entries = len(df)
+        total_entries = summary["count"]
         st.metric("Total Entries", total_entries)
     
     with col3:
-        most_frequent = df['mood_level'].mode().iloc[0] if not df['mood_level'].mode().empty else "N/A"
+        most_frequent = summary["levels"].most_common(1)[0][0]
         st.metric("Most Frequent Mood", tracker.get_mood_label(most_frequent))
     
     with col4:
-        mood_range = df['mood_numeric'].max() - df['mood_numeric'].min()
+        mood_range = summary["max"] - summary["min"]
         st.metric("Mood Range", f"{mood_range:.1f}")
     
     st.markdown("---")
     
     # Mood by day of week
     st.markdown("#### 📅 Mood by Day of Week")
-    day_mood = df.groupby('day_of_week')['mood_numeric'].mean().reindex([
-        'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'
-    ]).dropna()
-    
-    fig_day = px.bar(
-        x=day_mood.index,
-        y=day_mood.values,
-        title="Average Mood by Day of Week",
-        labels={'x': 'Day', 'y': 'Average Mood Level'}
-    )
-    fig_day.update_yaxes(tickvals=[1, 2, 3, 4, 5], 
-                        ticktext=['😔 Very Low', '😐 Low', '😊 Okay', '😄 Good', '🌟 Great'],
-                        tickfont=dict(color='black'))
-    fig_day.update_xaxes(tickfont=dict(color='black'))
-    fig_day.update_layout(
-        plot_bgcolor='rgba(255, 255, 255, 0.1)',
-        paper_bgcolor='rgba(255, 255, 255, 0.05)',
-        font=dict(color='black'),
-        title=dict(font=dict(size=18, color='black')),
-        xaxis=dict(
-            gridcolor='rgba(255, 255, 255, 0.1)',
-            linecolor='rgba(255, 255, 255, 0.2)',
-            showline=True,
-            linewidth=1
-        ),
-        yaxis=dict(
-            gridcolor='rgba(255, 255, 255, 0.1)',
-            linecolor='rgba(255, 255, 255, 0.2)',
-            showline=True,
-            linewidth=1
-        ),
-        margin=dict(l=50, r=50, t=80, b=50)
-    )
+    day_mood = tally_means(summary["weekdays"]).reindex(WEEKDAYS).dropna()
+    
+    def build_day_chart():
+        fig_day = px.bar(
+            x=day_mood.index,
+            y=day_mood.values,
+            title="Average Mood by Day of Week",
+            labels={'x': 'Day', 'y': 'Average Mood Level'}
+        )
+        fig_day.update_yaxes(tickvals=[1, 2, 3, 4, 5], 
+                            ticktext=['😔 Very Low', '😐 Low', '😊 Okay', '😄 Good', '🌟 Great'],
+                            tickfont=dict(color='black'))
+        fig_day.update_xaxes(tickfont=dict(color='black'))
+        fig_day.update_layout(
+            plot_bgcolor='rgba(255, 255, 255, 0.1)',
+            paper_bgcolor='rgba(255, 255, 255, 0.05)',
+            font=dict(color='black'),
+            title=dict(font=dict(size=18, color='black')),
+            xaxis=dict(
+                gridcolor='rgba(255, 255, 255, 0.1)',
+                linecolor='rgba(255, 255, 255, 0.2)',
+                showline=True,
+                linewidth=1
+            ),
+            yaxis=dict(
+                gridcolor='rgba(255, 255, 255, 0.1)',
+                linecolor='rgba(255, 255, 255, 0.2)',
+                showline=True,
+                linewidth=1
+            ),
+            margin=dict(l=50, r=50, t=80, b=50)
+        )
+        return fig_day
+    
+    fig_day = cached_figure(tracker.figure_key("analytics_weekday", 30), build_day_chart)
     
     # Create a box-like container for the chart
     with st.container():
@@ -715,38 +675,41 @@ def render_mood_analytics(tracker):
     
     # Mood heatmap by time
     st.markdown("#### 🕐 Mood by Time of Day")
-    df['hour'] = pd.to_datetime(df['time']).dt.hour
-    hour_mood = df.groupby('hour')['mood_numeric'].mean()
-    
-    fig_hour = px.bar(
-        x=hour_mood.index,
-        y=hour_mood.values,
-        title="Average Mood by Hour of Day",
-        labels={'x': 'Hour', 'y': 'Average Mood Level'}
-    )
-    fig_hour.update_yaxes(tickvals=[1, 2, 3, 4, 5],
-                         ticktext=['😔 Very Low', '😐 Low', '😊 Okay', '😄 Good', '🌟 Great'],
-                         tickfont=dict(color='black'))
-    fig_hour.update_xaxes(tickfont=dict(color='black'))
-    fig_hour.update_layout(
-        plot_bgcolor='rgba(255, 255, 255, 0.1)',
-        paper_bgcolor='rgba(255, 255, 255, 0.05)',
-        font=dict(color='black'),
-        title=dict(font=dict(size=18, color='black')),
-        xaxis=dict(
-            gridcolor='rgba(255, 255, 255, 0.1)',
-            linecolor='rgba(255, 255, 255, 0.2)',
-            showline=True,
-            linewidth=1
-        ),
-        yaxis=dict(
-            gridcolor='rgba(255, 255, 255, 0.1)',
-            linecolor='rgba(255, 255, 255, 0.2)',
-            showline=True,
-            linewidth=1
-        ),
-        margin=dict(l=50, r=50, t=80, b=50)
-    )
+    hour_mood = tally_means(summary["hours"]).sort_index()
+    
+    def build_hour_chart():
+        fig_hour = px.bar(
+            x=hour_mood.index,
+            y=hour_mood.values,
+            title="Average Mood by Hour of Day",
+            labels={'x': 'Hour', 'y': 'Average Mood Level'}
+        )
+        fig_hour.update_yaxes(tickvals=[1, 2, 3, 4, 5],
+                             ticktext=['😔 Very Low', '😐 Low', '😊 Okay', '😄 Good', '🌟 Great'],
+                             tickfont=dict(color='black'))
+        fig_hour.update_xaxes(tickfont=dict(color='black'))
+        fig_hour.update_layout(
+            plot_bgcolor='rgba(255, 255, 255, 0.1)',
+            paper_bgcolor='rgba(255, 255, 255, 0.05)',
+            font=dict(color='black'),
+            title=dict(font=dict(size=18, color='black')),
+            xaxis=dict(
+                gridcolor='rgba(255, 255, 255, 0.1)',
+                linecolor='rgba(255, 255, 255, 0.2)',
+                showline=True,
+                linewidth=1
+            ),
+            yaxis=dict(
+                gridcolor='rgba(255, 255, 255, 0.1)',
+                linecolor='rgba(255, 255, 255, 0.2)',
+                showline=True,
+                linewidth=1
+            ),
+            margin=dict(l=50, r=50, t=80, b=50)
+        )
+        return fig_hour
+    
+    fig_hour = cached_figure(tracker.figure_key("analytics_hour", 30), build_hour_chart)
     
     # Create a box-like container for the chart
     with st.container():
@@ -768,67 +731,62 @@ def render_mood_analytics(tracker):
     st.markdown("#### 🎯 Context & Activity Analysis")
     
     # Context reason analysis
-    if 'context_reason' in df.columns:
-        context_counts = df['context_reason'].value_counts()
+    if summary["contexts"]:
+        context_counts = pd.Series({reason: count for reason, (count, _) in summary["contexts"].items()}).sort_values(ascending=False)
         if not context_counts.empty:
             st.markdown("**Most Common Reasons for Mood:**")
             for reason, count in context_counts.head(5).items():
                 if reason != "No specific reason":
-                    percentage = (count / len(df)) * 100
+                    percentage = (count / summary["count"]) * 100
                     st.write(f"• **{reason}**: {count} times ({percentage:.1f}%)")
     
     # Activity analysis
-    if 'activities' in df.columns:
-        all_activities = []
-        for activities_list in df['activities'].dropna():
-            if isinstance(activities_list, list):
-                all_activities.extend(activities_list)
-            elif activities_list:  # Handle non-list activities
-                all_activities.append(str(activities_list))
-        
-        if all_activities:
-            activity_counts = pd.Series(all_activities).value_counts()
-            st.markdown("**Most Common Activities:**")
-            for activity, count in activity_counts.items():
-                percentage = (count / len(df)) * 100
-                st.write(f"• **{activity}**: {count} times ({percentage:.1f}%)")
+    if summary["activities"]:
+        st.markdown("**Most Common Activities:**")
+        for activity, count in summary["activities"].most_common():
+            percentage = (count / summary["count"]) * 100
+            st.write(f"• **{activity}**: {count} times ({percentage:.1f}%)")
     
     # Mood by context
-    if 'context_reason' in df.columns:
+    if summary["contexts"]:
         st.markdown("#### 📊 Mood by Context")
-        context_mood = df.groupby('context_reason')['mood_numeric'].mean().sort_values(ascending=False)
+        context_mood = tally_means(summary["contexts"]).sort_values(ascending=False)
         context_mood = context_mood[context_mood.index != "No specific reason"]
         
         if not context_mood.empty:
-            fig_context = px.bar(
-                x=context_mood.index,
-                y=context_mood.values,
-                title="Average Mood by Context",
-                labels={'x': 'Context', 'y': 'Average Mood Level'}
-            )
-            fig_context.update_yaxes(tickvals=[1, 2, 3, 4, 5],
-                                   ticktext=['😔 Very Low', '😐 Low', '😊 Okay', '😄 Good', '🌟 Great'],
-                                   tickfont=dict(color='black'))
-            fig_context.update_xaxes(tickfont=dict(color='black'))
-            fig_context.update_layout(
-                plot_bgcolor='rgba(255, 255, 255, 0.1)',
-                paper_bgcolor='rgba(255, 255, 255, 0.05)',
-                font=dict(color='black'),
-                title=dict(font=dict(size=18, color='black')),
-                xaxis=dict(
-                    gridcolor='rgba(255, 255, 255, 0.1)',
-                    linecolor='rgba(255, 255, 255, 0.2)',
-                    showline=True,
-                    linewidth=1
-                ),
-                yaxis=dict(
-                    gridcolor='rgba(255, 255, 255, 0.1)',
-                    linecolor='rgba(255, 255, 255, 0.2)',
-                    showline=True,
-                    linewidth=1
-                ),
-                margin=dict(l=50, r=50, t=80, b=50)
-            )
+            def build_context_chart():
+                fig_context = px.bar(
+                    x=context_mood.index,
+                    y=context_mood.values,
+                    title="Average Mood by Context",
+                    labels={'x': 'Context', 'y': 'Average Mood Level'}
+                )
+                fig_context.update_yaxes(tickvals=[1, 2, 3, 4, 5],
+                                       ticktext=['😔 Very Low', '😐 Low', '😊 Okay', '😄 Good', '🌟 Great'],
+                                       tickfont=dict(color='black'))
+                fig_context.update_xaxes(tickfont=dict(color='black'))
+                fig_context.update_layout(
+                    plot_bgcolor='rgba(255, 255, 255, 0.1)',
+                    paper_bgcolor='rgba(255, 255, 255, 0.05)',
+                    font=dict(color='black'),
+                    title=dict(font=dict(size=18, color='black')),
+                    xaxis=dict(
+                        gridcolor='rgba(255, 255, 255, 0.1)',
+                        linecolor='rgba(255, 255, 255, 0.2)',
+                        showline=True,
+                        linewidth=1
+                    ),
+                    yaxis=dict(
+                        gridcolor='rgba(255, 255, 255, 0.1)',
+                        linecolor='rgba(255, 255, 255, 0.2)',
+                        showline=True,
+                        linewidth=1
+                    ),
+                    margin=dict(l=50, r=50, t=80, b=50)
+                )
+                return fig_context
+            
+            fig_context = cached_figure(tracker.figure_key("analytics_context", 30), build_context_chart)
             
             # Create a box-like container for the chart
             with st.container():
@@ -856,8 +814,6 @@ def render_mood_insights(tracker):
         st.info("No mood data available for insights.")
         return
     
-    df['mood_numeric'] = df['mood_level'].apply(tracker.get_mood_numeric)
-    
     # Advanced Analytics Integration
     st.markdown("#### 🔍 Advanced Mood Analytics")
     
@@ -866,7 +822,8 @@ def render_mood_insights(tracker):
     analytics_df.columns = ['timestamp', 'mood_score']
     
     # Get insights from analytics module
-    analytics_results = analyze_mood_trends(analytics_df)
+    analytics_results = analyze_mood_trends(analytics_df, cache_key=tracker.figure_key("insights", 30),
+                                            stats=tracker.get_mood_stats(30))
     
     # Display insights
     if analytics_results['insights']:
@@ -903,8 +860,14 @@ def render_mood_insights(tracker):
     # Predictive Analytics Section
     st.markdown("#### 🔮 Mood Predictions & Alerts")
     
-    # Get predictive results
-    predictive_results = predict_mood_trends(analytics_df, forecast_days=7, alert_threshold=2.8)
+    # Get predictive results (precomputed by the nightly batch when the data is unchanged)
+    predictive_results = load_cached_prediction(tracker.user_email, analytics_df, tracker.data_version,
+                                                cache_key=tracker.figure_key("insights", 30))
+    if predictive_results is None:
+        predictive_results = predict_mood_trends(analytics_df, forecast_days=7, alert_threshold=2.8,
+                                                 cache_key=tracker.figure_key("insights", 30),
+                                                 model_key=("mood_30d", tracker.user_email),
+                                                 background=True)
     
     if predictive_results['forecast'] is not None:
         # Display alerts
@@ -953,17 +916,21 @@ def render_mood_insights(tracker):
             dip_count = len(predictive_results['dips'])
             st.metric("Predicted Dips", dip_count)
             
+    elif predictive_results.get('pending'):
+        st.info("⏳ Your forecast is being prepared in the background and will appear here shortly.")
     else:
         st.info(f"🤔 {predictive_results['model_info']}")
     
+    if predictive_results.get('pending') and st.button("🔄 Refresh forecast", key="refresh_forecast"):
+        st.rerun()
+    
     st.markdown("---")
     
     # Most frequent mood
     st.markdown("#### 🎯 Most Frequent Mood")
-    mood_counts = df['mood_level'].value_counts()
-    most_frequent_mood = mood_counts.index[0]
-    most_frequent_count = mood_counts.iloc[0]
-    total_entries = len(df)
+    summary = tracker.get_mood_rollups().summary(30)
+    most_frequent_mood, most_frequent_count = summary["levels"].most_common(1)[0]
+    total_entries = summary["count"]
     percentage = (most_frequent_count / total_entries) * 100
     
     st.info(f"**{tracker.get_mood_label(most_frequent_mood)}** appears most often ({most_frequent_count} times, {percentage:.1f}% of entries)")
@@ -984,7 +951,7 @@ def render_mood_insights(tracker):
     
     # Weekly mood patterns
     st.markdown("#### 📅 Weekly Patterns")
-    day_mood = df.groupby('day_of_week')['mood_numeric'].mean()
+    day_mood = tally_means(summary["weekdays"])
     
     best_day = day_mood.idxmax()
     worst_day = day_mood.idxmin()
@@ -1021,8 +988,11 @@ def render_mood_insights(tracker):
     st.markdown("#### 🎯 Context & Activity Insights")
     
     # Context insights
-    if 'context_reason' in df.columns:
-        context_mood_analysis = df.groupby('context_reason')['mood_numeric'].agg(['mean', 'count']).sort_values('mean', ascending=False)
+    if summary["contexts"]:
+        context_mood_analysis = pd.DataFrame(
+            [(reason, total / count, count) for reason, (count, total) in summary["contexts"].items()],
+            columns=['context_reason', 'mean', 'count']
+        ).set_index('context_reason').sort_values('mean', ascending=False)
         context_mood_analysis = context_mood_analysis[context_mood_analysis.index != "No specific reason"]
         
         if not context_mood_analysis.empty:
@@ -1119,17 +1089,16 @@ def render_mood_dashboard_button():
 
 def render_physio_correlation(tracker):
     st.markdown("### ⌚ Physiology ↔ Mood Correlation")
-    # Build mood df (30 days)
-    df = tracker.get_mood_dataframe(30)
+    # Build mood df (90 days, enough history for lagged and rolling correlations)
+    df = tracker.get_mood_dataframe(90)
     if df.empty:
         st.info("Add some mood entries to enable correlation analysis.")
         return
-    df['mood_numeric'] = df['mood_level'].apply(tracker.get_mood_numeric)
     # Load wearable data for user
     email = st.session_state.get("user_profile", {}).get("email")
-    wearable = load_user_wearables(email)
-    records = wearable.get("records", [])
-    results = correlate_mood_with_physio(df[['date', 'mood_numeric']], records)
+    daily = load_wearable_rollup(email, "daily", start=(datetime.now() - timedelta(days=90)).date().isoformat())
+    results = correlate_mood_with_physio(df[['date', 'mood_numeric']], daily,
+                                         cache_key=tracker.figure_key("physio", 90, wearable_data_version(email)))
     if results['insights']:
         st.markdown("**Insights:**")
         for i in results['insights']:
@@ -1140,4 +1109,7 @@ def render_physio_correlation(tracker):
             st.warning(a)
     if results['charts']:
         for fig in results['charts']:
-            st.plotly_chart(fig, use_container_width=True)
\ No newline at end of file
+            st.plotly_chart(fig, use_container_width=True)
+    if not results['lagged'].empty:
+        st.caption("Lag k compares each day's metric with mood k days later; "
+                   "positive lags show effects that carry into the following days.")
@@ -1,27 +1,40 @@
+import warnings
+
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Hashable, Optional
 import plotly.express as px
 
+from core.ttl_cache import TTLCache
+from core.figure_cache import cached_figure
+
+METRICS = ["hrv_ms", "resting_hr", "sleep_minutes", "sleep_efficiency", "steps", "active_minutes"]
+METRIC_LABELS = {
+	"hrv_ms": "HRV",
+	"resting_hr": "Resting HR",
+	"sleep_minutes": "Sleep duration",
+	"sleep_efficiency": "Sleep efficiency",
+	"steps": "Steps",
+	"active_minutes": "Active minutes",
+}
+# Lag k pairs a metric on day t with mood on day t + k (positive: the metric leads mood)
+LAGS = list(range(-3, 4))
+ROLLING_WINDOW_DAYS = 14
+# |r| a lagged correlation must reach to be reported as an insight
+LAG_INSIGHT_THRESHOLD = 0.3
+
+# Correlation results per cache key (user and data versions)
+_results = TTLCache(ttl=24 * 3600, maxsize=256)
+
 
-def _prepare_wearable_df(records) -> pd.DataFrame:
-	if not records:
+def _prepare_wearable_df(daily_rows) -> pd.DataFrame:
+	"""Rows of the store's daily rollup tier as a frame with one row per date"""
+	if not daily_rows:
 		return pd.DataFrame()
-	df = pd.DataFrame(records)
-	if df.empty:
-		return df
-	df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce")
-	df = df.dropna(subset=["timestamp"]).sort_values("timestamp")
-	# Daily aggregation
-	df["date"] = df["timestamp"].dt.date
-	daily = df.groupby("date").agg({
-		"hrv_ms": "mean",
-		"resting_hr": "mean",
-		"sleep_minutes": "sum",
-		"sleep_efficiency": "mean",
-		"steps": "sum",
-		"active_minutes": "sum"
-	}).reset_index()
+	df = pd.DataFrame(daily_rows)
+	daily = pd.DataFrame({"date": pd.to_datetime(df["period"]).dt.date})
+	for m in METRICS:
+		daily[m] = pd.to_numeric(df[m], errors="coerce") if m in df else np.nan
 	return daily
 
 
@@ -33,14 +46,98 @@ def _prepare_mood_df(mood_df: pd.DataFrame) -> pd.DataFrame:
 	return df.groupby("date").agg({"mood_numeric": "mean"}).reset_index()
 
 
-def correlate_mood_with_physio(mood_df: pd.DataFrame, wearable_records: list, min_days: int = 7) -> Dict[str, Any]:
+def _calendar(merged: pd.DataFrame) -> pd.DataFrame:
+	"""Merged days on a gap-free daily index, so shifting by k rows means k days"""
+	daily = merged.set_index(pd.to_datetime(merged["date"])).drop(columns="date")
+	return daily.reindex(pd.date_range(daily.index.min(), daily.index.max(), freq="D"))
+
+
+def _pearson(n, sx, sy, sxx, syy, sxy, min_periods: int) -> np.ndarray:
+	"""Pearson r from pairwise-complete sums; NaN below min_periods pairs or without variance"""
+	with np.errstate(invalid="ignore", divide="ignore"):
+		cov = sxy - sx * sy / n
+		r = cov / np.sqrt((sxx - sx * sx / n) * (syy - sy * sy / n))
+	return np.where(n >= max(min_periods, 2), np.clip(r, -1.0, 1.0), np.nan)
+
+
+def _centered(daily: pd.DataFrame):
+	# Centering keeps the sum-of-products formulas numerically stable
+	x = daily.reindex(columns=METRICS).to_numpy(dtype=float)
+	y = daily["mood_numeric"].to_numpy(dtype=float)
+	with warnings.catch_warnings():
+		warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN metric columns
+		return x - np.nanmean(x, axis=0), y - np.nanmean(y)
+
+
+def lagged_correlations(daily: pd.DataFrame, lags=LAGS, min_periods: int = 3) -> pd.DataFrame:
+	"""
+	Metric x lag matrix of Pearson correlations with mood, in one vectorized pass
+
+	daily has one row per calendar day with mood_numeric and the METRICS columns.
+	"""
+	x, y = _centered(daily)
+	days = len(y)
+	# shifted[j, t] = mood on day t + lags[j]
+	positions = np.arange(days)[None, :] + np.asarray(lags)[:, None]
+	inside = (positions >= 0) & (positions < days)
+	shifted = np.where(inside, y[np.clip(positions, 0, max(days - 1, 0))], np.nan)[:, :, None]
+
+	valid = ~np.isnan(x)[None, :, :] & ~np.isnan(shifted)
+	xv = np.where(valid, x[None, :, :], 0.0)
+	yv = np.where(valid, shifted, 0.0)
+	r = _pearson(valid.sum(axis=1), xv.sum(axis=1), yv.sum(axis=1), (xv * xv).sum(axis=1),
+	             (yv * yv).sum(axis=1), (xv * yv).sum(axis=1), min_periods)
+	return pd.DataFrame(r.T, index=METRICS, columns=list(lags))
+
+
+def rolling_correlations(daily: pd.DataFrame, window: int = ROLLING_WINDOW_DAYS,
+                         min_periods: Optional[int] = None) -> pd.DataFrame:
+	"""Same-day correlation of each metric with mood over a trailing window of calendar days"""
+	x, y = _centered(daily)
+	valid = ~np.isnan(x) & ~np.isnan(y)[:, None]
+	xv = np.where(valid, x, 0.0)
+	yv = np.where(valid, y[:, None], 0.0)
+
+	def trailing(values):
+		# Window sums from one cumulative sum: S[t] - S[t - window]
+		total = np.cumsum(np.vstack([np.zeros((1, values.shape[1])), values]), axis=0)
+		return total[1:] - total[np.maximum(np.arange(1, len(values) + 1) - window, 0)]
+
+	r = _pearson(trailing(valid.astype(float)), trailing(xv), trailing(yv), trailing(xv * xv),
+	             trailing(yv * yv), trailing(xv * yv), min_periods or window // 2)
+	return pd.DataFrame(r, index=daily.index, columns=METRICS)
+
+
+def _lag_insights(matrix: pd.DataFrame):
+	insights = []
+	for metric, row in matrix.drop(columns=0).iterrows():
+		if row.isna().all():
+			continue
+		lag = row.abs().idxmax()
+		r = row[lag]
+		# Only report lags that beat the same-day relationship
+		if abs(r) < LAG_INSIGHT_THRESHOLD or abs(r) <= abs(np.nan_to_num(matrix.at[metric, 0])):
+			continue
+		direction = "better" if r > 0 else "lower"
+		if lag > 0:
+			when = f"{lag} day{'s' if lag > 1 else ''} later"
+			insights.append(f"{METRIC_LABELS[metric]} is followed by {direction} mood {when} (r = {r:.2f}).")
+		else:
+			when = f"{-lag} day{'s' if lag < -1 else ''} earlier"
+			insights.append(f"{METRIC_LABELS[metric]} tracks mood from {when} (r = {r:.2f}).")
+	return insights
+
+
+def _analyze(mood_df: pd.DataFrame, wearable_daily: list, min_days: int) -> Dict[str, Any]:
 	result: Dict[str, Any] = {
 		"insights": [],
 		"alerts": [],
-		"charts": [],
-		"correlations": {}
+		"correlations": {},
+		"lagged": pd.DataFrame(),
+		"rolling": pd.DataFrame(),
+		"merged": pd.DataFrame(),
 	}
-	wearable_daily = _prepare_wearable_df(wearable_records)
+	wearable_daily = _prepare_wearable_df(wearable_daily)
 	mood_daily = _prepare_mood_df(mood_df)
 	if wearable_daily.empty or mood_daily.empty:
 		result["insights"].append("Not enough data to correlate mood with physiology yet.")
@@ -49,10 +146,16 @@ def correlate_mood_with_physio(mood_df: pd.DataFrame, wearable_records: list, mi
 	if len(merged) < min_days:
 		result["insights"].append("Collect at least a week of wearable and mood data for reliable insights.")
 		return result
-	metrics = ["hrv_ms", "resting_hr", "sleep_minutes", "sleep_efficiency", "steps", "active_minutes"]
-	for m in metrics:
+
+	result["merged"] = merged
+	# Mood and wearable days outside the overlap still count for lagged pairs
+	daily = _calendar(pd.merge(mood_daily, wearable_daily, on="date", how="outer"))
+	lagged = lagged_correlations(daily, min_periods=min_days // 2)
+	result["lagged"] = lagged
+	result["rolling"] = rolling_correlations(daily)
+	for m in METRICS:
 		if m in merged.columns and merged[m].notna().sum() >= min_days // 2:
-			corr = merged[["mood_numeric", m]].dropna().corr().iloc[0, 1]
+			corr = lagged.at[m, 0]
 			result["correlations"][m] = float(corr)
 			if np.isfinite(corr):
 				if m == "hrv_ms" and corr > 0.2:
@@ -63,6 +166,7 @@ def correlate_mood_with_physio(mood_df: pd.DataFrame, wearable_records: list, mi
 					result["insights"].append("More sleep tends to correlate with better mood.")
 				elif m == "steps" and corr > 0.2:
 					result["insights"].append("Higher daily steps correlate with improved mood.")
+	result["insights"].extend(_lag_insights(lagged))
 	# Alerts based on thresholds rolling window
 	merged_sorted = merged.sort_values("date")
 	window = min(7, len(merged_sorted))
@@ -84,8 +188,67 @@ def correlate_mood_with_physio(mood_df: pd.DataFrame, wearable_records: list, mi
 			avg_steps = recent["steps"].mean()
 			if avg_steps < 3000:
 				result["alerts"].append("Low activity this week; consider light walks to support mood.")
+	return result
+
+
+def _charts(analysis: Dict[str, Any], min_days: int, cache_key: Optional[Hashable]) -> list:
+	merged, lagged = analysis["merged"], analysis["lagged"]
+	charts = []
+	if merged.empty:
+		return charts
+
+	def chart_key(name):
+		return None if cache_key is None else ("physio", cache_key, name)
+
 	# Chart: scatter mood vs HRV if available
 	if "hrv_ms" in merged.columns and merged["hrv_ms"].notna().sum() >= min_days // 2:
-		fig = px.scatter(merged, x="hrv_ms", y="mood_numeric", trendline="ols", title="Mood vs HRV")
-		result["charts"].append(fig)
-	return result
+		fig = cached_figure(chart_key("hrv_scatter"),
+		                    lambda: px.scatter(merged, x="hrv_ms", y="mood_numeric", trendline="ols", title="Mood vs HRV"))
+		charts.append(fig)
+	if lagged.notna().any().any():
+		def build_heatmap():
+			fig = px.imshow(lagged.rename(index=METRIC_LABELS), zmin=-1, zmax=1, color_continuous_scale="RdBu",
+			                text_auto=".2f", aspect="auto", title="Correlation with mood k days later",
+			                labels={"x": "Lag (days)", "y": "", "color": "r"})
+			fig.update_xaxes(tickmode="array", tickvals=LAGS)
+			return fig
+		charts.append(cached_figure(chart_key("lag_heatmap"), build_heatmap))
+	rolling = analysis["rolling"].dropna(how="all")
+	if not rolling.empty:
+		def build_rolling():
+			frame = rolling.rename(columns=METRIC_LABELS).rename_axis("date").reset_index()
+			fig = px.line(frame, x="date", y=[METRIC_LABELS[m] for m in METRICS],
+			              title=f"{ROLLING_WINDOW_DAYS}-day rolling correlation with mood",
+			              labels={"value": "r", "variable": ""})
+			fig.update_yaxes(range=[-1, 1])
+			return fig
+		charts.append(cached_figure(chart_key("rolling"), build_rolling))
+	return charts
+
+
+def correlate_mood_with_physio(mood_df: pd.DataFrame, wearable_daily: list, min_days: int = 7,
+                               cache_key: Optional[Hashable] = None) -> Dict[str, Any]:
+	"""
+	Same-day and lagged mood/physiology correlations, alerts and charts
+
+	wearable_daily holds rows of the wearable store's daily rollup tier
+	(load_wearable_rollup(..., "daily")), so no raw records are regrouped here.
+
+	Returns insights, alerts, charts, same-day correlations per metric, the
+	metric x lag matrix (lagged) and rolling same-day correlations (rolling).
+	With a cache_key (user plus mood and wearable data versions) the analysis
+	and charts of an earlier call with the same key are reused.
+	"""
+	analysis = None if cache_key is None else _results.get(cache_key)
+	if analysis is None:
+		analysis = _analyze(mood_df, wearable_daily, min_days)
+		if cache_key is not None:
+			_results.set(cache_key, analysis)
+	return {
+		"insights": list(analysis["insights"]),
+		"alerts": list(analysis["alerts"]),
+		"charts": _charts(analysis, min_days, cache_key),
+		"correlations": dict(analysis["correlations"]),
+		"lagged": analysis["lagged"],
+		"rolling": analysis["rolling"],
+	}
@@ -1,30 +1,50 @@
+import hashlib
+import importlib.util
+import os
+from functools import lru_cache
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple, Optional, Any
+from typing import Dict, List, Tuple, Optional, Any, Hashable
 import warnings
 warnings.filterwarnings('ignore')
 
-# ARIMA and auto ARIMA
-try:
+# statsmodels (ARIMA) and Prophet take seconds to import, so they are only
+# located here and loaded on first use by the opt-in forecasters
+ARIMA_AVAILABLE = importlib.util.find_spec("statsmodels") is not None
+PROPHET_AVAILABLE = importlib.util.find_spec("prophet") is not None
+
+@lru_cache(maxsize=None)
+def _load_statsmodels():
+    """Import ARIMA and adfuller on first use"""
     from statsmodels.tsa.arima.model import ARIMA
     from statsmodels.tsa.stattools import adfuller
-    ARIMA_AVAILABLE = True
-except ImportError:
-    ARIMA_AVAILABLE = False
+    return ARIMA, adfuller
 
-# Facebook Prophet
-try:
+@lru_cache(maxsize=None)
+def _load_prophet():
+    """Import Prophet on first use"""
     from prophet import Prophet
-    PROPHET_AVAILABLE = True
-except ImportError:
-    PROPHET_AVAILABLE = False
+    return Prophet
 
 # Plotly for visualizations
 import plotly.graph_objs as go
 
+from core.figure_cache import cached_figure
+from components.fast_forecast import forecast_ets
+from core.ttl_cache import TTLCache
+
+# Fitted model state per model_key (e.g. per user); see _fitted_arima
+_model_cache = TTLCache(ttl=24 * 3600, maxsize=256)
+# Observations that may be filtered through cached parameters before a full refit
+REFIT_EVERY = 14
+
+# "ets" (NumPy Holt-Winters, default), or opt in to "arima" (falls back to Prophet) / "prophet"
+FORECAST_MODEL = os.getenv("MOOD_FORECAST_MODEL", "ets")
+
 def check_stationarity(timeseries: pd.Series) -> bool:
     """Check if time series is stationary using Augmented Dickey-Fuller test"""
     try:
+        _, adfuller = _load_statsmodels()
         result = adfuller(timeseries.dropna())
         return result[1] < 0.05  # p-value < 0.05 means stationary
     except:
@@ -48,14 +68,65 @@ def prepare_time_series_data(mood_log: pd.DataFrame, freq: str = 'D') -> pd.Data
 
     return daily_mood
 
-def forecast_arima(mood_series: pd.Series, forecast_days: int = 7) -> Dict[str, Any]:
-    """Forecast mood using ARIMA model"""
+def series_hash(series: pd.Series) -> str:
+    """Digest of a series' index and values, used to recognise unchanged data"""
+    return hashlib.sha256(pd.util.hash_pandas_object(series, index=True).values.tobytes()).hexdigest()
+
+def _fitted_arima(mood_series: pd.Series, model_key: Optional[Hashable] = None) -> Dict[str, Any]:
+    """
+    Return cached ARIMA state for the series, fitting as little as possible
+
+    Unchanged data reuses the cached fit and forecasts. New days are appended to
+    the cached results, and revised days (today's mean moving, the window sliding)
+    are re-filtered with the cached parameters. A full maximum-likelihood fit only
+    runs when nothing is cached or after REFIT_EVERY updates since the last one.
+    """
+    digest = series_hash(mood_series)
+    cached = _model_cache.get(model_key) if model_key is not None else None
+    if cached is not None and cached['hash'] == digest:
+        return cached
+
+    values = mood_series.to_numpy(dtype=float)
+    model_fit, since_refit = None, 0
+    if cached is not None:
+        n = len(cached['values'])
+        since_refit = cached['since_refit'] + max(1, len(values) - n)
+    if cached is not None and since_refit <= REFIT_EVERY:
+        if (len(values) > n and np.array_equal(values[:n], cached['values'])
+                and mood_series.index[:n].equals(cached['index'])):
+            model_fit = cached['fit'].append(values[n:], refit=False)
+        else:
+            model_fit = cached['fit'].apply(values, refit=False)
+    if model_fit is None:
+        # Use simple ARIMA(1,1,1) model
+        ARIMA, _ = _load_statsmodels()
+        model_fit = ARIMA(values, order=(1, 1, 1)).fit()
+        since_refit = 0
+
+    state = {
+        'hash': digest,
+        'index': mood_series.index,
+        'values': values,
+        'fit': model_fit,
+        'since_refit': since_refit,
+        'forecasts': {},
+    }
+    if model_key is not None:
+        _model_cache.set(model_key, state)
+    return state
+
+def forecast_arima(mood_series: pd.Series, forecast_days: int = 7,
+                   model_key: Optional[Hashable] = None) -> Dict[str, Any]:
+    """Forecast mood using ARIMA model (model state is cached per model_key)"""
     if not ARIMA_AVAILABLE:
         return {}
         
     try:
-        # Use simple ARIMA(1,1,1) model
-        model_fit = ARIMA(mood_series, order=(1, 1, 1)).fit()
+        state = _fitted_arima(mood_series, model_key)
+        if forecast_days in state['forecasts']:
+            return state['forecasts'][forecast_days]
+
+        model_fit = state['fit']
         order = (1, 1, 1)
         seasonal_order = (0, 0, 0, 0)
 
@@ -65,7 +136,7 @@ def forecast_arima(mood_series: pd.Series, forecast_days: int = 7) -> Dict[str,
         # Get confidence intervals if possible
         try:
             pred_conf = model_fit.get_forecast(steps=forecast_days).conf_int()
-            conf_int = pred_conf.values
+            conf_int = np.asarray(pred_conf)
         except:
             conf_int = None
 
@@ -74,23 +145,33 @@ def forecast_arima(mood_series: pd.Series, forecast_days: int = 7) -> Dict[str,
         forecast_index = pd.date_range(start=last_date + pd.Timedelta(days=1),
                                      periods=forecast_days, freq='D')
 
-        return {
+        result = {
             'forecast': pd.Series(forecast, index=forecast_index),
             'confidence_intervals': conf_int,
             'model_type': 'ARIMA',
             'order': order,
             'seasonal_order': seasonal_order
         }
+        state['forecasts'][forecast_days] = result
+        return result
 
     except Exception as e:
         print(f"ARIMA forecasting failed: {e}")
         return {}
 
-def forecast_prophet(mood_series: pd.Series, forecast_days: int = 7) -> Dict[str, Any]:
-    """Forecast mood using Facebook Prophet"""
+def forecast_prophet(mood_series: pd.Series, forecast_days: int = 7,
+                     model_key: Optional[Hashable] = None) -> Dict[str, Any]:
+    """Forecast mood using Facebook Prophet (reused while the series is unchanged)"""
     if not PROPHET_AVAILABLE:
         return {}
-        
+
+    # Prophet cannot be updated in place, but a repeat request needs no refit
+    cache_key = None if model_key is None else ('prophet', model_key, series_hash(mood_series), forecast_days)
+    if cache_key is not None:
+        cached = _model_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
     try:
         # Prepare data for Prophet
         prophet_df = pd.DataFrame({
@@ -99,6 +180,7 @@ def forecast_prophet(mood_series: pd.Series, forecast_days: int = 7) -> Dict[str
         })
 
         # Create and fit model
+        Prophet = _load_prophet()
         model = Prophet(
             daily_seasonality=True,
             weekly_seasonality=True,
@@ -117,18 +199,58 @@ def forecast_prophet(mood_series: pd.Series, forecast_days: int = 7) -> Dict[str
         # Extract predictions for future dates only
         future_predictions = forecast[forecast['ds'] > mood_series.index[-1]]
 
-        return {
+        result = {
             'forecast': pd.Series(future_predictions['yhat'].values,
                                 index=future_predictions['ds']),
             'confidence_intervals': future_predictions[['yhat_lower', 'yhat_upper']].values,
             'model_type': 'Prophet',
             'model': model
         }
+        if cache_key is not None:
+            _model_cache.set(cache_key, result)
+        return result
 
     except Exception as e:
         print(f"Prophet forecasting failed: {e}")
         return {}
 
+def forecast_exponential_smoothing(mood_series: pd.Series, forecast_days: int = 7,
+                                   model_key: Optional[Hashable] = None) -> Dict[str, Any]:
+    """Forecast mood with the NumPy damped Holt-Winters model (cached while the series is unchanged)"""
+    cache_key = None if model_key is None else ('ets', model_key, series_hash(mood_series), forecast_days)
+    if cache_key is not None:
+        cached = _model_cache.get(cache_key)
+        if cached is not None:
+            return cached
+    try:
+        result = forecast_ets(mood_series, forecast_days)
+    except Exception as e:
+        print(f"Exponential smoothing forecasting failed: {e}")
+        return {}
+    if cache_key is not None and result:
+        _model_cache.set(cache_key, result)
+    return result
+
+_FORECASTERS = {
+    'ets': [forecast_exponential_smoothing],
+    'arima': [forecast_arima, forecast_prophet],
+    'prophet': [forecast_prophet],
+}
+# Fits slow enough to run in the background job pool when predict_mood_trends(background=True)
+BACKGROUND_MODELS = ('arima', 'prophet')
+
+def compute_forecast(mood_series: pd.Series, forecast_days: int = 7, model: Optional[str] = None,
+                     model_key: Optional[Hashable] = None) -> Dict[str, Any]:
+    """Run the forecasters for model in turn (ARIMA falls back to Prophet); {} if none fit"""
+    model = model or FORECAST_MODEL
+    if model not in _FORECASTERS:
+        raise ValueError(f"Unknown forecast model: {model}")
+    for forecaster in _FORECASTERS[model]:
+        forecast_result = forecaster(mood_series, forecast_days, model_key=model_key)
+        if forecast_result:
+            return forecast_result
+    return {}
+
 def detect_mood_dips(forecast: pd.Series, confidence_intervals: Optional[np.ndarray] = None,
                     threshold: float = 2.5) -> List[Dict[str, Any]]:
     """Detect potential mood dips from forecast"""
@@ -186,8 +308,15 @@ def generate_predictive_alerts(dips: List[Dict[str, Any]], historical_avg: float
 
 def create_forecast_chart(historical_data: pd.Series, forecast: pd.Series,
                          confidence_intervals: Optional[np.ndarray] = None,
-                         dips: List[Dict[str, Any]] = None) -> go.Figure:
-    """Create interactive forecast visualization"""
+                         dips: List[Dict[str, Any]] = None,
+                         cache_key: Optional[Hashable] = None) -> go.Figure:
+    """Create interactive forecast visualization (reused from the figure cache when cache_key is given)"""
+    if cache_key is not None:
+        return cached_figure(
+            ("forecast_chart", cache_key),
+            lambda: create_forecast_chart(historical_data, forecast, confidence_intervals, dips)
+        )
+
     fig = go.Figure()
 
     # Historical data
@@ -261,9 +390,23 @@ def create_forecast_chart(historical_data: pd.Series, forecast: pd.Series,
     return fig
 
 def predict_mood_trends(mood_log: pd.DataFrame, forecast_days: int = 7,
-                       alert_threshold: float = 2.5) -> Dict[str, Any]:
+                       alert_threshold: float = 2.5,
+                       cache_key: Optional[Hashable] = None,
+                       model_key: Optional[Hashable] = None,
+                       model: Optional[str] = None,
+                       background: bool = False) -> Dict[str, Any]:
     """
     Main function to predict mood trends and generate alerts
+
+    cache_key identifies the data behind mood_log (e.g. user and data version) so
+    the forecast chart can be reused from the figure cache. model_key (e.g. the
+    user) lets fitted models be cached and updated as new days arrive. model picks
+    the forecaster: "ets" (default), "arima" or "prophet".
+
+    With background=True, ARIMA/Prophet fits are submitted to the forecast job
+    pool instead of running here. Until the job finishes the result carries
+    'pending': True and the job id, and shows the last finished forecast for
+    model_key, or no forecast if there is none yet.
     """
     if mood_log.empty:
         return {
@@ -287,11 +430,32 @@ def predict_mood_trends(mood_log: pd.DataFrame, forecast_days: int = 7,
 
     historical_avg = mood_series.mean()
 
-    # Try ARIMA first, fallback to Prophet
-    forecast_result = forecast_arima(mood_series, forecast_days)
-
-    if not forecast_result:
-        forecast_result = forecast_prophet(mood_series, forecast_days)
+    model = model or FORECAST_MODEL
+    if model not in _FORECASTERS:
+        raise ValueError(f"Unknown forecast model: {model}")
+
+    job_id, pending = None, False
+    if background and model in BACKGROUND_MODELS:
+        from components import forecast_jobs
+        # None when the pool is saturated; the next rerun submits again
+        job_id = forecast_jobs.submit_forecast(mood_series, forecast_days, model, model_key)
+        forecast_result = forecast_jobs.job_result(job_id) if job_id else None
+        if forecast_result is None:
+            pending = True
+            stale = forecast_jobs.latest_forecast(model_key, model, forecast_days) if model_key is not None else None
+            if stale is None:
+                return {
+                    'forecast': None,
+                    'alerts': [],
+                    'dips': [],
+                    'charts': [],
+                    'model_info': 'Forecast is being prepared in the background',
+                    'pending': True,
+                    'job_id': job_id
+                }
+            forecast_result = stale
+    else:
+        forecast_result = compute_forecast(mood_series, forecast_days, model, model_key)
 
     if not forecast_result:
         return {
@@ -311,14 +475,20 @@ def predict_mood_trends(mood_log: pd.DataFrame, forecast_days: int = 7,
     # Generate alerts
     alerts = generate_predictive_alerts(dips, historical_avg)
 
-    # Create visualization
-    chart = create_forecast_chart(mood_series, forecast, confidence_intervals, dips)
+    # Create visualization (a stale forecast is not cached under the current data's key)
+    chart = create_forecast_chart(
+        mood_series, forecast, confidence_intervals, dips,
+        cache_key=None if cache_key is None or pending else (cache_key, model, forecast_days, alert_threshold)
+    )
 
+    model_info = f"Using {forecast_result['model_type']} model"
     return {
         'forecast': forecast,
         'alerts': alerts,
         'dips': dips,
         'charts': [chart],
-        'model_info': f"Using {forecast_result['model_type']} model",
-        'historical_avg': historical_avg
-    }
\ No newline at end of file
+        'model_info': model_info + (" (updating in the background)" if pending else ""),
+        'historical_avg': historical_avg,
+        'pending': pending,
+        'job_id': job_id
+    }
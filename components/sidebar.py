@@ -1,11 +1,11 @@
 import streamlit as st
 from datetime import datetime
-from core.utils import create_new_conversation
+from core.utils import create_new_conversation, get_client_ip
+from core.geoip import country_for_coords, lookup_ip
 from core.theme import get_current_theme, toggle_theme, set_palette, PALETTES
 from components.mood_dashboard import render_mood_dashboard_button, MoodTracker
 from components.profile import render_profile_section
 from streamlit_js_eval import streamlit_js_eval
-import requests
 import random
 
 # --- Structured Emergency Resources ---
@@ -23,15 +23,7 @@ GLOBAL_RESOURCES = [
 ]
 
 def get_country_from_coords(lat, lon):
-    try:
-        url = f"https://geocode.maps.co/reverse?lat={lat}&lon={lon}"
-        resp = requests.get(url, timeout=5)
-        if resp.status_code == 200:
-            data = resp.json()
-            return data.get("address", {}).get("country_code", "").upper()
-    except:
-        pass
-    return None
+    return country_for_coords(lat, lon)
 
 def get_user_country():
     # 1. Try to get user's actual browser location (via JS)
@@ -55,13 +47,10 @@ def get_user_country():
         if country:
             return country
 
-    # 2. Fallback to IP-based location using ipapi.co (no key required)
-    try:
-        resp = requests.get("https://ipapi.co/json/", timeout=3)
-        if resp.status_code == 200:
-            return resp.json().get("country_code", "").upper()
-    except:
-        pass
+    # 2. Fallback to IP-based location (local GeoIP lookup, cached per IP)
+    location = lookup_ip(get_client_ip())
+    if location and location.country:
+        return location.country
 
     return None  # final fallback if everything fails
 
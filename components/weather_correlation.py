@@ -1,3 +1,6 @@
+import functools
+import importlib.util
+import os
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Tuple, Optional, Any
@@ -6,73 +9,119 @@ from datetime import datetime, timedelta
 import plotly.graph_objs as go
 import plotly.express as px
 
-# Weather data libraries
-try:
-    from meteostat import Point, Daily
-    import timezonefinder
-    WEATHER_AVAILABLE = True
-except ImportError:
-    WEATHER_AVAILABLE = False
-
-def get_weather_data(latitude: float, longitude: float, start_date: datetime, end_date: datetime) -> Optional[pd.DataFrame]:
+from core.geoip import lookup_ip
+from core.utils import get_client_ip
+from core.weather_cache import cached_weather
+
+# Weather data libraries are only located here; meteostat is imported on first fetch
+WEATHER_AVAILABLE = all(importlib.util.find_spec(name) is not None for name in ("meteostat", "timezonefinder"))
+# CSV of daily weather served instead of meteostat, for offline demos and benchmarks
+WEATHER_FIXTURE = os.getenv("WEATHER_FIXTURE")
+
+WEATHER_COLUMNS = {
+    'tavg': 'temp_avg',
+    'tmin': 'temp_min',
+    'tmax': 'temp_max',
+    'prcp': 'precipitation',
+    'wspd': 'wind_speed',
+    'pres': 'pressure'
+}
+
+def fetch_meteostat(latitude: float, longitude: float, start_date: datetime, end_date: datetime) -> Optional[pd.DataFrame]:
     """
-    Fetch historical weather data for a location and date range
+    Fetch daily weather from meteostat (empty frame when there is no data, None on errors)
     """
-    if not WEATHER_AVAILABLE:
-        return None
-
     try:
+        from meteostat import Point, Daily
+
         # Create Point for location
         location = Point(latitude, longitude)
 
         # Get daily weather data
-        data = Daily(location, start_date, end_date)
-        weather_df = data.fetch()
+        weather_df = Daily(location, start_date, end_date).fetch()
 
-        if weather_df.empty:
-            return None
+        # Reset index to have date as column and rename columns for clarity
+        return weather_df.reset_index().rename(columns=WEATHER_COLUMNS)
 
-        # Reset index to have date as column
-        weather_df = weather_df.reset_index()
-
-        # Rename columns for clarity
-        weather_df = weather_df.rename(columns={
-            'tavg': 'temp_avg',
-            'tmin': 'temp_min',
-            'tmax': 'temp_max',
-            'prcp': 'precipitation',
-            'wspd': 'wind_speed',
-            'pres': 'pressure'
-        })
+    except Exception as e:
+        print(f"Error fetching weather data: {e}")
+        return None
 
-        # Convert temperature from Celsius to Fahrenheit if needed
-        # weather_df['temp_avg_f'] = weather_df['temp_avg'] * 9/5 + 32
-        # weather_df['temp_min_f'] = weather_df['temp_min'] * 9/5 + 32
-        # weather_df['temp_max_f'] = weather_df['temp_max'] * 9/5 + 32
+class FixtureWeatherProvider:
+    """
+    Offline weather provider serving days from a fixed frame (a 'time' column plus weather columns)
 
-        return weather_df
+    Records the ranges it was asked for, so tests can check what was fetched.
+    Its days are cached apart from meteostat's, under cache_name.
+    """
 
-    except Exception as e:
-        print(f"Error fetching weather data: {e}")
+    def __init__(self, frame: pd.DataFrame, cache_name: str = "fixture"):
+        self.cache_name = cache_name
+        self.frame = frame.assign(time=pd.to_datetime(frame["time"])).set_index("time").sort_index()
+        self.calls: List[Tuple[datetime, datetime]] = []
+
+    @classmethod
+    def from_csv(cls, path: str) -> "FixtureWeatherProvider":
+        return cls(pd.read_csv(path), "fixture_" + os.path.splitext(os.path.basename(path))[0])
+
+    @classmethod
+    def synthetic(cls, start: datetime, end: datetime, seed: int = 0) -> "FixtureWeatherProvider":
+        """Seasonal temperatures with random rain and wind, the same for the same arguments"""
+        rng = np.random.default_rng(seed)
+        time = pd.date_range(start, end, freq="D")
+        season = np.cos(2 * np.pi * (time.dayofyear.to_numpy() - 200) / 365.25)
+        temp_avg = 12 + 10 * season + rng.normal(0, 3, len(time))
+        spread = rng.uniform(3, 8, len(time))
+        rain = rng.random(len(time)) < 0.3
+        return cls(pd.DataFrame({
+            "time": time,
+            "temp_avg": temp_avg.round(1),
+            "temp_min": (temp_avg - spread).round(1),
+            "temp_max": (temp_avg + spread).round(1),
+            "precipitation": np.where(rain, rng.gamma(1.5, 4, len(time)), 0.0).round(1),
+            "wind_speed": rng.gamma(3, 4, len(time)).round(1),
+            "pressure": rng.normal(1015, 8, len(time)).round(1),
+        }))
+
+    def __call__(self, latitude: float, longitude: float, start_date: datetime, end_date: datetime) -> pd.DataFrame:
+        self.calls.append((start_date, end_date))
+        return self.frame.loc[start_date:end_date].reset_index()
+
+@functools.lru_cache(maxsize=4)
+def _fixture_provider(path: str, mtime_ns: int) -> FixtureWeatherProvider:
+    """The fixture at path, parsed once per version of the file"""
+    return FixtureWeatherProvider.from_csv(path)
+
+def default_weather_provider():
+    """The fixture when WEATHER_FIXTURE is set, else meteostat if installed, else None"""
+    if WEATHER_FIXTURE:
+        try:
+            mtime_ns = os.stat(WEATHER_FIXTURE).st_mtime_ns
+        except OSError as e:
+            print(f"Weather fixture unavailable: {e}")
+            return None
+        return _fixture_provider(WEATHER_FIXTURE, mtime_ns)
+    return fetch_meteostat if WEATHER_AVAILABLE else None
+
+def get_weather_data(latitude: float, longitude: float, start_date: datetime, end_date: datetime,
+                     provider=None) -> Optional[pd.DataFrame]:
+    """
+    Historical weather for a location and date range, served from the on-disk
+    cache and fetching only the days it is missing
+    """
+    provider = provider or default_weather_provider()
+    if provider is None:
         return None
+    source = "meteostat" if provider is fetch_meteostat else getattr(provider, "cache_name", "custom")
+    return cached_weather(latitude, longitude, start_date, end_date, provider, source=source)
 
 def get_user_location() -> Optional[Tuple[float, float]]:
     """
-    Get user's approximate location using IP geolocation
+    Get user's approximate location from their IP address (local GeoIP lookup, cached per IP)
     """
-    try:
-        import requests
-
-        # Using ipapi.co for free geolocation (no API key required)
-        response = requests.get('https://ipapi.co/json/', timeout=5)
-        if response.status_code == 200:
-            data = response.json()
-            lat = data.get('latitude')
-            lon = data.get('longitude')
-            if lat and lon:
-                return float(lat), float(lon)
-    except Exception as e:
-        print(f"Error getting location: {e}")
+    location = lookup_ip(get_client_ip())
+    if location and location.latitude is not None:
+        return location.latitude, location.longitude
 
     # Fallback to a default location (e.g., New York City)
     return 40.7128, -74.0060
@@ -89,7 +138,7 @@ def analyze_weather_mood_correlation(mood_data: pd.DataFrame, weather_data: pd.D
         mood_df = mood_data.copy()
         mood_df['timestamp'] = pd.to_datetime(mood_df['timestamp'])
         mood_df['date'] = mood_df['timestamp'].dt.date
-        mood_df['mood_numeric'] = mood_df['mood_level'].map({
+        mood_df['mood_numeric'] = mood_df['mood_level'].astype(str).map({
             'very_low': 1, 'low': 2, 'okay': 3, 'good': 4, 'great': 5
         })
 
@@ -214,7 +263,7 @@ def render_weather_mood_analysis(mood_data: pd.DataFrame):
     """
     st.markdown("### 🌤️ Weather-Mood Correlation Analysis")
 
-    if not WEATHER_AVAILABLE:
+    if default_weather_provider() is None:
         st.warning("Weather analysis requires additional packages. Install meteostat and timezonefinder to enable this feature.")
         return
 
@@ -0,0 +1,11 @@
+import pytest
+
+import core.mood_store as mood_store
+
+
+@pytest.fixture(autouse=True)
+def isolated_mood_store(tmp_path, monkeypatch):
+    """Keep every test's mood partitions (and the store's schema file) out of the working tree"""
+    monkeypatch.setattr(mood_store, "MOOD_DIR", str(tmp_path / "mood"))
+    monkeypatch.setattr(mood_store, "LEGACY_MOOD_FILE", str(tmp_path / "mood_data.json"))
+    monkeypatch.setattr(mood_store, "_migrated_dirs", set())
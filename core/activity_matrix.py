@@ -0,0 +1,108 @@
+"""
+Sparse activity-mood statistics.
+
+Each entry's activity tags become one row of a binary entries x activities
+matrix in CSR form (row pointers plus column codes, no stored ones). Per
+activity mean mood, spread, lift over entries without the activity and 95%
+confidence intervals then come from X^T y style sums computed with
+np.bincount, without materialising one DataFrame row per tag.
+"""
+
+from itertools import chain
+from typing import Any, Iterable, List
+
+import numpy as np
+import pandas as pd
+
+Z_95 = 1.96
+
+
+def _tags(activities: Any) -> List[Any]:
+    if isinstance(activities, (list, tuple, set, np.ndarray)):
+        return list(activities)
+    # A bare string is a single tag; None/NaN mean no tags
+    return [activities] if isinstance(activities, str) else []
+
+
+class ActivityMatrix:
+    """Binary entries x activities matrix in CSR form"""
+
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray, vocabulary: np.ndarray):
+        self.indptr = indptr
+        self.indices = indices
+        self.vocabulary = vocabulary
+        # Row index of every stored entry (the COO row array)
+        self.row_ids = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+
+    @classmethod
+    def from_lists(cls, activities: Iterable[Any]) -> "ActivityMatrix":
+        """One row per entry; repeated tags within an entry count once"""
+        rows = [a if type(a) is list else _tags(a) for a in activities]
+        lengths = np.fromiter(map(len, rows), dtype=np.int64, count=len(rows))
+        codes, vocabulary = pd.factorize(np.fromiter(chain.from_iterable(rows), dtype=object, count=int(lengths.sum())))
+        row_ids = np.repeat(np.arange(len(rows), dtype=np.int64), lengths)
+
+        # factorize marks None/NaN tags as -1; drop those and empty tags
+        keep = codes >= 0
+        empty = np.flatnonzero(vocabulary == "")
+        if len(empty):
+            keep &= codes != empty[0]
+            codes = codes - (codes > empty[0])
+            vocabulary = np.delete(vocabulary, empty[0])
+        width = max(len(vocabulary), 1)
+        keys = np.sort(row_ids[keep] * width + codes[keep])
+        # Drop repeated (row, activity) pairs
+        keys = keys[np.r_[True, keys[1:] != keys[:-1]]] if len(keys) else keys
+        row_ids, codes = np.divmod(keys, width)
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(row_ids, minlength=len(rows)), out=indptr[1:])
+        return cls(indptr, codes, np.asarray(vocabulary, dtype=object))
+
+    @property
+    def shape(self):
+        return (len(self.indptr) - 1, len(self.vocabulary))
+
+    def column_sums(self, weights: np.ndarray) -> np.ndarray:
+        """X^T @ weights"""
+        return np.bincount(self.indices, weights=weights[self.row_ids], minlength=self.shape[1])
+
+
+def activity_mood_stats(activities: Iterable[Any], scores: Iterable[float]) -> pd.DataFrame:
+    """
+    Mood statistics per activity tag
+
+    Columns: activities, count, avg_mood, std_dev, ci_low/ci_high (95% CI of
+    avg_mood), lift (avg_mood minus the mean of entries without the activity)
+    and lift_ci_low/lift_ci_high. Entries without a score are ignored.
+    """
+    scores = np.asarray(list(scores) if not isinstance(scores, (np.ndarray, pd.Series)) else scores, dtype=float)
+    matrix = ActivityMatrix.from_lists(activities)
+    valid = ~np.isnan(scores)
+    y = np.where(valid, scores, 0.0)
+
+    count = matrix.column_sums(valid.astype(float))
+    total = matrix.column_sums(y)
+    total_sq = matrix.column_sums(y * y)
+    n_all, sum_all, sq_all = valid.sum(), y.sum(), (y * y).sum()
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = total / count
+        var = np.maximum(total_sq - count * mean ** 2, 0) / (count - 1)
+        n_out = n_all - count
+        mean_out = (sum_all - total) / n_out
+        var_out = np.maximum(sq_all - total_sq - n_out * mean_out ** 2, 0) / (n_out - 1)
+        se = np.sqrt(var / count)
+        lift_se = np.sqrt(var / count + var_out / n_out)
+
+    stats = pd.DataFrame({
+        "activities": matrix.vocabulary,
+        "count": count.astype(int),
+        "avg_mood": mean,
+        "std_dev": np.sqrt(var),
+        "ci_low": mean - Z_95 * se,
+        "ci_high": mean + Z_95 * se,
+        "lift": mean - mean_out,
+        "lift_ci_low": mean - mean_out - Z_95 * lift_se,
+        "lift_ci_high": mean - mean_out + Z_95 * lift_se,
+    })
+    return stats[stats["count"] > 0].reset_index(drop=True)
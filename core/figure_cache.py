@@ -0,0 +1,76 @@
+"""
+LRU cache of serialized Plotly figures.
+
+Dashboard reruns triggered by unrelated widgets would otherwise rebuild every
+chart from scratch. Figures are stored as JSON under a key made of the user,
+the version of their data and the view parameters, and rehydrated on a hit.
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+
+import plotly.graph_objs as go
+
+FIGURE_CACHE_SIZE = int(os.getenv("FIGURE_CACHE_SIZE", "256"))
+
+
+class FigureCache:
+    """Thread-safe LRU mapping of cache keys to figure JSON"""
+
+    def __init__(self, maxsize: int = FIGURE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._items: "OrderedDict[Hashable, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[go.Figure]:
+        with self._lock:
+            spec = self._items.get(key)
+            if spec is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+        # The JSON came from an already validated figure, so skip re-validating it
+        return go.Figure(json.loads(spec), _validate=False)
+
+    def set(self, key: Hashable, figure: go.Figure) -> None:
+        spec = figure.to_json()
+        with self._lock:
+            self._items[key] = spec
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def get_or_build(self, key: Hashable, build: Callable[[], go.Figure]) -> go.Figure:
+        figure = self.get(key)
+        if figure is None:
+            figure = build()
+            self.set(key, figure)
+        return figure
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+_figure_cache = FigureCache()
+
+
+def get_figure_cache() -> FigureCache:
+    return _figure_cache
+
+
+def cached_figure(key: Optional[Hashable], build: Callable[[], go.Figure]) -> go.Figure:
+    """Return the cached figure for key, building it on a miss (key=None disables caching)"""
+    if key is None:
+        return build()
+    return _figure_cache.get_or_build(key, build)
@@ -0,0 +1,326 @@
+"""
+Offline IP and coordinate geolocation.
+
+Two memory-mapped NumPy files under data/geoip/ replace the per-render calls
+to ipapi.co and geocode.maps.co:
+
+- ipv4.npy: sorted IPv4 ranges with a country code and approximate
+  coordinates, built from an IP-to-location CSV such as DB-IP lite or
+  IP2Location LITE. A lookup is a binary search over the mapped range starts.
+- countries.npy: a grid of country codes (0.1 degree by default) rasterized
+  from a country-boundary GeoJSON such as Natural Earth. A lookup is one
+  array index.
+
+Results are kept in a process-wide TTL cache keyed by IP or rounded
+coordinates. When a dataset is not installed the lookup falls back to the
+HTTP service it replaces, cached the same way.
+
+Build the datasets from the repository root:
+    python -m core.geoip ip dbip-city-lite.csv --columns 3,6,7
+    python -m core.geoip ip ip2location-lite-db1.csv
+    python -m core.geoip grid ne_50m_admin_0_countries.geojson
+    python -m core.geoip lookup 8.8.8.8
+"""
+
+import argparse
+import bisect
+import ipaddress
+import json
+import math
+import os
+import sys
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from auth.http_client import get_http_session
+from core.ttl_cache import TTLCache
+from core.mood_store import DATA_DIR
+
+GEOIP_DIR = os.path.join(DATA_DIR, "geoip")
+IP_DATABASE = os.getenv("GEOIP_IP_DATABASE", os.path.join(GEOIP_DIR, "ipv4.npy"))
+COUNTRY_GRID = os.getenv("GEOIP_COUNTRY_GRID", os.path.join(GEOIP_DIR, "countries.npy"))
+GRID_RESOLUTION = 0.1
+# Locations change rarely; a day bounds how long a reassigned IP keeps its old answer
+CACHE_TTL_SECONDS = 24 * 3600
+# A failed HTTP lookup is retried after this long rather than hiding the answer for a day
+FAILURE_TTL_SECONDS = 60
+
+IP_DTYPE = np.dtype([("start", "<u4"), ("end", "<u4"), ("country", "S2"),
+                     ("latitude", "<f4"), ("longitude", "<f4")])
+# GeoJSON properties that may hold the ISO 3166-1 alpha-2 code, in order of preference
+ISO_PROPERTIES = ("ISO_A2_EH", "ISO_A2", "iso_a2", "ISO3166-1-Alpha-2", "iso_3166_1_alpha_2")
+
+
+@dataclass(frozen=True)
+class GeoLocation:
+    """Country code and approximate coordinates of an IP address"""
+    country: Optional[str]
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+
+
+_NOT_FOUND = object()
+# Returned by the HTTP lookups on network errors and error responses, unlike
+# None, which is an answer ("no country here")
+_FAILED = object()
+_ip_cache = TTLCache(ttl=CACHE_TTL_SECONDS, maxsize=4096)
+_coord_cache = TTLCache(ttl=CACHE_TTL_SECONDS, maxsize=4096)
+_failed_cache = TTLCache(ttl=FAILURE_TTL_SECONDS, maxsize=4096)
+_datasets: Dict[str, Any] = {}
+_datasets_lock = threading.Lock()
+
+
+def _dataset(path: str) -> Optional[np.ndarray]:
+    """The memory-mapped file at path, or None when it is not installed"""
+    if path not in _datasets:
+        with _datasets_lock:
+            if path not in _datasets:
+                try:
+                    _datasets[path] = np.load(path, mmap_mode="r")
+                except (OSError, ValueError):
+                    _datasets[path] = None
+    return _datasets[path]
+
+
+def reset() -> None:
+    """Forget mapped datasets and cached answers (after rebuilding a dataset)"""
+    with _datasets_lock:
+        _datasets.clear()
+    _ip_cache.clear()
+    _coord_cache.clear()
+    _failed_cache.clear()
+
+
+def is_public_ip(ip: Optional[str]) -> bool:
+    try:
+        return ipaddress.ip_address(ip).is_global
+    except ValueError:
+        return False
+
+
+def _cached(cache: TTLCache, key, lookup):
+    """Cached answer of lookup(); failures give None and are only remembered for FAILURE_TTL_SECONDS"""
+    value = cache.get(key, _NOT_FOUND)
+    if value is not _NOT_FOUND:
+        return value
+    failed_key = (id(cache), key)
+    if _failed_cache.get(failed_key) is not None:
+        return None
+    value = lookup()
+    if value is _FAILED:
+        _failed_cache.set(failed_key, True)
+        return None
+    cache.set(key, value)
+    return value
+
+
+def _lookup_ip_local(table: np.ndarray, address: int) -> Optional[GeoLocation]:
+    # bisect probes ~32 mapped entries; np.searchsorted would copy the strided column first
+    i = bisect.bisect_right(table["start"], address) - 1
+    if i < 0 or address > int(table["end"][i]):
+        return None
+    row = table[i]
+    country = row["country"].decode("ascii") or None
+    latitude, longitude = float(row["latitude"]), float(row["longitude"])
+    if math.isnan(latitude) or math.isnan(longitude):
+        return GeoLocation(country)
+    return GeoLocation(country, latitude, longitude)
+
+
+def _lookup_ip_http(ip: str) -> Any:
+    """GeoLocation from ipapi.co, or _FAILED when the service could not answer"""
+    try:
+        resp = get_http_session().get(f"https://ipapi.co/{ip}/json/", timeout=3)
+        if resp.status_code == 200:
+            data = resp.json()
+            if not data.get("error"):
+                latitude, longitude = data.get("latitude"), data.get("longitude")
+                return GeoLocation((data.get("country_code") or "").upper() or None,
+                                   float(latitude) if latitude is not None else None,
+                                   float(longitude) if longitude is not None else None)
+            if data.get("reserved"):
+                return None  # Not a routable address: a real "no location"
+    except Exception as e:
+        print(f"Error getting location: {e}")
+    return _FAILED
+
+
+def lookup_ip(ip: Optional[str]) -> Optional[GeoLocation]:
+    """Location of a public IPv4 address; None for private, IPv6 or unknown addresses"""
+    def lookup():
+        if not is_public_ip(ip) or ipaddress.ip_address(ip).version != 4:
+            return None
+        table = _dataset(IP_DATABASE)
+        return _lookup_ip_local(table, int(ipaddress.ip_address(ip))) if table is not None else _lookup_ip_http(ip)
+
+    return _cached(_ip_cache, ip, lookup)
+
+
+def _grid_code(grid: np.ndarray, latitude: float, longitude: float) -> Optional[str]:
+    rows, cols = grid.shape
+    resolution = 180 / rows
+    row = min(max(int((90 - latitude) / resolution), 0), rows - 1)
+    col = int((longitude + 180) / resolution) % cols
+    code = int(grid[row, col])
+    return chr(code >> 8) + chr(code & 0xFF) if code else None
+
+
+def _country_http(latitude: float, longitude: float) -> Any:
+    """Country code from geocode.maps.co, None at sea, or _FAILED when the service could not answer"""
+    try:
+        resp = get_http_session().get(f"https://geocode.maps.co/reverse?lat={latitude}&lon={longitude}", timeout=5)
+        if resp.status_code == 200:
+            return resp.json().get("address", {}).get("country_code", "").upper() or None
+    except Exception:
+        pass
+    return _FAILED
+
+
+def country_for_coords(latitude: float, longitude: float) -> Optional[str]:
+    """ISO country code at a coordinate, or None at sea and outside any country"""
+    grid = _dataset(COUNTRY_GRID)
+    if grid is not None:
+        return _grid_code(grid, latitude, longitude)
+    # About 1 km: close enough to share a reverse-geocoding answer
+    key = (round(latitude, 2), round(longitude, 2))
+    return _cached(_coord_cache, key, lambda: _country_http(*key))
+
+
+def _save(path: str, array: np.ndarray) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+
+def _ipv4_column(values: pd.Series) -> np.ndarray:
+    """Dotted or integer IPv4 addresses as uint32"""
+    if not values.str.contains(".", regex=False).any():
+        return values.astype(np.int64).to_numpy().astype(np.uint32)
+    octets = values.str.split(".", expand=True).astype(np.uint32).to_numpy()
+    return (octets[:, 0] << 24) | (octets[:, 1] << 16) | (octets[:, 2] << 8) | octets[:, 3]
+
+
+def build_ip_database(csv_path: str, out_path: Optional[str] = None,
+                      columns: Sequence[int] = (2,)) -> int:
+    """
+    Convert an IP range CSV to the memory-mapped IPv4 table; returns the number of ranges
+
+    The first two columns are the range start and end (dotted or integer).
+    columns gives the country column and optionally the latitude and
+    longitude columns, 0-based. IPv6 rows are skipped.
+    """
+    df = pd.read_csv(csv_path, header=None, dtype=str, keep_default_na=False)
+    if not df.iloc[0, 0].replace(".", "").isdigit():
+        df = df.iloc[1:]  # header row
+    df = df[~df[0].str.contains(":", regex=False)]
+
+    table = np.zeros(len(df), dtype=IP_DTYPE)
+    table["start"] = _ipv4_column(df[0])
+    table["end"] = _ipv4_column(df[1])
+    country = df[columns[0]].str.upper()
+    # "-" and "ZZ" mark unassigned ranges
+    table["country"] = np.where(country.str.fullmatch("[A-Z]{2}") & (country != "ZZ"), country, "")
+    for field, column in zip(("latitude", "longitude"), columns[1:3]):
+        table[field] = pd.to_numeric(df[column], errors="coerce").to_numpy(dtype=np.float32)
+    if len(columns) < 3:
+        table["latitude"] = table["longitude"] = np.nan
+    table.sort(order="start")
+    _save(out_path or IP_DATABASE, table)
+    return len(table)
+
+
+def _feature_code(properties: Dict[str, Any]) -> Optional[str]:
+    for key in ISO_PROPERTIES:
+        code = str(properties.get(key) or "").upper()
+        if len(code) == 2 and code.isalpha():
+            return code
+    return None
+
+
+def _polygons(geometry: Dict[str, Any]) -> Iterable[List[List[List[float]]]]:
+    if geometry["type"] == "Polygon":
+        yield geometry["coordinates"]
+    elif geometry["type"] == "MultiPolygon":
+        yield from geometry["coordinates"]
+
+
+def _fill_polygon(grid: np.ndarray, rings: List[List[List[float]]], value: int, resolution: float) -> None:
+    """Even-odd scanline fill of the cells whose centers fall inside the polygon (holes included)"""
+    edges = []
+    for ring in rings:
+        points = np.asarray(ring, dtype=float)[:, :2]
+        edges.append(np.hstack([points, np.roll(points, -1, axis=0)]))
+    x1, y1, x2, y2 = np.vstack(edges).T
+    rows, cols = grid.shape
+    first = max(int(math.floor((90 - max(y1.max(), y2.max())) / resolution)), 0)
+    last = min(int(math.ceil((90 - min(y1.min(), y2.min())) / resolution)), rows - 1)
+    for row in range(first, last + 1):
+        y = 90 - (row + 0.5) * resolution
+        crossing = (y1 <= y) != (y2 <= y)
+        if not crossing.any():
+            continue
+        xs = np.sort(x1[crossing] + (y - y1[crossing]) * (x2[crossing] - x1[crossing]) / (y2[crossing] - y1[crossing]))
+        # Cells whose centers lie in [left, right) of each inside span
+        starts = np.ceil((xs[0::2] + 180) / resolution - 0.5).astype(int)
+        ends = np.ceil((xs[1::2] + 180) / resolution - 0.5).astype(int)
+        for start, end in zip(np.clip(starts, 0, cols), np.clip(ends, 0, cols)):
+            grid[row, start:end] = value
+
+
+def build_country_grid(geojson_path: str, out_path: Optional[str] = None,
+                       resolution: float = GRID_RESOLUTION) -> int:
+    """Rasterize country boundaries to the memory-mapped grid; returns the number of countries"""
+    with open(geojson_path, "r", encoding="utf-8") as f:
+        features = json.load(f)["features"]
+    grid = np.zeros((int(round(180 / resolution)), int(round(360 / resolution))), dtype="<u2")
+    countries = set()
+    for feature in features:
+        code = _feature_code(feature.get("properties") or {})
+        if code is None or not feature.get("geometry"):
+            continue
+        value = (ord(code[0]) << 8) | ord(code[1])
+        for rings in _polygons(feature["geometry"]):
+            _fill_polygon(grid, rings, value, resolution)
+        countries.add(code)
+    _save(out_path or COUNTRY_GRID, grid)
+    return len(countries)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Build or query the offline geolocation datasets")
+    commands = parser.add_subparsers(dest="command", required=True)
+    ip = commands.add_parser("ip", help="Build the IPv4 table from an IP range CSV")
+    ip.add_argument("csv")
+    ip.add_argument("--columns", default="2",
+                    help="0-based country[,latitude,longitude] columns (DB-IP city lite: 3,6,7)")
+    ip.add_argument("--out", default=None)
+    grid = commands.add_parser("grid", help="Build the country grid from a boundary GeoJSON")
+    grid.add_argument("geojson")
+    grid.add_argument("--resolution", type=float, default=GRID_RESOLUTION, help="Cell size in degrees")
+    grid.add_argument("--out", default=None)
+    lookup = commands.add_parser("lookup", help="Look up an IP address or a lat,lon pair")
+    lookup.add_argument("query")
+    args = parser.parse_args(argv)
+
+    if args.command == "ip":
+        count = build_ip_database(args.csv, args.out, [int(c) for c in args.columns.split(",")])
+        print(f"✅ {count:,} IPv4 ranges -> {args.out or IP_DATABASE}")
+    elif args.command == "grid":
+        count = build_country_grid(args.geojson, args.out, args.resolution)
+        print(f"✅ {count} countries at {args.resolution}° -> {args.out or COUNTRY_GRID}")
+    elif "," in args.query:
+        latitude, longitude = (float(v) for v in args.query.split(","))
+        print(country_for_coords(latitude, longitude))
+    else:
+        print(lookup_ip(args.query))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+"""
+Streaming mood exports.
+
+Entries are read line by line from the user's partition, filtered by date range
+while reading and written out in chunks as CSV, JSON Lines or a JSON array,
+optionally gzip-compressed, so memory use stays flat however long the history.
+
+Usage:
+    python -m core.mood_export user@example.com mood.csv.gz [--format csv] [--days 90] [--gzip]
+"""
+
+import argparse
+import csv
+import io
+import json
+import sys
+import zlib
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, Optional, Union
+
+from core.mood_store import MOOD_LABELS, MOOD_SCORES, iter_user_moods, window_start
+
+EXPORT_FORMATS = ("csv", "jsonl", "json")
+CSV_COLUMNS = ['date', 'time', 'day_of_week', 'mood_level', 'mood_label', 'mood_numeric',
+               'notes', 'context_reason', 'activities', 'timestamp']
+DEFAULT_CHUNK_SIZE = 500
+
+DateBound = Union[date, datetime, None]
+
+
+def _as_datetime(bound: DateBound, end: bool = False) -> Optional[datetime]:
+    if bound is None or isinstance(bound, datetime):
+        return bound
+    # A bare date covers the whole day
+    return datetime.combine(bound, datetime.max.time() if end else datetime.min.time())
+
+
+def iter_export_records(user_email: Optional[str], start: DateBound = None, end: DateBound = None,
+                        anon_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Stream a user's entries within [start, end], enriched with mood_numeric and mood_label"""
+    start, end = _as_datetime(start), _as_datetime(end, end=True)
+    for entry in iter_user_moods(user_email, anon_id):
+        if start is not None or end is not None:
+            try:
+                ts = datetime.fromisoformat(entry["timestamp"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if (start is not None and ts < start) or (end is not None and ts > end):
+                continue
+        level = entry.get("mood_level")
+        entry["mood_numeric"] = MOOD_SCORES.get(level, 3)
+        entry["mood_label"] = MOOD_LABELS.get(level, level)
+        yield entry
+
+
+def _csv_row(entry: Dict[str, Any]) -> list:
+    row = [entry.get(column, "") for column in CSV_COLUMNS]
+    activities = entry.get("activities")
+    row[CSV_COLUMNS.index("activities")] = ", ".join(activities) if isinstance(activities, list) else str(activities or "")
+    return row
+
+
+def _iter_text_chunks(records: Iterator[Dict[str, Any]], fmt: str, chunk_size: int) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n") if fmt == "csv" else None
+    if fmt == "csv":
+        writer.writerow(CSV_COLUMNS)
+    elif fmt == "json":
+        buffer.write("[")
+
+    first = True
+    pending = 0
+    for entry in records:
+        if fmt == "csv":
+            writer.writerow(_csv_row(entry))
+        elif fmt == "jsonl":
+            buffer.write(json.dumps(entry) + "\n")
+        else:
+            buffer.write(("\n" if first else ",\n") + json.dumps(entry, indent=2))
+        first = False
+        pending += 1
+        if pending >= chunk_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+
+    if fmt == "json":
+        buffer.write("\n]" if not first else "]")
+    tail = buffer.getvalue()
+    if tail:
+        yield tail
+
+
+def stream_export(user_email: Optional[str], fmt: str = "csv", start: DateBound = None,
+                  end: DateBound = None, compress: bool = False, anon_id: Optional[str] = None,
+                  chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Stream a user's mood export as encoded chunks
+
+    Args:
+        user_email: Owner of the mood partition
+        fmt: "csv", "jsonl" or "json" (a JSON array)
+        start, end: Optional inclusive date/datetime bounds, applied while reading
+        compress: Emit a gzip stream instead of plain UTF-8
+        chunk_size: Entries per emitted chunk
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    records = iter_export_records(user_email, start, end, anon_id)
+    chunks = (text.encode("utf-8") for text in _iter_text_chunks(records, fmt, chunk_size))
+    if not compress:
+        yield from chunks
+        return
+
+    gzip_stream = zlib.compressobj(wbits=31)  # 31 = gzip container
+    for chunk in chunks:
+        data = gzip_stream.compress(chunk)
+        if data:
+            yield data
+    yield gzip_stream.flush()
+
+
+def export_to_file(user_email: Optional[str], path: str, fmt: str = "csv", start: DateBound = None,
+                   end: DateBound = None, compress: bool = False, anon_id: Optional[str] = None) -> int:
+    """Write an export to path chunk by chunk; returns the number of bytes written"""
+    written = 0
+    with open(path, "wb") as f:
+        for chunk in stream_export(user_email, fmt, start, end, compress, anon_id):
+            f.write(chunk)
+            written += len(chunk)
+    return written
+
+
+def days_to_start(days: Optional[int]) -> Optional[datetime]:
+    return None if days is None else window_start(days)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Export a user's mood history")
+    parser.add_argument("user_email", help="Whose mood data to export")
+    parser.add_argument("path", help="Output file, or '-' for stdout")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+    parser.add_argument("--days", type=int, default=None, help="Only the last N days")
+    parser.add_argument("--start", type=date.fromisoformat, default=None, help="First day (YYYY-MM-DD)")
+    parser.add_argument("--end", type=date.fromisoformat, default=None, help="Last day (YYYY-MM-DD)")
+    parser.add_argument("--gzip", action="store_true", help="Compress the output")
+    args = parser.parse_args(argv)
+
+    start = args.start if args.days is None else days_to_start(args.days)
+    if args.path == "-":
+        for chunk in stream_export(args.user_email, args.format, start, args.end, args.gzip):
+            sys.stdout.buffer.write(chunk)
+        return 0
+    written = export_to_file(args.user_email, args.path, args.format, start, args.end, args.gzip)
+    print(f"✅ Wrote {written / 1024:.1f} KB to {args.path}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""
+Incremental mood rollups.
+
+Daily aggregates (count, mean, min, max and tallies of mood levels,
+activities, context reasons and hours) are updated entry by entry, so the
+dashboard charts cost O(days) to render instead of O(entries).
+"""
+
+from collections import Counter
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from core.mood_store import MOOD_SCORES, window_start
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+def _new_bucket() -> Dict[str, Any]:
+    return {
+        "count": 0,
+        "sum": 0,
+        "min": None,
+        "max": None,
+        "levels": Counter(),
+        "activities": Counter(),
+        # context reason / hour of day -> [count, score sum]
+        "contexts": {},
+        "hours": {},
+    }
+
+
+def _add_score(tallies: Dict[Any, List[int]], key: Any, score: int) -> None:
+    tally = tallies.setdefault(key, [0, 0])
+    tally[0] += 1
+    tally[1] += score
+
+
+def _add_to_bucket(bucket: Dict[str, Any], entry: Dict[str, Any], score: int, hour: int) -> None:
+    bucket["count"] += 1
+    bucket["sum"] += score
+    bucket["min"] = score if bucket["min"] is None else min(bucket["min"], score)
+    bucket["max"] = score if bucket["max"] is None else max(bucket["max"], score)
+    bucket["levels"][entry.get("mood_level")] += 1
+
+    activities = entry.get("activities")
+    if isinstance(activities, list):
+        bucket["activities"].update(a for a in activities if a)
+    elif activities:
+        bucket["activities"][str(activities)] += 1
+
+    _add_score(bucket["contexts"], entry.get("context_reason") or "No specific reason", score)
+    _add_score(bucket["hours"], hour, score)
+
+
+class MoodRollups:
+    """Daily aggregates of one user's mood entries"""
+
+    def __init__(self, entries: Iterable[Dict[str, Any]] = ()):
+        self.daily: Dict[date, Dict[str, Any]] = {}
+        for entry in entries:
+            self.add(entry)
+
+    def add(self, entry: Dict[str, Any]) -> None:
+        try:
+            ts = datetime.fromisoformat(entry["timestamp"])
+        except (KeyError, TypeError, ValueError):
+            return
+        score = MOOD_SCORES.get(entry.get("mood_level"), 3)
+        _add_to_bucket(self.daily.setdefault(ts.date(), _new_bucket()), entry, score, ts.hour)
+
+    def _days(self, days: Optional[int]) -> List[date]:
+        if days is None:
+            return sorted(self.daily)
+        cutoff = window_start(days).date()
+        return sorted(d for d in self.daily if d >= cutoff)
+
+    def summary(self, days: Optional[int] = None) -> Dict[str, Any]:
+        """Merge the daily rollups of the last N days (all days if None)"""
+        merged = _new_bucket()
+        weekdays: Dict[str, List[int]] = {}
+        for day in self._days(days):
+            bucket = self.daily[day]
+            merged["count"] += bucket["count"]
+            merged["sum"] += bucket["sum"]
+            merged["min"] = bucket["min"] if merged["min"] is None else min(merged["min"], bucket["min"])
+            merged["max"] = bucket["max"] if merged["max"] is None else max(merged["max"], bucket["max"])
+            merged["levels"].update(bucket["levels"])
+            merged["activities"].update(bucket["activities"])
+            for field in ("contexts", "hours"):
+                for key, (count, total) in bucket[field].items():
+                    tally = merged[field].setdefault(key, [0, 0])
+                    tally[0] += count
+                    tally[1] += total
+            tally = weekdays.setdefault(WEEKDAYS[day.weekday()], [0, 0])
+            tally[0] += bucket["count"]
+            tally[1] += bucket["sum"]
+        merged["weekdays"] = weekdays
+        merged["mean"] = merged["sum"] / merged["count"] if merged["count"] else None
+        return merged
+
+    def daily_frame(self, days: Optional[int] = None, mood_level: Optional[str] = None) -> pd.DataFrame:
+        """One row per day: date, count, mean, min, max (optionally for a single mood level)"""
+        rows = []
+        for day in self._days(days):
+            bucket = self.daily[day]
+            if mood_level is None:
+                rows.append((day, bucket["count"], bucket["sum"] / bucket["count"], bucket["min"], bucket["max"]))
+            elif bucket["levels"][mood_level]:
+                score = MOOD_SCORES.get(mood_level, 3)
+                rows.append((day, bucket["levels"][mood_level], score, score, score))
+        df = pd.DataFrame(rows, columns=["date", "count", "mean", "min", "max"])
+        df["date"] = pd.to_datetime(df["date"])
+        return df
+
+
+def tally_means(tallies: Dict[Any, List[int]]) -> pd.Series:
+    """Mean score per key from [count, sum] tallies"""
+    return pd.Series({key: total / count for key, (count, total) in tallies.items() if count}, dtype=float)
@@ -0,0 +1,203 @@
+"""
+Online mood statistics.
+
+Welford accumulators keep the count, mean and variance of mood scores per
+weekday and hour of day, and two exponentially weighted means (a
+fast and a slow one) track the recent trend. Each new entry updates them in
+O(1), so insight text never has to regroup the whole log.
+"""
+
+import math
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from core.mood_rollups import WEEKDAYS
+from core.mood_store import MOOD_SCORES
+
+FAST_HALF_LIFE_DAYS = 7.0
+SLOW_HALF_LIFE_DAYS = 28.0
+# Fast minus slow EW mean beyond which the mood counts as trending
+TREND_THRESHOLD = 0.3
+
+
+class RunningStats:
+    """Welford's online count, mean and variance"""
+
+    __slots__ = ("count", "mean", "m2")
+
+    def __init__(self, count: int = 0, mean: float = 0.0, m2: float = 0.0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def merge(self, other: "RunningStats") -> None:
+        """Combine with another accumulator (Chan et al.)"""
+        if not other.count:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.mean += delta * other.count / count
+        self.count = count
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (0 until there are two values)"""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+
+class EWMean:
+    """
+    Time-weighted exponential mean: each value's weight halves every half_life_days
+
+    Kept as decayed weighted sums anchored at the latest timestamp, so values
+    may arrive in any order and the result does not depend on it.
+    """
+
+    def __init__(self, half_life_days: float):
+        self.half_life_days = half_life_days
+        self.weighted_sum = 0.0
+        self.weight = 0.0
+        self.anchor: Optional[datetime] = None
+
+    def _decay(self, later: datetime, earlier: datetime) -> float:
+        return 0.5 ** ((later - earlier).total_seconds() / 86400 / self.half_life_days)
+
+    def add(self, ts: datetime, value: float) -> None:
+        if self.anchor is None or ts >= self.anchor:
+            decay = self._decay(ts, self.anchor) if self.anchor is not None else 0.0
+            self.weighted_sum = self.weighted_sum * decay + value
+            self.weight = self.weight * decay + 1.0
+            self.anchor = ts
+        else:
+            # Back-dated value: weight it by its age relative to the anchor
+            decay = self._decay(self.anchor, ts)
+            self.weighted_sum += decay * value
+            self.weight += decay
+
+    @property
+    def value(self) -> Optional[float]:
+        return self.weighted_sum / self.weight if self.weight else None
+
+
+class MoodStats:
+    """Online mood statistics for one user's entries"""
+
+    def __init__(self, entries: Iterable[Dict[str, Any]] = ()):
+        self.overall = RunningStats()
+        self.weekdays: Dict[str, RunningStats] = {}
+        self.hours: Dict[int, RunningStats] = {}
+        self.fast = EWMean(FAST_HALF_LIFE_DAYS)
+        self.slow = EWMean(SLOW_HALF_LIFE_DAYS)
+        for entry in entries:
+            self.add(entry)
+
+    def add(self, entry: Dict[str, Any]) -> None:
+        try:
+            ts = datetime.fromisoformat(entry["timestamp"])
+        except (KeyError, TypeError, ValueError):
+            return
+        self.add_score(ts, MOOD_SCORES.get(entry.get("mood_level"), 3))
+
+    def add_score(self, ts: datetime, score: float) -> None:
+        self.overall.add(score)
+        self.weekdays.setdefault(WEEKDAYS[ts.weekday()], RunningStats()).add(score)
+        self.hours.setdefault(ts.hour, RunningStats()).add(score)
+        self.fast.add(ts, score)
+        self.slow.add(ts, score)
+
+    @classmethod
+    def from_frame(cls, mood_log: pd.DataFrame) -> "MoodStats":
+        """Build from a ['timestamp', 'mood_score'] frame with vectorized group sums"""
+        stats = cls()
+        if mood_log.empty:
+            return stats
+        timestamps = pd.to_datetime(mood_log["timestamp"])
+        scores = mood_log["mood_score"].astype(float)
+        frame = pd.DataFrame({"score": scores.to_numpy(), "weekday": timestamps.dt.dayofweek.to_numpy(),
+                              "hour": timestamps.dt.hour.to_numpy()})
+        stats.overall = _from_values(frame["score"])
+        stats.weekdays = {WEEKDAYS[key]: s for key, s in _grouped(frame, "weekday").items()}
+        stats.hours = {int(key): s for key, s in _grouped(frame, "hour").items()}
+
+        # Same decayed sums as EWMean.add, anchored at the latest entry
+        latest = timestamps.max()
+        age_days = ((latest - timestamps).dt.total_seconds() / 86400).to_numpy()
+        for ew in (stats.fast, stats.slow):
+            weights = 0.5 ** (age_days / ew.half_life_days)
+            ew.weighted_sum = float(np.dot(weights, scores.to_numpy()))
+            ew.weight = float(weights.sum())
+            ew.anchor = latest.to_pydatetime()
+        return stats
+
+    def frame(self, group: str) -> pd.DataFrame:
+        """Per-key count, mean and std of one group: weekdays or hours"""
+        accumulators = getattr(self, group)
+        return pd.DataFrame(
+            [(key, s.count, s.mean, s.std) for key, s in accumulators.items()],
+            columns=["key", "count", "mean", "std"],
+        ).set_index("key")
+
+    @property
+    def trend(self) -> Optional[float]:
+        """Fast minus slow EW mean: positive when mood is recently above its longer-run level"""
+        if self.fast.value is None:
+            return None
+        return self.fast.value - self.slow.value
+
+    def insights(self) -> List[str]:
+        if not self.overall.count:
+            return []
+        dow = self.frame("weekdays")["mean"].sort_values()
+        hod = self.frame("hours")["mean"].sort_values()
+        lowest_day, highest_day = dow.idxmin(), dow.idxmax()
+        lowest_hour, highest_hour = hod.idxmin(), hod.idxmax()
+        insights = [
+            f"Your average mood is lowest on {lowest_day} (score: {dow[lowest_day]:.2f}).",
+            f"Your average mood is highest on {highest_day} (score: {dow[highest_day]:.2f}).",
+            f"Mood tends to dip at {lowest_hour}:00 (score: {hod[lowest_hour]:.2f}).",
+            f"Mood peaks at {highest_hour}:00 (score: {hod[highest_hour]:.2f})."
+        ]
+        trend = self.trend
+        if trend is not None and abs(trend) >= TREND_THRESHOLD:
+            direction = "up" if trend > 0 else "down"
+            insights.append(f"Your mood is trending {direction} lately "
+                            f"(recent: {self.fast.value:.2f} vs. usual: {self.slow.value:.2f}).")
+        return insights
+
+    def recommendations(self) -> List[str]:
+        if not self.overall.count:
+            return []
+        dow = self.frame("weekdays")["mean"]
+        hod = self.frame("hours")["mean"]
+        recommendations = []
+        if dow.min() < dow.mean() - 0.5:
+            recommendations.append(f"Consider scheduling a Focus Session or Yoga on {dow.idxmin()}.")
+        if hod.min() < hod.mean() - 0.5:
+            recommendations.append(f"Try a Breathing Exercise around {hod.idxmin()}:00 when mood dips.")
+        return recommendations
+
+
+def _from_values(values: pd.Series) -> RunningStats:
+    count = len(values)
+    mean = float(values.mean())
+    return RunningStats(count, mean, float(((values - mean) ** 2).sum()))
+
+
+def _grouped(frame: pd.DataFrame, key: str) -> Dict[Any, RunningStats]:
+    agg = frame.groupby(key)["score"].agg(["count", "mean", "var"])
+    m2 = agg["var"].fillna(0.0) * (agg["count"] - 1)
+    return {k: RunningStats(int(c), float(m), float(v)) for k, c, m, v in zip(agg.index, agg["count"], agg["mean"], m2)}
@@ -0,0 +1,224 @@
+"""
+Per-user mood store.
+
+Each user's mood entries live in their own append-only JSON Lines file under
+data/mood/, so loading costs one user's history and saving an entry is a
+single appended line. The old global data/mood_data.json is split into this
+layout once by a versioned migration.
+
+Entries in the old file were shared by every account and usually carry no
+user_email, so they cannot be attributed during the migration. They are kept
+in an unattributed partition, and the first signed-in user to load their
+history adopts them into their own partition.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional
+
+from core.wearable_store import _safe_id
+
+DATA_DIR = "data"
+MOOD_DIR = os.path.join(DATA_DIR, "mood")
+LEGACY_MOOD_FILE = os.path.join(DATA_DIR, "mood_data.json")
+SCHEMA_FILE_NAME = "_schema.json"
+UNATTRIBUTED_FILE_NAME = "_unattributed.jsonl"
+
+# Bump when adding a step to _MIGRATIONS
+SCHEMA_VERSION = 1
+
+MOOD_LEVELS = ["very_low", "low", "okay", "good", "great"]
+MOOD_SCORES = {"very_low": 1, "low": 2, "okay": 3, "good": 4, "great": 5}
+MOOD_LABELS = {
+    "very_low": "😔 Very Low",
+    "low": "😐 Low",
+    "okay": "😊 Okay",
+    "good": "😄 Good",
+    "great": "🌟 Great"
+}
+
+def window_start(days: int, now: Optional[datetime] = None) -> datetime:
+    """Start of "the last N days": midnight N days ago, so day rollups and entry filters agree"""
+    now = now or datetime.now()
+    return datetime.combine((now - timedelta(days=days)).date(), datetime.min.time())
+
+
+_lock = threading.RLock()
+_migrated_dirs = set()
+
+
+def normalize_entry(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Fill in fields that older entries may be missing"""
+    if 'context_reason' not in entry:
+        entry['context_reason'] = "No specific reason"
+    if not isinstance(entry.get('activities'), list):
+        entry['activities'] = []
+    return entry
+
+
+def user_mood_path(user_email: Optional[str], anon_id: Optional[str] = None) -> str:
+    return os.path.join(MOOD_DIR, f"mood_{_safe_id(user_email, anon_id)}.jsonl")
+
+
+def unattributed_mood_path() -> str:
+    """Legacy entries no user has adopted yet (not a user partition)"""
+    return os.path.join(MOOD_DIR, UNATTRIBUTED_FILE_NAME)
+
+
+def _schema_path() -> str:
+    return os.path.join(MOOD_DIR, SCHEMA_FILE_NAME)
+
+
+def _read_schema_version() -> int:
+    try:
+        with open(_schema_path(), "r", encoding="utf-8") as f:
+            return int(json.load(f).get("version", 0))
+    except (OSError, ValueError):
+        return 0
+
+
+def _write_schema_version(version: int) -> None:
+    tmp_path = _schema_path() + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": version, "migrated_at": datetime.now().isoformat()}, f)
+    os.replace(tmp_path, _schema_path())
+
+
+def _migrate_v1_split_global_file() -> None:
+    """v1: split data/mood_data.json into per-user partitions.
+
+    Entries carrying a user_email go to that user's partition. The rest were
+    shared by every account and go to the unattributed partition until a
+    signed-in user adopts them (see adopt_unattributed_moods).
+    """
+    if not os.path.exists(LEGACY_MOOD_FILE):
+        return
+    try:
+        with open(LEGACY_MOOD_FILE, "r", encoding="utf-8") as f:
+            legacy = json.load(f)
+    except (OSError, ValueError):
+        legacy = []
+
+    partitions: Dict[str, List[Dict[str, Any]]] = {}
+    for entry in legacy if isinstance(legacy, list) else []:
+        if isinstance(entry, dict) and "timestamp" in entry:
+            email = entry.get("user_email")
+            path = user_mood_path(email) if email else unattributed_mood_path()
+            partitions.setdefault(path, []).append(normalize_entry(entry))
+
+    # Nothing can append before the migration finishes, so overwriting keeps a
+    # re-run after an interrupted migration idempotent
+    for path, entries in partitions.items():
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(e) + "\n" for e in entries)
+        os.replace(tmp_path, path)
+
+    # Keep the original as a backup; it is never read again
+    os.replace(LEGACY_MOOD_FILE, LEGACY_MOOD_FILE + ".migrated")
+
+
+_MIGRATIONS = {
+    1: _migrate_v1_split_global_file,
+}
+
+
+def ensure_migrated() -> None:
+    """Create the store and run any pending migrations (once per process)"""
+    if MOOD_DIR in _migrated_dirs:
+        return
+    with _lock:
+        if MOOD_DIR in _migrated_dirs:
+            return
+        os.makedirs(MOOD_DIR, exist_ok=True)
+        version = _read_schema_version()
+        for step in sorted(v for v in _MIGRATIONS if v > version):
+            _MIGRATIONS[step]()
+            _write_schema_version(step)
+        _migrated_dirs.add(MOOD_DIR)
+
+
+def iter_user_moods(user_email: Optional[str], anon_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Stream one user's entries in the order they were recorded"""
+    ensure_migrated()
+    return iter_partition(user_mood_path(user_email, anon_id))
+
+
+def iter_partition(path: str) -> Iterator[Dict[str, Any]]:
+    """Stream the entries of one partition file (see list_mood_partitions)"""
+    if not os.path.exists(path):
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield normalize_entry(json.loads(line))
+            except ValueError:
+                # A torn final line from an interrupted append; skip it
+                continue
+
+
+def load_user_moods(user_email: Optional[str], anon_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    return list(iter_user_moods(user_email, anon_id))
+
+
+def append_mood_entry(user_email: Optional[str], entry: Dict[str, Any], anon_id: Optional[str] = None) -> None:
+    ensure_migrated()
+    line = (json.dumps(entry) + "\n").encode("utf-8")
+    with _lock:
+        with open(user_mood_path(user_email, anon_id), "ab+") as f:
+            # Terminate a torn final line from an interrupted append first, so
+            # the new entry is not glued onto it (and skipped with it)
+            if f.seek(0, os.SEEK_END) > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    line = b"\n" + line
+            f.write(line)
+
+
+def rewrite_user_moods(user_email: Optional[str], entries: List[Dict[str, Any]], anon_id: Optional[str] = None) -> None:
+    """Atomically replace a user's partition (for edits and compaction)"""
+    ensure_migrated()
+    path = user_mood_path(user_email, anon_id)
+    tmp_path = path + ".tmp"
+    with _lock:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(e) + "\n" for e in entries)
+        os.replace(tmp_path, path)
+
+
+def adopt_unattributed_moods(user_email: Optional[str], anon_id: Optional[str] = None) -> int:
+    """Merge the unattributed legacy entries into a user's partition; returns how many were adopted
+
+    Only the first caller gets them: the file is claimed with an atomic rename,
+    so concurrent processes cannot both adopt it.
+    """
+    ensure_migrated()
+    source = unattributed_mood_path()
+    if not os.path.exists(source):
+        return 0
+    claimed = f"{source}.{os.getpid()}.claimed"
+    with _lock:
+        try:
+            os.replace(source, claimed)
+        except FileNotFoundError:
+            return 0
+        adopted = list(iter_partition(claimed))
+        entries = load_user_moods(user_email, anon_id) + adopted
+        entries.sort(key=lambda e: str(e.get("timestamp", "")))
+        rewrite_user_moods(user_email, entries, anon_id)
+        os.remove(claimed)
+    return len(adopted)
+
+
+def list_mood_partitions() -> List[str]:
+    """Paths of every user partition in the store"""
+    ensure_migrated()
+    return sorted(
+        os.path.join(MOOD_DIR, name) for name in os.listdir(MOOD_DIR)
+        if name.startswith("mood_") and name.endswith(".jsonl")
+    )
@@ -8,6 +8,12 @@ import json
 import os
 import google.generativeai
 
+from auth.http_client import get_http_session
+from core.ttl_cache import TTLCache
+from core.geoip import is_public_ip
+
+_public_ip_cache = TTLCache(ttl=3600, maxsize=1)
+
 
 def get_current_time():
     """
@@ -359,14 +365,34 @@ def cached_user_ip():
 
 def get_user_ip():
     """
-    Get the user's public IP address (no caching).
+    Get the server's public IP address, cached process-wide for an hour.
     Returns:
-        str: The user's IP address or 'unknown_ip'.
+        str: The public IP address or 'unknown_ip'.
     """
-    try:
-        return requests.get("https://api.ipify.org").text
-    except:
-        return "unknown_ip"
+    ip = _public_ip_cache.get("ip")
+    if ip is None:
+        try:
+            resp = get_http_session().get("https://api.ipify.org", timeout=5)
+        except Exception:
+            return "unknown_ip"
+        ip = resp.text.strip()
+        # Error pages are not an address; only a real answer is kept for the hour
+        if resp.status_code != 200 or not is_public_ip(ip):
+            return "unknown_ip"
+        _public_ip_cache.set("ip", ip)
+    return ip
+
+
+def get_client_ip():
+    """
+    Get the IP address to geolocate for this session.
+    Returns:
+        str: The browser's address when it is public, otherwise the server's
+        public IP (the app is running on the user's own machine or network).
+    """
+    # st.context.ip_address only exists in recent Streamlit releases
+    ip = getattr(st.context, "ip_address", None) if hasattr(st, "context") else None
+    return ip if is_public_ip(ip) else get_user_ip()
 
 
 def get_memory_file():
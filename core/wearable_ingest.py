@@ -0,0 +1,123 @@
+"""
+Chunked CSV ingestion for the wearable store.
+
+Exports are read with pd.read_csv(chunksize=...), so memory stays bounded by
+the chunk size however many years of minute-level data a file holds. Column
+names are mapped once from the header, and each chunk's timestamps and
+metrics are parsed with whole-column pandas operations before the chunk is
+upserted in one transaction.
+"""
+
+import re
+from itertools import repeat
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from core.wearable_store import METRICS, _normalize_timestamp, append_rows
+
+CHUNK_ROWS = 100_000
+
+# Header names after lowercasing and dropping spaces, "_" and "-"
+COLUMN_ALIASES = {
+    "timestamp": "timestamp", "time": "timestamp", "datetime": "timestamp", "date": "timestamp",
+    "hrvms": "hrv_ms", "hrv": "hrv_ms",
+    "restinghr": "resting_hr", "restingheartrate": "resting_hr",
+    "sleepminutes": "sleep_minutes", "sleep": "sleep_minutes",
+    "sleepefficiency": "sleep_efficiency",
+    "steps": "steps",
+    "activeminutes": "active_minutes",
+}
+
+CsvSource = Union[str, IO[Any]]
+
+
+def map_columns(columns) -> Dict[str, str]:
+    """CSV column -> store field for the columns the store knows; the first match of each field wins"""
+    mapping: Dict[str, str] = {}
+    for column in columns:
+        field = COLUMN_ALIASES.get(re.sub(r"[\s_\-]", "", str(column).lower()))
+        if field and field not in mapping.values():
+            mapping[column] = field
+    if "timestamp" not in mapping.values():
+        raise ValueError("CSV must include a 'timestamp' column.")
+    return mapping
+
+
+def _rewind(source: CsvSource) -> None:
+    if hasattr(source, "seek"):
+        source.seek(0)
+
+
+def read_csv_columns(source: CsvSource) -> Dict[str, str]:
+    """Map the columns of a CSV from its header alone"""
+    _rewind(source)
+    mapping = map_columns(pd.read_csv(source, nrows=0).columns)
+    _rewind(source)
+    return mapping
+
+
+def normalize_timestamps(values: pd.Series) -> Tuple[pd.Series, np.ndarray]:
+    """
+    ISO strings as wearable_store normalizes them one by one, for a whole column
+
+    Returns the strings and a mask of the values that parsed; mixed UTC
+    offsets fall back to per-value parsing.
+    """
+    try:
+        parsed = pd.to_datetime(values, errors="coerce", format="ISO8601")
+    except (ValueError, TypeError):
+        parsed = None
+    if parsed is None or not pd.api.types.is_datetime64_any_dtype(parsed):
+        normalized = values.map(_normalize_timestamp)
+        valid = pd.to_datetime(normalized, errors="coerce", format="ISO8601", utc=True).notna().to_numpy()
+        return normalized, valid
+
+    valid = parsed.notna().to_numpy()
+    offset = None
+    if parsed.dt.tz is not None:
+        offset = parsed.iloc[int(np.argmax(valid))].strftime("%z") if valid.any() else "+0000"
+        parsed = parsed.dt.tz_localize(None)  # wall time in the (single) offset
+    stamps = parsed.to_numpy(dtype="datetime64[us]")
+    text = np.datetime_as_string(stamps, unit="s").astype(object)
+    # datetime.isoformat only shows microseconds when there are some
+    micro = valid & (stamps.astype("datetime64[s]") != stamps)
+    if micro.any():
+        text[micro] = np.datetime_as_string(stamps[micro], unit="us")
+    if offset is not None:
+        text = text + (offset[:3] + ":" + offset[3:])
+    text = pd.Series(text, index=values.index)
+    return text, valid
+
+
+def _column_values(chunk: pd.DataFrame, field: str) -> List[Any]:
+    """A metric column as Python numbers with None for missing or unparseable values"""
+    if field not in chunk:
+        return [None] * len(chunk)
+    values = pd.to_numeric(chunk[field], errors="coerce").to_numpy(dtype=float)
+    return np.where(np.isnan(values), None, values).tolist()
+
+
+def iter_csv_rows(source: CsvSource, provider: str, chunksize: int = CHUNK_ROWS) -> Iterator[Tuple[List[tuple], int]]:
+    """Yield each chunk as (timestamp, provider, *METRICS) rows plus the count of rows skipped for bad timestamps"""
+    mapping = read_csv_columns(source)
+    reader = pd.read_csv(source, usecols=list(mapping), chunksize=chunksize, dtype={c: str for c in mapping
+                                                                                      if mapping[c] == "timestamp"})
+    for chunk in reader:
+        chunk = chunk.rename(columns=mapping)
+        timestamps, valid = normalize_timestamps(chunk["timestamp"])
+        if not valid.all():
+            chunk, timestamps = chunk[valid], timestamps[valid]
+        columns = [_column_values(chunk, m) for m in METRICS]
+        yield list(zip(timestamps.tolist(), repeat(provider), *columns)), int((~valid).sum())
+
+
+def import_wearable_csv(user_email: Optional[str], source: CsvSource, provider: str,
+                        anon_id: Optional[str] = None, chunksize: int = CHUNK_ROWS) -> Tuple[int, int]:
+    """Upsert a wearable CSV chunk by chunk; returns (rows imported, rows skipped for bad timestamps)"""
+    imported = skipped = 0
+    for rows, bad in iter_csv_rows(source, provider, chunksize):
+        imported += append_rows(user_email, rows, provider, anon_id)
+        skipped += bad
+    return imported, skipped
@@ -1,12 +1,61 @@
+"""
+Per-user wearable store.
+
+Each user's wearable data lives in its own SQLite file under data/wearables/.
+Records sit in a table keyed by (timestamp, provider), so an import upserts
+only its own rows through that persistent unique index and a date range is
+an index scan. Consent, provider connections and goals are rows of a
+separate metadata table, so changing one never touches the records. The old
+one-JSON-document-per-user files are imported once, on first access.
+
+Every write also refreshes two rollup tiers for the days it touched: hourly
+and daily per-provider sample counts and sums of each metric. Readers ask
+load_wearable_rollup for the tier that fits their range instead of regrouping
+raw records. Raw records can be limited to a retention window with
+set_raw_retention; the rollups are kept. An import into days whose raw records
+were pruned replaces the rollups of the hours it covers.
+"""
+
 import os
 import json
-from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
 
 
 DATA_DIR = "data"
 WEARABLE_DIR = os.path.join(DATA_DIR, "wearables")
 
+METRICS = ["hrv_ms", "resting_hr", "sleep_minutes", "sleep_efficiency", "steps", "active_minutes"]
+# How a period's value is computed from its samples
+METRIC_AGGREGATES = {
+	"hrv_ms": "mean",
+	"resting_hr": "mean",
+	"sleep_minutes": "sum",
+	"sleep_efficiency": "mean",
+	"steps": "sum",
+	"active_minutes": "sum",
+}
+# Rollup tier -> length of the period key: "2025-01-01T07" and "2025-01-01"
+ROLLUP_TIERS = {"hourly": 13, "daily": 10}
+ROLLUP_VERSION = 1
+_INTERNAL_META = ("revision", "rollup_version")
+
+_lock = threading.Lock()
+_initialized_paths = set()
+
+_ROLLUP_FIELDS = ", ".join(f"n_{m}, sum_{m}" for m in METRICS)
+
+_UPSERT = (
+	f"INSERT INTO records (timestamp, provider, {', '.join(METRICS)}) "
+	f"VALUES (?, ?, {', '.join('?' for _ in METRICS)}) "
+	# Values missing from the new record keep what was stored
+	f"ON CONFLICT (timestamp, provider) DO UPDATE SET "
+	+ ", ".join(f"{m} = COALESCE(excluded.{m}, {m})" for m in METRICS)
+)
+
 
 def _ensure_dirs() -> None:
 	os.makedirs(WEARABLE_DIR, exist_ok=True)
@@ -20,89 +69,337 @@ def _safe_id(user_email: Optional[str], anon_id: Optional[str]) -> str:
 
 def user_wearable_path(user_email: Optional[str], anon_id: Optional[str] = None) -> str:
 	_ensure_dirs()
-	return os.path.join(WEARABLE_DIR, f"wearables_{_safe_id(user_email, anon_id)}.json")
+	return os.path.join(WEARABLE_DIR, f"wearables_{_safe_id(user_email, anon_id)}.db")
 
 
-def load_user_wearables(user_email: Optional[str], anon_id: Optional[str] = None) -> Dict[str, Any]:
-	path = user_wearable_path(user_email, anon_id)
+def _legacy_path(path: str) -> str:
+	return path[:-len(".db")] + ".json"
+
+
+def _init_schema(conn: sqlite3.Connection) -> None:
+	conn.execute("PRAGMA journal_mode=WAL")
+	conn.execute(f"""
+		CREATE TABLE IF NOT EXISTS records (
+			timestamp TEXT NOT NULL,
+			provider TEXT NOT NULL,
+			{', '.join(f'{m} NUMERIC' for m in METRICS)},
+			PRIMARY KEY (timestamp, provider)
+		) WITHOUT ROWID
+	""")
+	conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+	for tier in ROLLUP_TIERS:
+		conn.execute(f"""
+			CREATE TABLE IF NOT EXISTS rollup_{tier} (
+				period TEXT NOT NULL,
+				provider TEXT NOT NULL,
+				{', '.join(f'n_{m} INTEGER NOT NULL, sum_{m} REAL' for m in METRICS)},
+				PRIMARY KEY (period, provider)
+			) WITHOUT ROWID
+		""")
+	# Stores written before the rollups existed get them built once
+	if conn.execute("SELECT 1 FROM meta WHERE key = 'rollup_version'").fetchone() is None:
+		with conn:
+			_refresh_rollups(conn)
+			conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('rollup_version', ?)", (str(ROLLUP_VERSION),))
+
+
+def _refresh_rollups(conn: sqlite3.Connection, start: Optional[str] = None, end: Optional[str] = None) -> None:
+	"""Recompute the hourly and then the daily rollups of the days from start to end (exclusive ISO dates)"""
+	where, params = "", []
+	if start is not None or end is not None:
+		where, params = " AND {col} >= ? AND {col} < ?", [start or "", end or "\uffff"]
+	conn.execute(
+		f"INSERT OR REPLACE INTO rollup_hourly (period, provider, {_ROLLUP_FIELDS}) "
+		f"SELECT substr(timestamp, 1, 13), provider, {', '.join(f'count({m}), sum({m})' for m in METRICS)} "
+		# Timestamps that never parsed are kept raw but belong to no period
+		f"FROM records WHERE timestamp GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]T[0-9][0-9]*'"
+		f"{where.format(col='timestamp')} GROUP BY 1, 2", params)
+	conn.execute(
+		f"INSERT OR REPLACE INTO rollup_daily (period, provider, {_ROLLUP_FIELDS}) "
+		f"SELECT substr(period, 1, 10), provider, {', '.join(f'sum(n_{m}), sum(sum_{m})' for m in METRICS)} "
+		f"FROM rollup_hourly WHERE 1{where.format(col='period')} GROUP BY 1, 2", params)
+
+
+def _refresh_days(conn: sqlite3.Connection, days: Iterable[str]) -> None:
+	"""Refresh the rollups of the given "YYYY-MM-DD" days, one range per run of consecutive days"""
+	parsed = []
+	for day in days:
+		try:
+			parsed.append(date.fromisoformat(day))
+		except ValueError:
+			continue
+	parsed.sort()
+	first = previous = None
+	for day in parsed + [None]:
+		if day is not None and previous is not None and day == previous + timedelta(days=1):
+			previous = day
+			continue
+		if first is not None:
+			_refresh_rollups(conn, first.isoformat(), (previous + timedelta(days=1)).isoformat())
+		first = previous = day
+
+
+def _prune_raw(conn: sqlite3.Connection, retention_days: Optional[int]) -> int:
+	"""Delete raw records from before the retention window (whole days); rollups are kept"""
+	if not retention_days:
+		return 0
+	cutoff = (datetime.utcnow().date() - timedelta(days=int(retention_days))).isoformat()
+	return conn.execute("DELETE FROM records WHERE timestamp < ?", (cutoff,)).rowcount
+
+
+def _metric(value: Any) -> Any:
+	"""A metric value SQLite can bind: numbers pass through, NaN and unparseable values become NULL"""
+	if value is None:
+		return None
+	if hasattr(value, "item"):  # NumPy scalars from pandas rows
+		value = value.item()
+	if isinstance(value, (int, float)) and not isinstance(value, bool):
+		return None if value != value else value
+	try:
+		number = float(value)
+	except (TypeError, ValueError):
+		return None
+	return None if number != number else number
+
+
+def _normalize_timestamp(value: Any) -> str:
+	try:
+		return datetime.fromisoformat(str(value).replace("Z", "+00:00")).isoformat()
+	except Exception:
+		return str(value)
+
+
+def _record_rows(records: List[Dict[str, Any]], provider: Optional[str] = None) -> List[tuple]:
+	return [
+		(_normalize_timestamp(rec["timestamp"]), provider or rec.get("provider") or "unknown",
+		 *(_metric(rec.get(m)) for m in METRICS))
+		for rec in records if "timestamp" in rec
+	]
+
+
+def _set_meta(conn: sqlite3.Connection, values: Dict[str, Any]) -> None:
+	conn.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+	                 [(k, json.dumps(v)) for k, v in values.items()])
+	# Bumped on every write, so readers can tell when to recompute
+	conn.execute("INSERT INTO meta (key, value) VALUES ('revision', '1') "
+	             "ON CONFLICT (key) DO UPDATE SET value = CAST(value AS INTEGER) + 1")
+
+
+def _write_document(path: str, data: Dict[str, Any]) -> None:
+	"""Build a store file from a whole document ({metadata..., "records": [...]}) and swap it in"""
+	tmp_path = path + ".tmp"
+	for leftover in (tmp_path, tmp_path + "-wal", tmp_path + "-shm"):
+		if os.path.exists(leftover):
+			os.remove(leftover)
+	with closing(sqlite3.connect(tmp_path)) as conn:
+		_init_schema(conn)
+		conn.execute("PRAGMA journal_mode=DELETE")  # a single file to rename
+		with conn:
+			conn.executemany(_UPSERT, _record_rows(data.get("records", [])))
+			_refresh_rollups(conn)
+			_set_meta(conn, {k: v for k, v in data.items() if k != "records"})
+	_initialized_paths.discard(path)
+	os.replace(tmp_path, path)
+	for stale in (path + "-wal", path + "-shm"):
+		if os.path.exists(stale):
+			os.remove(stale)
+
+
+def _migrate_legacy(path: str) -> None:
+	"""Import wearables_<id>.json into a new store file, keeping the JSON as a backup"""
+	legacy = _legacy_path(path)
+	with _lock:
+		if os.path.exists(path) or not os.path.exists(legacy):
+			return
+		try:
+			with open(legacy, "r", encoding="utf-8") as f:
+				data = json.load(f)
+		except (OSError, ValueError):
+			return
+		_write_document(path, data if isinstance(data, dict) else {})
+		os.replace(legacy, legacy + ".migrated")
+
+
+def _connect(path: str, create: bool = True) -> Optional[sqlite3.Connection]:
+	"""Connection to a store file (migrating a legacy JSON first); None when it does not exist and create is False"""
 	if not os.path.exists(path):
+		_migrate_legacy(path)
+		if not create and not os.path.exists(path):
+			return None
+	conn = sqlite3.connect(path, timeout=10)
+	if path not in _initialized_paths:
+		_init_schema(conn)
+		_initialized_paths.add(path)
+	return conn
+
+
+def _read_meta(conn: sqlite3.Connection) -> Dict[str, Any]:
+	meta = {"consent": False, "providers": {}}
+	meta.update((k, json.loads(v)) for k, v in conn.execute(
+		f"SELECT key, value FROM meta WHERE key NOT IN ({', '.join('?' for _ in _INTERNAL_META)})", _INTERNAL_META))
+	return meta
+
+
+def _read_records(conn: sqlite3.Connection, start: Optional[str], end: Optional[str]) -> List[Dict[str, Any]]:
+	query, params = f"SELECT timestamp, provider, {', '.join(METRICS)} FROM records", []
+	if start is not None or end is not None:
+		query += " WHERE timestamp >= ? AND timestamp < ?"
+		params = [start or "", end or "\uffff"]
+	columns = ["timestamp", "provider"] + METRICS
+	return [dict(zip(columns, row)) for row in conn.execute(query + " ORDER BY timestamp, provider", params)]
+
+
+def load_wearable_metadata(user_email: Optional[str], anon_id: Optional[str] = None) -> Dict[str, Any]:
+	"""Consent, providers, goals and timestamps without the records"""
+	conn = _connect(user_wearable_path(user_email, anon_id), create=False)
+	if conn is None:
+		return {"consent": False, "providers": {}}
+	with closing(conn):
+		return _read_meta(conn)
+
+
+def load_wearable_records(user_email: Optional[str], anon_id: Optional[str] = None,
+                          start: Optional[str] = None, end: Optional[str] = None) -> List[Dict[str, Any]]:
+	"""Records ordered by timestamp, optionally only those with start <= timestamp < end (ISO strings)"""
+	conn = _connect(user_wearable_path(user_email, anon_id), create=False)
+	if conn is None:
+		return []
+	with closing(conn):
+		return _read_records(conn, start, end)
+
+
+def load_wearable_rollup(user_email: Optional[str], resolution: str = "daily", anon_id: Optional[str] = None,
+                         start: Optional[str] = None, end: Optional[str] = None) -> List[Dict[str, Any]]:
+	"""
+	Per-period metrics from the "hourly" or "daily" tier, combined across providers
+
+	Each row has a "period" (the hour as "YYYY-MM-DDTHH:00:00" or the day as
+	"YYYY-MM-DD") and one value per metric, aggregated as METRIC_AGGREGATES
+	says, or None without samples. start and end are ISO dates or datetimes
+	truncated to the tier's resolution; rows have start <= period < end.
+	"""
+	width = ROLLUP_TIERS[resolution]
+	conn = _connect(user_wearable_path(user_email, anon_id), create=False)
+	if conn is None:
+		return []
+	values = ", ".join(
+		f"CASE WHEN sum(n_{m}) > 0 THEN sum(sum_{m}) / sum(n_{m}) END" if METRIC_AGGREGATES[m] == "mean"
+		else f"CASE WHEN sum(n_{m}) > 0 THEN sum(sum_{m}) END"
+		for m in METRICS)
+	query, params = f"SELECT period, {values} FROM rollup_{resolution}", []
+	if start is not None or end is not None:
+		query += " WHERE period >= ? AND period < ?"
+		params = [(start or "")[:width], (end or "\uffff")[:width]]
+	suffix = ":00:00" if resolution == "hourly" else ""
+	with closing(conn):
+		return [{"period": row[0] + suffix, **dict(zip(METRICS, row[1:]))}
+		        for row in conn.execute(query + " GROUP BY period ORDER BY period", params)]
+
+
+def load_user_wearables(user_email: Optional[str], anon_id: Optional[str] = None) -> Dict[str, Any]:
+	conn = _connect(user_wearable_path(user_email, anon_id), create=False)
+	if conn is None:
 		return {"consent": False, "providers": {}, "records": []}
-	with open(path, "r", encoding="utf-8") as f:
-		return json.load(f)
+	with closing(conn):
+		data = _read_meta(conn)
+		data["records"] = _read_records(conn, None, None)
+	return data
+
+
+def wearable_data_version(user_email: Optional[str], anon_id: Optional[str] = None) -> int:
+	"""Revision of the user's store, which changes on every write (0 when there is none)"""
+	conn = _connect(user_wearable_path(user_email, anon_id), create=False)
+	if conn is None:
+		return 0
+	with closing(conn):
+		row = conn.execute("SELECT value FROM meta WHERE key = 'revision'").fetchone()
+	return int(row[0]) if row else 0
+
+
+def save_wearable_file(path: str, data: Dict[str, Any]) -> None:
+	"""Replace the store file at path with a whole document (metadata keys plus "records")"""
+	os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+	with _lock:
+		_write_document(path, data)
 
 
 def save_user_wearables(user_email: Optional[str], data: Dict[str, Any], anon_id: Optional[str] = None) -> None:
-	_ensure_dirs()
-	path = user_wearable_path(user_email, anon_id)
-	with open(path, "w", encoding="utf-8") as f:
-		json.dump(data, f, indent=2)
+	save_wearable_file(user_wearable_path(user_email, anon_id), data)
+
+
+def _update_meta(user_email: Optional[str], anon_id: Optional[str], values: Dict[str, Any]) -> Dict[str, Any]:
+	with closing(_connect(user_wearable_path(user_email, anon_id))) as conn:
+		with conn:
+			_set_meta(conn, values)
+		return _read_meta(conn)
 
 
 def set_consent(user_email: Optional[str], consent: bool, anon_id: Optional[str] = None) -> Dict[str, Any]:
-	data = load_user_wearables(user_email, anon_id)
-	data["consent"] = bool(consent)
-	data["consent_updated_at"] = datetime.utcnow().isoformat()
-	save_user_wearables(user_email, data, anon_id)
-	return data
+	return _update_meta(user_email, anon_id, {
+		"consent": bool(consent),
+		"consent_updated_at": datetime.utcnow().isoformat(),
+	})
 
 
 def clear_user_wearables(user_email: Optional[str], anon_id: Optional[str] = None) -> None:
 	path = user_wearable_path(user_email, anon_id)
-	if os.path.exists(path):
-		os.remove(path)
-
-
-def append_records(user_email: Optional[str], new_records: List[Dict[str, Any]], provider: str, anon_id: Optional[str] = None) -> Dict[str, Any]:
-	data = load_user_wearables(user_email, anon_id)
-	if not data.get("consent"):
-		raise PermissionError("Consent is required before storing wearable data.")
-	# Normalize timestamps and provider
-	normalized: List[Dict[str, Any]] = []
-	for rec in new_records:
-		if "timestamp" not in rec:
-			continue
-		try:
-			parsed = datetime.fromisoformat(str(rec["timestamp"]).replace("Z", "+00:00"))
-			rec_ts = parsed.isoformat()
-		except Exception:
-			rec_ts = str(rec["timestamp"])
-		normalized.append({
-			"timestamp": rec_ts,
-			"provider": provider,
-			"hrv_ms": rec.get("hrv_ms"),
-			"resting_hr": rec.get("resting_hr"),
-			"sleep_minutes": rec.get("sleep_minutes"),
-			"sleep_efficiency": rec.get("sleep_efficiency"),
-			"steps": rec.get("steps"),
-			"active_minutes": rec.get("active_minutes"),
-		})
-	existing = {(r.get("timestamp"), r.get("provider")): i for i, r in enumerate(data.get("records", []))}
-	for rec in normalized:
-		key = (rec.get("timestamp"), rec.get("provider"))
-		if key in existing:
-			idx = existing[key]
-			merged = {**data["records"][idx], **{k: v for k, v in rec.items() if v is not None}}
-			data["records"][idx] = merged
-		else:
-			data.setdefault("records", []).append(rec)
-	data.setdefault("providers", {}).setdefault(provider, {"connected": False})
-	data["updated_at"] = datetime.utcnow().isoformat()
-	save_user_wearables(user_email, data, anon_id)
-	return data
+	with _lock:
+		_initialized_paths.discard(path)
+		for name in (path, path + "-wal", path + "-shm", _legacy_path(path), _legacy_path(path) + ".migrated"):
+			if os.path.exists(name):
+				os.remove(name)
+
+
+def append_rows(user_email: Optional[str], rows: Iterable[tuple], provider: str, anon_id: Optional[str] = None) -> int:
+	"""
+	Upsert (timestamp, provider, *METRICS) tuples by (timestamp, provider) in one transaction
+
+	Timestamps must already be normalized ISO strings and metrics numbers or
+	None. Returns how many rows were written.
+	"""
+	with closing(_connect(user_wearable_path(user_email, anon_id))) as conn:
+		meta = _read_meta(conn)
+		if not meta.get("consent"):
+			raise PermissionError("Consent is required before storing wearable data.")
+		providers = meta.get("providers", {})
+		days = set()
+
+		def touching(rows):
+			for row in rows:
+				days.add(row[0][:10])
+				yield row
+
+		with conn:
+			written = conn.executemany(_UPSERT, touching(rows)).rowcount
+			_refresh_days(conn, days)
+			_prune_raw(conn, meta.get("raw_retention_days"))
+			updates: Dict[str, Any] = {"updated_at": datetime.utcnow().isoformat()}
+			if provider not in providers:
+				updates["providers"] = {**providers, provider: {"connected": False}}
+			_set_meta(conn, updates)
+	return max(written, 0)
+
+
+def append_records(user_email: Optional[str], new_records: List[Dict[str, Any]], provider: str, anon_id: Optional[str] = None) -> int:
+	"""Upsert record dicts by (timestamp, provider); returns how many were written"""
+	return append_rows(user_email, _record_rows(new_records, provider), provider, anon_id)
 
 
 def set_provider_connection(user_email: Optional[str], provider: str, connected: bool, anon_id: Optional[str] = None) -> Dict[str, Any]:
-	data = load_user_wearables(user_email, anon_id)
-	data.setdefault("providers", {}).setdefault(provider, {})["connected"] = bool(connected)
-	data["updated_at"] = datetime.utcnow().isoformat()
-	save_user_wearables(user_email, data, anon_id)
-	return data
+	providers = load_wearable_metadata(user_email, anon_id).get("providers", {})
+	providers.setdefault(provider, {})["connected"] = bool(connected)
+	return _update_meta(user_email, anon_id, {"providers": providers, "updated_at": datetime.utcnow().isoformat()})
+
+
+def set_raw_retention(user_email: Optional[str], days: Optional[int], anon_id: Optional[str] = None) -> Dict[str, Any]:
+	"""Keep raw records for the given number of days (None keeps them all); older ones are pruned now and after each import"""
+	with closing(_connect(user_wearable_path(user_email, anon_id))) as conn:
+		with conn:
+			_prune_raw(conn, days)
+			_set_meta(conn, {"raw_retention_days": days, "updated_at": datetime.utcnow().isoformat()})
+		return _read_meta(conn)
 
 
 def set_goals(email: str, goals: dict, anon_id: Optional[str] = None) -> Dict[str, Any]:
-    """Saves user-defined goals."""
-    user_data = load_user_wearables(email, anon_id)
-    user_data["goals"] = goals
-    user_data["goals_updated_at"] = datetime.utcnow().isoformat()
-    save_user_wearables(email, user_data, anon_id)
-    return user_data
+	"""Saves user-defined goals."""
+	return _update_meta(email, anon_id, {"goals": goals, "goals_updated_at": datetime.utcnow().isoformat()})
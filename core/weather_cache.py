@@ -0,0 +1,132 @@
+"""
+On-disk cache of daily weather.
+
+Weather is stored per source and grid cell (coordinates rounded to
+GRID_DEGREES, about 11 km) in data/weather/<source>/cell_<lat>_<lon>.json, one
+entry per day, so days served by an offline fixture are never mistaken for
+real weather. A request
+for a date range only fetches the days the cell does not have yet, grouped
+into contiguous runs, and days within RECENT_DAYS of the time they were
+fetched (when stations may still report late) are refetched after
+RECENT_TTL_SECONDS. Days a provider had no data for are cached as empty so
+they are not requested again.
+"""
+
+import json
+import os
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from core.mood_store import DATA_DIR
+
+WEATHER_DIR = os.path.join(DATA_DIR, "weather")
+CACHE_VERSION = 1
+GRID_DEGREES = 0.1
+RECENT_DAYS = 7
+RECENT_TTL_SECONDS = 6 * 3600
+
+# (latitude, longitude, start, end) -> frame with a 'time' column and one row
+# per day, an empty frame when there is no data, or None when the fetch failed
+WeatherFetcher = Callable[[float, float, datetime, datetime], Optional[pd.DataFrame]]
+
+
+def grid_cell(latitude: float, longitude: float) -> Tuple[float, float]:
+    """Center of the grid cell a location falls in"""
+    return (round(round(latitude / GRID_DEGREES) * GRID_DEGREES, 4),
+            round(round(longitude / GRID_DEGREES) * GRID_DEGREES, 4))
+
+
+def weather_cache_path(cell: Tuple[float, float], source: str = "meteostat") -> str:
+    return os.path.join(WEATHER_DIR, source, f"cell_{cell[0]:+.4f}_{cell[1]:+.4f}.json")
+
+
+def _as_date(value) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _load(path: str) -> Dict[str, Dict[str, Any]]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cached.get("days", {}) if cached.get("version") == CACHE_VERSION else {}
+
+
+def _save(path: str, cell: Tuple[float, float], days: Dict[str, Dict[str, Any]]) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"version": CACHE_VERSION, "cell": list(cell), "days": days}, separators=(",", ":")))
+    os.replace(tmp_path, path)
+
+
+def _is_fresh(entry: Optional[Dict[str, Any]], day: date, now: datetime) -> bool:
+    if entry is None:
+        return False
+    fetched_at = datetime.fromisoformat(entry["fetched_at"])
+    # Data fetched once the day was RECENT_DAYS old is final
+    return fetched_at.date() >= day + timedelta(days=RECENT_DAYS) or (now - fetched_at).total_seconds() < RECENT_TTL_SECONDS
+
+
+def _runs(days: List[date]) -> List[Tuple[date, date]]:
+    """Contiguous (first, last) runs of sorted days"""
+    runs: List[Tuple[date, date]] = []
+    for day in days:
+        if runs and day == runs[-1][1] + timedelta(days=1):
+            runs[-1] = (runs[-1][0], day)
+        else:
+            runs.append((day, day))
+    return runs
+
+
+def _rows_by_day(frame: pd.DataFrame) -> Dict[str, Dict[str, Optional[float]]]:
+    values = frame.drop(columns="time")
+    days = pd.to_datetime(frame["time"]).dt.strftime("%Y-%m-%d")
+    numeric = values.apply(pd.to_numeric, errors="coerce").astype(object)
+    numeric = numeric.where(numeric.notna(), None)
+    return {day: {k: (None if v is None else float(v)) for k, v in row.items()}
+            for day, row in zip(days, numeric.to_dict("records"))}
+
+
+def cached_weather(latitude: float, longitude: float, start, end, fetch: WeatherFetcher,
+                   now: Optional[datetime] = None, source: str = "meteostat") -> Optional[pd.DataFrame]:
+    """
+    Daily weather for the grid cell of a location from start to end (inclusive)
+
+    Missing or stale days are fetched with fetch and written back to the
+    cache of source, the name of what fetch serves. Returns a frame with a 'time' column, or None when no day in the
+    range has data.
+    """
+    now = now or datetime.now()
+    start, end = _as_date(start), min(_as_date(end), now.date())
+    cell = grid_cell(latitude, longitude)
+    path = weather_cache_path(cell, source)
+    days = _load(path)
+    wanted = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+    missing = [day for day in wanted if not _is_fresh(days.get(day.isoformat()), day, now)]
+    fetched_at = now.isoformat(timespec="seconds")
+    changed = False
+    for first, last in _runs(missing):
+        frame = fetch(cell[0], cell[1], datetime.combine(first, datetime.min.time()),
+                      datetime.combine(last, datetime.min.time()))
+        if frame is None:
+            continue  # Failed fetches are retried on the next request
+        rows = _rows_by_day(frame) if not frame.empty else {}
+        for offset in range((last - first).days + 1):
+            key = (first + timedelta(days=offset)).isoformat()
+            days[key] = {"fetched_at": fetched_at, "values": rows.get(key)}
+        changed = True
+    if changed:
+        _save(path, cell, days)
+
+    records = [{"time": day, **days[day]["values"]} for day in (d.isoformat() for d in wanted)
+               if day in days and days[day]["values"] is not None]
+    if not records:
+        return None
+    weather_df = pd.DataFrame(records)
+    weather_df["time"] = pd.to_datetime(weather_df["time"])
+    return weather_df
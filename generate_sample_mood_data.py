@@ -1,69 +1,19 @@
 import json
-import os
-from datetime import datetime, timedelta
-import random
+from datetime import date, timedelta
 
-# Create data directory if it doesn't exist
-os.makedirs("data", exist_ok=True)
+from benchmarks.synthetic_data import generate
+from core.mood_store import user_mood_path
 
-# Generate sample mood data for the last 30 days
-mood_data = []
-base_date = datetime.now() - timedelta(days=30)
+# Generate sample mood data for the last 30 days into the signed-out user's partition.
+# For many users and every tracker use: python -m benchmarks.synthetic_data --help
+start = date.today() - timedelta(days=30)
+counts = generate(".", [None], 30, stores=["mood"], entries_per_day=3, n_activities=4, start=start)
 
-mood_levels = ["very_low", "low", "okay", "good", "great"]
-context_reasons = ["Work", "Family", "Health", "Relationships", "Personal goals", "No specific reason"]
-activities_options = ["Exercise", "Socialized", "Ate healthy", "Slept well"]
-
-for i in range(30):
-    current_date = base_date + timedelta(days=i)
-
-    # Create 1-3 entries per day with some randomness
-    entries_per_day = random.randint(1, 3)
-
-    for j in range(entries_per_day):
-        # Add some time variation
-        hour = random.randint(8, 22)
-        minute = random.randint(0, 59)
-        entry_time = current_date.replace(hour=hour, minute=minute)
-
-        # Slightly biased towards positive moods
-        mood_weights = [0.1, 0.2, 0.4, 0.2, 0.1]  # very_low, low, okay, good, great
-        mood_level = random.choices(mood_levels, weights=mood_weights)[0]
-
-        # Generate some sample notes based on mood
-        notes_templates = {
-            "very_low": ["Feeling overwhelmed today", "Had a tough day at work", "Not feeling my best"],
-            "low": ["A bit down today", "Could be better", "Feeling a little off"],
-            "okay": ["Just an average day", "Feeling neutral", "Nothing special today"],
-            "good": ["Had a productive day", "Feeling positive", "Things went well"],
-            "great": ["Amazing day!", "Feeling fantastic", "Everything is going great"]
-        }
-
-        note = random.choice(notes_templates[mood_level])
-
-        # Random context and activities
-        context_reason = random.choice(context_reasons)
-        activities = random.sample(activities_options, random.randint(0, 3))
-
-        entry = {
-            "timestamp": entry_time.isoformat(),
-            "mood_level": mood_level,
-            "notes": note,
-            "context_reason": context_reason,
-            "activities": activities,
-            "date": entry_time.strftime("%Y-%m-%d"),
-            "time": entry_time.strftime("%H:%M"),
-            "day_of_week": entry_time.strftime("%A")
-        }
-
-        mood_data.append(entry)
-
-# Save to JSON file
-with open("data/mood_data.json", "w") as f:
-    json.dump(mood_data, f, indent=2)
-
-print(f"✅ Generated {len(mood_data)} sample mood entries")
-print("📁 Saved to data/mood_data.json")
+path = user_mood_path(None)
+print(f"✅ Generated {counts['mood']} sample mood entries")
+print(f"📁 Saved to {path}")
 print("\n📊 Sample entries created:")
-for i, entry in enumerate(mood_data[:5]):
-    print(f"  {i+1}. {entry['date']} - {entry['mood_level']} - {entry['notes'][:30]}...")
\ No newline at end of file
+with open(path, encoding="utf-8") as f:
+    for i, line in zip(range(5), f):
+        entry = json.loads(line)
+        print(f"  {i+1}. {entry['date']} - {entry['mood_level']} - {entry['notes'][:30]}...")
@@ -1,13 +1,15 @@
 import streamlit as st
 import pandas as pd
-from io import StringIO
 from datetime import datetime
 from core.utils import require_authentication
+from core.wearable_ingest import import_wearable_csv, read_csv_columns
 from core.wearable_store import (
-    load_user_wearables,
+    METRICS,
+    load_wearable_metadata,
+    load_wearable_rollup,
     save_user_wearables,
     set_consent,
-    append_records,
+    set_raw_retention,
     set_provider_connection,
     clear_user_wearables,
     set_goals,
@@ -34,7 +36,7 @@ if not email:
     st.error("User email not found. Please re-login.")
     st.stop()
 
-user_data = load_user_wearables(email)
+user_data = load_wearable_metadata(email)
 
 # --- Page Title ---
 st.title("⌚ Wearables & Physiology")
@@ -90,34 +92,22 @@ if user_data.get("consent"):
         uploaded = st.file_uploader(
             "Upload a CSV file",
             type=["csv"],
-            help="The CSV should have columns: timestamp, hrv_ms, resting_hr, sleep_minutes, sleep_efficiency, steps, active_minutes"
+            help="The CSV should have an ISO 8601 timestamp column and any of: hrv_ms, resting_hr, sleep_minutes, sleep_efficiency, steps, active_minutes"
         )
         
         if uploaded:
             try:
-                df = pd.read_csv(uploaded)
-                colmap = {c.lower().strip().replace("_", ""): c for c in df.columns}
-                
-                if "timestamp" not in colmap:
-                    st.error("CSV must include a 'timestamp' column.")
-                else:
-                    records = []
-                    for _, row in df.iterrows():
-                        rec = {
-                            "timestamp": row[colmap["timestamp"]],
-                            "hrv_ms": row.get(colmap.get("hrvms")),
-                            "resting_hr": row.get(colmap.get("restinghr")),
-                            "sleep_minutes": row.get(colmap.get("sleepminutes")),
-                            "sleep_efficiency": row.get(colmap.get("sleepefficiency")),
-                            "steps": row.get(colmap.get("steps")),
-                            "active_minutes": row.get(colmap.get("activeminutes")),
-                        }
-                        records.append(rec)
-                    
-                    provider_guess = st.selectbox("Select the provider for this import:", ["fitbit", "google_fit", "oura", "unknown"])
-                    if st.button("Import Data", use_container_width=True):
-                        user_data = append_records(email, records, provider_guess)
-                        st.success(f"Successfully imported {len(records)} records!")
+                colmap = read_csv_columns(uploaded)
+                st.caption("Columns found: " + ", ".join(f"{c} → {f}" for c, f in colmap.items()))
+
+                provider_guess = st.selectbox("Select the provider for this import:", ["fitbit", "google_fit", "oura", "unknown"])
+                if st.button("Import Data", use_container_width=True):
+                    with st.spinner("Importing..."):
+                        imported, skipped = import_wearable_csv(email, uploaded, provider_guess)
+                    user_data = load_wearable_metadata(email)
+                    st.success(f"Successfully imported {imported} records!")
+                    if skipped:
+                        st.warning(f"Skipped {skipped} rows with unreadable timestamps.")
             except Exception as e:
                 st.error(f"Failed to parse CSV: {e}")
 
@@ -125,14 +115,14 @@ if user_data.get("consent"):
 
     # --- Data Display and Summaries ---
     st.subheader("📊 Recent Records & Summaries")
-    records = user_data.get("records", [])
+    # Daily rollups, newest first; raw records are never loaded wholesale
+    daily_rows = load_wearable_rollup(email, "daily")
 
-    if not records:
+    if not daily_rows:
         st.info("No wearable records found. Connect a provider or upload a CSV to get started.")
     else:
-        df_view = pd.DataFrame(sorted(records, key=lambda r: r.get("timestamp", ""), reverse=True))
-        df_view["ts"] = pd.to_datetime(df_view["timestamp"], errors="coerce")
-        df_view = df_view.dropna(subset=["ts"]) # Ensure no NaT timestamps
+        df_view = pd.DataFrame(daily_rows[::-1])
+        df_view["ts"] = pd.to_datetime(df_view["period"])
 
         # --- Today's Goal Progress ---
         st.markdown("##### 🏆 Today's Goal Progress")
@@ -156,7 +146,9 @@ if user_data.get("consent"):
                         with goal_cols[i]:
                             goal_data = goals[metric]
                             target = goal_data.get("target", 0)
-                            current_value = today_latest.get(metric, 0)
+                            current_value = today_latest.get(metric)
+                            if pd.isna(current_value):
+                                current_value = 0
                             
                             st.markdown(f"**{metric.replace('_', ' ').title()}**")
                             progress = min(current_value / target, 1.0) if target > 0 else 0
@@ -278,7 +270,13 @@ if user_data.get("consent"):
             start_ts = pd.to_datetime(start_date)
             end_ts = pd.to_datetime(end_date) + pd.Timedelta(days=1)
 
-            df_filtered = df_view[(df_view["ts"] >= start_ts) & (df_view["ts"] < end_ts)]
+            if (end_ts - start_ts).days <= 7:
+                # Short ranges come from the hourly tier
+                hourly = load_wearable_rollup(email, "hourly", start=start_ts.isoformat(), end=end_ts.isoformat())
+                df_filtered = pd.DataFrame(hourly, columns=["period"] + METRICS)
+                df_filtered["ts"] = pd.to_datetime(df_filtered["period"])
+            else:
+                df_filtered = df_view[(df_view["ts"] >= start_ts) & (df_view["ts"] < end_ts)]
 
             if df_filtered.empty:
                 st.info("No data available for the selected date range.")
@@ -321,8 +319,8 @@ if user_data.get("consent"):
         st.divider()
 
         # --- Detailed Records ---
-        st.markdown("##### All Recorded Data")
-        st.dataframe(df_view.drop(columns=["ts"]), use_container_width=True, hide_index=True)
+        st.markdown("##### Daily Data")
+        st.dataframe(df_view.drop(columns=["ts"]).rename(columns={"period": "date"}), use_container_width=True, hide_index=True)
 
     # --- Goal Setting ---
     with st.expander("🎯 Set Your Daily Goals"):
@@ -352,6 +350,19 @@ if user_data.get("consent"):
     # --- Data Controls ---
     st.divider()
     st.subheader("⚙️ Data Controls")
+    retention_options = {"Forever": None, "30 days": 30, "90 days": 90, "1 year": 365}
+    current_retention = user_data.get("raw_retention_days")
+    retention_labels = list(retention_options)
+    retention_choice = st.selectbox(
+        "Keep raw (per-reading) records for:",
+        retention_labels,
+        index=list(retention_options.values()).index(current_retention) if current_retention in retention_options.values() else 0,
+        help="Hourly and daily summaries are kept either way, so charts and insights still cover older data."
+    )
+    if retention_options[retention_choice] != current_retention:
+        user_data = set_raw_retention(email, retention_options[retention_choice])
+        st.success(f"Raw records will be kept for: {retention_choice.lower()}.")
+
     st.warning("This action is irreversible and will permanently delete all your stored wearable data.")
     if st.button("Delete All Wearable Data", type="primary", use_container_width=True):
         clear_user_wearables(email)
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+from components.analytics import analyze_activity_mood_correlation
+from core.activity_matrix import ActivityMatrix, activity_mood_stats
+
+
+def test_matrix_is_binary_csr():
+    matrix = ActivityMatrix.from_lists([["walk", "read", "walk"], [], "yoga", None, ["read", "", np.nan]])
+    assert matrix.shape == (5, 3)
+    assert matrix.indptr.tolist() == [0, 2, 2, 3, 3, 4]
+    assert sorted(matrix.vocabulary[matrix.indices[:2]]) == ["read", "walk"]
+
+
+def test_stats_match_explode_groupby():
+    rng = np.random.default_rng(5)
+    tags = [f"tag{i}" for i in range(40)]
+    activities = [list(rng.choice(tags, rng.integers(0, 4), replace=False)) for _ in range(2000)]
+    scores = rng.integers(1, 6, 2000).astype(float)
+
+    stats = activity_mood_stats(activities, scores).set_index("activities")
+    exploded = pd.DataFrame({"activities": activities, "score": scores}).explode("activities").dropna()
+    expected = exploded.groupby("activities")["score"].agg(["mean", "count", "std"])
+    assert np.allclose(stats.loc[expected.index, "avg_mood"], expected["mean"])
+    assert (stats.loc[expected.index, "count"] == expected["count"]).all()
+    assert np.allclose(stats.loc[expected.index, "std_dev"], expected["std"])
+
+    has_tag = np.array(["tag0" in a for a in activities])
+    assert np.isclose(stats.loc["tag0", "lift"], scores[has_tag].mean() - scores[~has_tag].mean())
+    assert stats.loc["tag0", "ci_low"] < stats.loc["tag0", "avg_mood"] < stats.loc["tag0", "ci_high"]
+
+
+def test_correlation_report_uses_lift():
+    mood_data = pd.DataFrame({
+        "mood_level": ["great", "good", "great", "low", "very_low", "okay"] * 3,
+        "activities": [["walk"], ["walk", "read"], ["walk"], ["work"], ["work"], ["read"]] * 3,
+    })
+    result = analyze_activity_mood_correlation(mood_data)
+    assert result["top_activities"][0]["activities"] == "walk"
+    assert "vs. without" in result["activity_insights"][1]
+    assert result["activity_chart"] is not None
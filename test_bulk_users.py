@@ -0,0 +1,68 @@
+import csv
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from auth import auth_utils
+from auth.bulk_users import export_users, import_users
+
+
+class TestBulkUsers(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "users.db")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write_csv(self, rows):
+        path = os.path.join(self.tmpdir.name, "users.csv")
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=["name", "email", "password"])
+            writer.writeheader()
+            writer.writerows(rows)
+        return path
+
+    def test_import_csv_with_worker_processes(self):
+        rows = [{"name": f"User {i}", "email": f"user{i}@example.com", "password": f"Gr8!Pass{i:03d}x"}
+                for i in range(6)]
+        rows.append(dict(rows[0]))  # duplicate within the file
+        stats = import_users(self.write_csv(rows), db_path=self.db_path, workers=2, chunk_size=4, rounds=4)
+
+        self.assertEqual(stats["inserted"], 6)
+        self.assertEqual(stats["duplicates"], 1)
+
+        # Re-importing skips every row without hashing again
+        stats = import_users(self.write_csv(rows), db_path=self.db_path, workers=1, rounds=4)
+        self.assertEqual(stats["inserted"], 0)
+        self.assertEqual(stats["hashed"], 0)
+
+        out = io.StringIO()
+        self.assertEqual(export_users(out, db_path=self.db_path, include_hashes=True), 6)
+        first = json.loads(out.getvalue().splitlines()[0])
+        self.assertEqual(first["email"], "user0@example.com")
+        self.assertTrue(auth_utils.check_password("Gr8!Pass000x", first["password_hash"]))
+
+    def test_import_jsonl_with_validation(self):
+        path = os.path.join(self.tmpdir.name, "users.jsonl")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"email": "strong@example.com", "password": "MyStr0ng!Pass"}) + "\n")
+            f.write(json.dumps({"email": "weak@example.com", "password": "password"}) + "\n")
+            f.write(json.dumps({"email": "oauth@example.com", "provider": "github", "verified": True}) + "\n")
+
+        stats = import_users(path, db_path=self.db_path, workers=1, validate=True, rounds=4)
+        self.assertEqual(stats["inserted"], 2)
+        self.assertEqual(stats["invalid"], 1)
+
+        out = io.StringIO()
+        export_users(out, db_path=self.db_path)
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([r["email"] for r in records], ["strong@example.com", "oauth@example.com"])
+        self.assertNotIn("password_hash", records[0])
+        self.assertTrue(records[1]["verified"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+import plotly.graph_objs as go
+
+from core.figure_cache import FigureCache
+
+
+def _figure(y):
+    fig = go.Figure(go.Scatter(x=[1, 2, 3], y=y, mode="lines+markers"))
+    fig.update_layout(title="Mood", height=300)
+    return fig
+
+
+def test_hit_returns_equivalent_figure_without_rebuilding():
+    cache = FigureCache(maxsize=4)
+    builds = []
+
+    def build():
+        builds.append(1)
+        return _figure([1, 3, 5])
+
+    first = cache.get_or_build(("a@x.com", (10, 1), "trend", 30), build)
+    second = cache.get_or_build(("a@x.com", (10, 1), "trend", 30), build)
+    assert len(builds) == 1 and cache.hits == 1
+    assert second.to_dict() == first.to_dict()
+
+    # A new data version is a different key
+    cache.get_or_build(("a@x.com", (20, 2), "trend", 30), build)
+    assert len(builds) == 2
+
+
+def test_least_recently_used_figure_is_evicted():
+    cache = FigureCache(maxsize=2)
+    cache.set("a", _figure([1]))
+    cache.set("b", _figure([2]))
+    cache.get("a")
+    cache.set("c", _figure([3]))
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert len(cache) == 2
@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+import core.mood_store as mood_store
+from components import forecast_batch
+from components.predictive_analytics import predict_mood_trends
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(mood_store, "MOOD_DIR", str(tmp_path / "mood"))
+    monkeypatch.setattr(mood_store, "LEGACY_MOOD_FILE", str(tmp_path / "mood_data.json"))
+    monkeypatch.setattr(mood_store, "_migrated_dirs", set())
+    monkeypatch.setattr(forecast_batch, "FORECAST_DIR", str(tmp_path / "forecasts"))
+    now = datetime.now().replace(hour=9, minute=0, second=0, microsecond=0)
+    levels = ["low", "okay", "good", "very_low", "great"]
+    for day in range(20):
+        ts = (now - timedelta(days=20 - day)).isoformat()
+        mood_store.append_mood_entry("a@x.com", {"timestamp": ts, "mood_level": levels[day * 3 % 5]})
+        if day >= 17:
+            mood_store.append_mood_entry("b@x.com", {"timestamp": ts, "mood_level": "okay"})
+    return tmp_path
+
+
+def _path(email):
+    return mood_store.user_mood_path(email)
+
+
+def test_batch_forecasts_every_user_and_skips_unchanged(store):
+    results = forecast_batch.run_batch(workers=2)
+    assert results == {_path("a@x.com"): "forecast", _path("b@x.com"): "skipped"}
+    assert set(forecast_batch.run_batch(workers=2).values()) == {"unchanged"}
+
+
+def test_dashboard_lookup_matches_live_forecast_until_data_changes(store):
+    forecast_batch.run_batch(workers=1)
+    mood_log = forecast_batch.read_mood_log(_path("a@x.com"))
+    version = forecast_batch.partition_version(_path("a@x.com"))
+
+    cached = forecast_batch.load_cached_prediction("a@x.com", mood_log, version)
+    live = predict_mood_trends(mood_log, forecast_days=7, alert_threshold=2.8)
+    np.testing.assert_allclose(cached["forecast"].to_numpy(), live["forecast"].to_numpy(), atol=1e-3)
+    assert cached["forecast"].index.equals(live["forecast"].index)
+    assert cached["alerts"] == live["alerts"] and len(cached["charts"]) == 1
+
+    short = forecast_batch.load_cached_prediction("b@x.com", mood_log, forecast_batch.partition_version(_path("b@x.com")))
+    assert short["forecast"] is None and "7 days" in short["model_info"]
+
+    mood_store.append_mood_entry("a@x.com", {"timestamp": datetime.now().isoformat(), "mood_level": "good"})
+    assert forecast_batch.load_cached_prediction("a@x.com", mood_log, forecast_batch.partition_version(_path("a@x.com"))) is None
+
+
+def test_batch_window_is_the_dashboards(store):
+    # Early on the first day of the window: inside it, though more than 30 x 24 hours ago
+    first_day = mood_store.window_start(forecast_batch.WINDOW_DAYS)
+    mood_store.append_mood_entry("c@x.com", {"timestamp": first_day.isoformat(), "mood_level": "good"})
+    mood_store.append_mood_entry("c@x.com", {"timestamp": (first_day - timedelta(seconds=1)).isoformat(),
+                                             "mood_level": "low"})
+    mood_log = forecast_batch.read_mood_log(_path("c@x.com"))
+    assert list(mood_log["timestamp"]) == [first_day]
@@ -0,0 +1,72 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from components import forecast_jobs
+from components import predictive_analytics as pa
+
+
+@pytest.fixture
+def mood_log():
+    rng = np.random.default_rng(1)
+    timestamps = pd.date_range("2024-01-01 09:00", periods=30, freq="D")
+    return pd.DataFrame({"timestamp": timestamps, "mood_score": rng.integers(1, 6, 30).astype(float)})
+
+
+@pytest.fixture(autouse=True)
+def fresh_jobs():
+    forecast_jobs._results.clear()
+    forecast_jobs._latest.clear()
+    forecast_jobs._failures.clear()
+    yield
+    forecast_jobs.shutdown()
+
+
+def test_job_runs_in_pool_and_is_deduplicated(mood_log):
+    series = pa.prepare_time_series_data(mood_log)
+    job_id = forecast_jobs.submit_forecast(series, 7, "ets", model_key="a@x.com")
+    assert forecast_jobs.submit_forecast(series, 7, "ets", model_key="a@x.com") == job_id
+
+    result = forecast_jobs.job_result(job_id, timeout=120)
+    assert forecast_jobs.job_status(job_id) == "done"
+    expected = pa.compute_forecast(series, 7, "ets")
+    np.testing.assert_allclose(result["forecast"].to_numpy(), expected["forecast"].to_numpy())
+    assert forecast_jobs.latest_forecast("a@x.com", "ets", 7) is result
+
+
+def test_background_prediction_shows_placeholder_then_last_forecast(mood_log, monkeypatch):
+    # A saturated pool refuses new jobs, so nothing is fitted in this process either
+    monkeypatch.setattr(forecast_jobs, "MAX_PENDING_JOBS", 0)
+    monkeypatch.setattr(pa, "compute_forecast", None)
+
+    placeholder = pa.predict_mood_trends(mood_log, model="arima", model_key="b@x.com", background=True)
+    assert placeholder["forecast"] is None and placeholder["pending"]
+
+    series = pa.prepare_time_series_data(mood_log)
+    forecast_jobs._latest.set(("b@x.com", "arima", 7), pa.forecast_exponential_smoothing(series[:-3], 7))
+    stale = pa.predict_mood_trends(mood_log, model="arima", model_key="b@x.com", background=True)
+    assert stale["pending"] and len(stale["forecast"]) == 7
+    assert stale["model_info"].endswith("(updating in the background)")
+
+
+def test_failed_jobs_are_not_cached_as_results(mood_log, monkeypatch):
+    calls = []
+
+    def crash(*args):
+        calls.append(args)
+        raise RuntimeError("worker crashed")
+
+    monkeypatch.setattr(forecast_jobs, "_run_forecast", crash)
+    monkeypatch.setattr(forecast_jobs, "_executor", ThreadPoolExecutor(1))
+    series = pa.prepare_time_series_data(mood_log)
+    job_id = forecast_jobs.submit_forecast(series, 7, "ets")
+    assert forecast_jobs.job_result(job_id, timeout=10) == {}
+    assert forecast_jobs.job_status(job_id) == "failed"
+    # Not resubmitted on every rerun, but once the retry delay has passed
+    assert forecast_jobs.submit_forecast(series, 7, "ets") == job_id and len(calls) == 1
+    forecast_jobs._failures.clear()
+    forecast_jobs.submit_forecast(series, 7, "ets")
+    forecast_jobs.job_result(job_id, timeout=10)
+    assert len(calls) == 2
@@ -0,0 +1,80 @@
+import json
+
+import numpy as np
+import pytest
+
+from core import geoip
+
+
+@pytest.fixture
+def datasets(tmp_path, monkeypatch):
+    monkeypatch.setattr(geoip, "IP_DATABASE", str(tmp_path / "ipv4.npy"))
+    monkeypatch.setattr(geoip, "COUNTRY_GRID", str(tmp_path / "countries.npy"))
+    geoip.reset()
+    yield tmp_path
+    geoip.reset()
+
+
+def test_ip_ranges_resolve_locally(datasets, monkeypatch):
+    csv = datasets / "ranges.csv"
+    csv.write_text(
+        "ip_start,ip_end,continent,country,region,city,latitude,longitude\n"
+        "8.8.4.0,8.8.8.255,NA,US,California,Mountain View,37.4,-122.1\n"
+        "1.0.0.0,1.0.0.255,OC,AU,Queensland,Brisbane,-27.5,153.0\n"
+        "2001:db8::,2001:db8::ffff,EU,DE,Berlin,Berlin,52.5,13.4\n"
+        "81.2.69.0,81.2.69.255,EU,ZZ,,,,\n"
+    )
+    assert geoip.build_ip_database(str(csv), columns=[3, 6, 7]) == 3
+    monkeypatch.setattr(geoip, "_lookup_ip_http", lambda ip: pytest.fail("no HTTP with a local table"))
+
+    google = geoip.lookup_ip("8.8.8.8")
+    assert google.country == "US" and google.latitude == pytest.approx(37.4)
+    assert geoip.lookup_ip("1.0.0.7").country == "AU"
+    assert geoip.lookup_ip("8.8.9.0") is None  # between ranges
+    assert geoip.lookup_ip("81.2.69.1") == geoip.GeoLocation(None)
+    assert geoip.lookup_ip("192.168.1.10") is None and geoip.lookup_ip("not an ip") is None
+
+
+def test_lookups_are_cached_per_ip(datasets, monkeypatch):
+    calls = []
+    monkeypatch.setattr(geoip, "_lookup_ip_http", lambda ip: calls.append(ip) or geoip.GeoLocation("GB"))
+    assert geoip.lookup_ip("81.2.69.142").country == "GB"
+    assert geoip.lookup_ip("81.2.69.142").country == "GB"
+    assert calls == ["81.2.69.142"]
+
+
+def test_failed_http_lookups_are_retried_soon(datasets, monkeypatch):
+    answers = [geoip._FAILED, geoip.GeoLocation("IN")]
+    calls = []
+    monkeypatch.setattr(geoip, "_lookup_ip_http", lambda ip: calls.append(ip) or answers.pop(0))
+    assert geoip.lookup_ip("81.2.69.142") is None
+    assert geoip.lookup_ip("81.2.69.142") is None
+    assert len(calls) == 1  # failures are remembered briefly, not hammered
+
+    geoip._failed_cache.clear()  # FAILURE_TTL_SECONDS later
+    assert geoip.lookup_ip("81.2.69.142").country == "IN"
+    assert geoip.lookup_ip("81.2.69.142").country == "IN" and len(calls) == 2
+
+
+def test_country_grid_from_geojson(datasets):
+    square = [[0, 0], [10, 0], [10, 10], [0, 10], [0, 0]]
+    hole = [[4, 4], [6, 4], [6, 6], [4, 6], [4, 4]]
+    features = [
+        {"type": "Feature", "properties": {"ISO_A2": "-99", "ISO_A2_EH": "FR"},
+         "geometry": {"type": "Polygon", "coordinates": [square, hole]}},
+        {"type": "Feature", "properties": {"ISO_A2": "NZ"},
+         "geometry": {"type": "MultiPolygon", "coordinates": [
+             [[[170, -45], [175, -45], [175, -40], [170, -40], [170, -45]]],
+             [[[-179, -20], [-178, -20], [-178, -19], [-179, -19], [-179, -20]]],
+         ]}},
+    ]
+    path = datasets / "countries.geojson"
+    path.write_text(json.dumps({"type": "FeatureCollection", "features": features}))
+    assert geoip.build_country_grid(str(path), resolution=0.5) == 2
+
+    assert geoip.country_for_coords(2.2, 8.9) == "FR"
+    assert geoip.country_for_coords(5.0, 5.0) is None  # inside the hole
+    assert geoip.country_for_coords(-42.0, 172.3) == "NZ"
+    assert geoip.country_for_coords(-19.6, -178.4) == "NZ"
+    assert geoip.country_for_coords(30.0, -40.0) is None
+    assert np.load(geoip.COUNTRY_GRID, mmap_mode="r").shape == (360, 720)
@@ -0,0 +1,88 @@
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+
+from auth.mail_outbox import MailSender, enqueue_email, message_status, outbox_stats
+from auth.smtp_stub import StubSMTPServer
+
+
+class TestMailOutbox(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "outbox.db")
+        self.server = StubSMTPServer().start()
+
+    def tearDown(self):
+        self.server.stop()
+        self.tmpdir.cleanup()
+
+    def make_sender(self, **kwargs):
+        options = dict(db_path=self.db_path, host=self.server.host, port=self.server.port,
+                       username="talkheal@example.com", password="secret", use_ssl=False,
+                       rate_per_minute=0, backoff_base=0)
+        options.update(kwargs)
+        return MailSender(**options)
+
+    def test_messages_share_one_connection(self):
+        for i in range(5):
+            enqueue_email(f"user{i}@example.com", "Hello", "Body", db_path=self.db_path)
+
+        sender = self.make_sender()
+        self.assertEqual(sender.process_pending(), 5)
+        sender.stop()
+
+        self.assertEqual(len(self.server.messages), 5)
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(self.server.logins, 1)
+        self.assertEqual(outbox_stats(self.db_path), {"sent": 5})
+
+    def test_transient_failure_is_retried(self):
+        enqueue_email("user@example.com", "Hello", "Body", db_path=self.db_path)
+        self.server.fail_next = 1
+
+        sender = self.make_sender()
+        sender.process_pending()
+        sender.stop()
+
+        self.assertEqual(len(self.server.messages), 1)
+        self.assertEqual(outbox_stats(self.db_path), {"sent": 1})
+
+    def test_gives_up_after_max_attempts(self):
+        enqueue_email("user@example.com", "Hello", "Body", db_path=self.db_path)
+        self.server.fail_next = 10
+
+        sender = self.make_sender(max_attempts=3)
+        sender.process_pending()
+        sender.stop()
+
+        self.assertEqual(self.server.messages, [])
+        self.assertEqual(outbox_stats(self.db_path), {"failed": 1})
+        status = message_status(1, self.db_path)
+        self.assertEqual((status["status"], status["attempts"]), ("failed", 3))
+        self.assertTrue(status["last_error"])
+
+    def test_message_is_claimed_by_one_sender(self):
+        msg_id = enqueue_email("user@example.com", "Hello", "Body", db_path=self.db_path)
+        first, second = self.make_sender(), self.make_sender()
+        with sqlite3.connect(self.db_path) as conn:
+            row = first._next_due(conn)
+            # Both senders read the row; only the first claim wins
+            self.assertTrue(first._claim(conn, msg_id, row[5], row[6]))
+            self.assertFalse(second._claim(conn, msg_id, row[5], row[6]))
+        self.assertEqual(second.process_pending(), 0)
+        self.assertEqual(outbox_stats(self.db_path), {"sending": 1})
+
+        # A claim left behind by a sender that died is picked up once it times out
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("UPDATE outbox SET next_attempt_at = ?", (time.time() - 1,))
+        self.assertEqual(second.process_pending(), 1)
+        first.stop()
+        second.stop()
+        self.assertEqual(len(self.server.messages), 1)
+        self.assertEqual(message_status(msg_id, self.db_path)["status"], "sent")
+
+
+if __name__ == "__main__":
+    unittest.main()
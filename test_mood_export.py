@@ -0,0 +1,50 @@
+import csv
+import gzip
+import io
+import json
+from datetime import date, datetime
+
+import pytest
+
+import core.mood_store as mood_store
+from core.mood_export import stream_export
+
+
+@pytest.fixture
+def user(tmp_path, monkeypatch):
+    monkeypatch.setattr(mood_store, "MOOD_DIR", str(tmp_path / "mood"))
+    monkeypatch.setattr(mood_store, "LEGACY_MOOD_FILE", str(tmp_path / "mood_data.json"))
+    monkeypatch.setattr(mood_store, "_migrated_dirs", set())
+    for day in range(1, 11):
+        ts = datetime(2024, 3, day, 8, 30)
+        mood_store.append_mood_entry("a@x.com", {
+            "timestamp": ts.isoformat(), "mood_level": "good" if day % 2 else "low",
+            "notes": f"day {day}", "context_reason": "Work", "activities": ["walk", "read"],
+            "date": ts.strftime("%Y-%m-%d"), "time": "08:30", "day_of_week": ts.strftime("%A"),
+        })
+    return "a@x.com"
+
+
+def _text(chunks):
+    return b"".join(chunks).decode("utf-8")
+
+
+def test_formats_and_date_range_pushdown(user):
+    rows = list(csv.DictReader(io.StringIO(_text(stream_export(user, "csv", chunk_size=3)))))
+    assert len(rows) == 10
+    assert rows[0]["activities"] == "walk, read" and rows[0]["mood_numeric"] == "4"
+
+    jsonl = _text(stream_export(user, "jsonl", start=date(2024, 3, 3), end=date(2024, 3, 5)))
+    assert [json.loads(line)["notes"] for line in jsonl.splitlines()] == ["day 3", "day 4", "day 5"]
+
+    array = json.loads(_text(stream_export(user, "json", start=datetime(2024, 3, 9), chunk_size=1)))
+    assert [e["mood_label"] for e in array] == ["😄 Good", "😐 Low"]
+    assert json.loads(_text(stream_export(user, "json", start=date(2025, 1, 1)))) == []
+
+
+def test_gzip_stream_matches_plain_export(user):
+    plain = b"".join(stream_export(user, "csv"))
+    compressed = list(stream_export(user, "csv", compress=True, chunk_size=2))
+    assert gzip.decompress(b"".join(compressed)) == plain
+    with pytest.raises(ValueError):
+        list(stream_export(user, "xml"))
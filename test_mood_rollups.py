@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta
+
+from core.mood_rollups import MoodRollups, tally_means
+
+
+def _entry(ts, level, context="No specific reason", activities=()):
+    return {"timestamp": ts.isoformat(), "mood_level": level, "context_reason": context, "activities": list(activities)}
+
+
+def test_rollups_match_raw_aggregates():
+    now = datetime.now().replace(hour=12, minute=0, second=0, microsecond=0)
+    entries = [
+        _entry(now - timedelta(days=1, hours=3), "great", "Work", ["run"]),
+        _entry(now - timedelta(days=1), "low", "Work"),
+        _entry(now, "good", "Family", ["run", "read"]),
+        _entry(now - timedelta(days=60), "very_low"),
+    ]
+    rollups = MoodRollups(entries[:2])
+    for entry in entries[2:]:
+        rollups.add(entry)
+
+    daily = rollups.daily_frame(30)
+    assert list(daily["count"]) == [2, 1]
+    assert list(daily["mean"]) == [3.5, 4.0]
+    assert list(daily["min"]) == [2, 4] and list(daily["max"]) == [5, 4]
+
+    summary = rollups.summary(30)
+    assert summary["count"] == 3 and summary["mean"] == 11 / 3
+    assert summary["activities"]["run"] == 2
+    assert tally_means(summary["contexts"])["Work"] == 3.5
+    assert tally_means(summary["hours"])[9] == 5.0
+    assert rollups.summary()["count"] == 4
+
+    assert list(rollups.daily_frame(30, mood_level="good")["count"]) == [1]
+
+
+def test_windows_agree_across_rollups_frame_and_export(tmp_path, monkeypatch):
+    import streamlit as st
+    import core.mood_store as mood_store
+    from components.mood_dashboard import MoodTracker
+    from core.mood_export import days_to_start, iter_export_records
+
+    monkeypatch.setattr(mood_store, "MOOD_DIR", str(tmp_path / "mood"))
+    monkeypatch.setattr(mood_store, "LEGACY_MOOD_FILE", str(tmp_path / "mood_data.json"))
+    monkeypatch.setattr(mood_store, "_migrated_dirs", set())
+    st.session_state.pop("mood_data", None)
+    tracker = MoodTracker("w@x.com")
+    start = mood_store.window_start(7)
+    # Early and late on the first day of the window, and just before it
+    for ts in (start + timedelta(minutes=1), start + timedelta(hours=23), start - timedelta(minutes=1)):
+        tracker.add_mood_entry("good", timestamp=ts.isoformat())
+
+    assert tracker.get_mood_rollups().summary(7)["count"] == 2
+    assert len(tracker.get_mood_dataframe(7)) == 2
+    assert len(list(iter_export_records("w@x.com", start=days_to_start(7)))) == 2
@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from components.analytics import analyze_mood_trends
+from core.mood_stats import MoodStats, RunningStats
+from core.mood_store import MOOD_LEVELS
+
+
+def _entries(n=200, seed=3):
+    rng = np.random.default_rng(seed)
+    start = datetime(2024, 1, 1, 8)
+    return [
+        {
+            "timestamp": (start + timedelta(hours=int(h))).isoformat(),
+            "mood_level": MOOD_LEVELS[int(level)],
+        }
+        for h, level in zip(np.sort(rng.integers(0, 24 * 90, n)), rng.integers(0, 5, n))
+    ]
+
+
+def test_running_stats_match_numpy_and_merge():
+    values = np.random.default_rng(0).normal(3, 1, 500)
+    left, right = RunningStats(), RunningStats()
+    for v in values[:200]:
+        left.add(v)
+    for v in values[200:]:
+        right.add(v)
+    left.merge(right)
+    assert left.count == 500
+    assert np.isclose(left.mean, values.mean()) and np.isclose(left.variance, values.var(ddof=1))
+
+
+def test_incremental_stats_agree_with_groupby_and_frame_build():
+    entries = _entries()
+    stats = MoodStats(reversed(entries))  # arrival order does not matter
+    frame = pd.DataFrame({
+        "timestamp": pd.to_datetime([e["timestamp"] for e in entries]),
+        "mood_score": [MOOD_LEVELS.index(e["mood_level"]) + 1 for e in entries],
+    })
+
+    by_day = frame.groupby(frame["timestamp"].dt.day_name())["mood_score"]
+    weekdays = stats.frame("weekdays")
+    assert np.allclose(weekdays["mean"], by_day.mean()[weekdays.index])
+    assert np.allclose(weekdays["std"], by_day.std()[weekdays.index])
+
+    built = MoodStats.from_frame(frame)
+    assert np.isclose(built.fast.value, stats.fast.value) and np.isclose(built.slow.value, stats.slow.value)
+    assert built.insights() == stats.insights()
+    assert analyze_mood_trends(frame)["insights"] == analyze_mood_trends(frame, stats=stats)["insights"]
+
+
+def test_trend_insight_follows_recent_entries():
+    stats = MoodStats()
+    start = datetime(2024, 1, 1, 9)
+    for day in range(60):
+        stats.add_score(start + timedelta(days=day), 4 if day < 50 else 1)
+    assert stats.trend < 0
+    assert any("trending down" in insight for insight in stats.insights())
+
+
+def test_tracker_window_stats_ignore_older_entries(tmp_path, monkeypatch):
+    import streamlit as st
+    import core.mood_store as mood_store
+    from components.mood_dashboard import MoodTracker
+
+    monkeypatch.setattr(mood_store, "MOOD_DIR", str(tmp_path / "mood"))
+    monkeypatch.setattr(mood_store, "LEGACY_MOOD_FILE", str(tmp_path / "mood_data.json"))
+    monkeypatch.setattr(mood_store, "_migrated_dirs", set())
+    st.session_state.pop("mood_data", None)
+    tracker = MoodTracker("w@x.com")
+    now = datetime.now().replace(microsecond=0)
+    tracker.add_mood_entry("very_low", timestamp=(now - timedelta(days=60)).isoformat())
+    tracker.add_mood_entry("great", timestamp=(now - timedelta(days=2)).isoformat())
+
+    window = tracker.get_mood_stats(30)
+    assert window.overall.count == 1 and window.overall.mean == 5
+
+    # New entries update the window in place; ones before it are left out
+    tracker.add_mood_entry("okay", timestamp=(now - timedelta(days=1)).isoformat())
+    tracker.add_mood_entry("low", timestamp=(now - timedelta(days=45)).isoformat())
+    assert tracker.get_mood_stats(30) is window
+    assert window.overall.count == 2 and window.overall.mean == 4
+    assert window.insights() == MoodStats.from_frame(
+        tracker.get_mood_dataframe(30)[["timestamp", "mood_numeric"]].rename(columns={"mood_numeric": "mood_score"})).insights()
@@ -0,0 +1,113 @@
+import json
+import os
+from datetime import datetime
+
+import pytest
+
+import core.mood_store as mood_store
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(mood_store, "MOOD_DIR", str(tmp_path / "mood"))
+    monkeypatch.setattr(mood_store, "LEGACY_MOOD_FILE", str(tmp_path / "mood_data.json"))
+    monkeypatch.setattr(mood_store, "_migrated_dirs", set())
+    return tmp_path
+
+
+def _baseline_entry(timestamp, mood_level, notes=""):
+    """An entry as the old global MoodTracker.add_mood_entry wrote it (no user_email)"""
+    ts = datetime.fromisoformat(timestamp)
+    return {"timestamp": timestamp, "mood_level": mood_level, "notes": notes, "context_reason": "",
+            "activities": [], "date": ts.strftime("%Y-%m-%d"), "time": ts.strftime("%H:%M"),
+            "day_of_week": ts.strftime("%A")}
+
+
+def test_legacy_file_is_adopted_by_the_first_signed_in_user(store):
+    legacy = [
+        _baseline_entry("2024-01-01T09:00:00", "good"),
+        _baseline_entry("2024-01-03T09:00:00", "okay"),
+        # The oldest entries predate context_reason and activities
+        {"timestamp": "2024-01-02T09:00:00", "mood_level": "low", "notes": "", "date": "2024-01-02"},
+    ]
+    (store / "mood_data.json").write_text(json.dumps(legacy, indent=2))
+
+    # Signed-out visitors never see the shared history
+    assert mood_store.load_user_moods(None) == []
+    assert not (store / "mood_data.json").exists()
+    assert (store / "mood_data.json.migrated").exists()
+
+    mood_store.append_mood_entry("a@x.com", _baseline_entry("2024-01-04T09:00:00", "great"))
+    assert mood_store.adopt_unattributed_moods("a@x.com") == 3
+    a = mood_store.load_user_moods("a@x.com")
+    assert [e["mood_level"] for e in a] == ["good", "low", "okay", "great"]
+    assert a[1]["context_reason"] == "No specific reason" and a[1]["activities"] == []
+
+    # Only the first user gets them, and the store is not migrated again
+    assert mood_store.adopt_unattributed_moods("b@x.com") == 0
+    (store / "mood_data.json").write_text(json.dumps(legacy))
+    mood_store._migrated_dirs.clear()
+    assert len(mood_store.load_user_moods("a@x.com")) == 4
+    assert mood_store.load_user_moods("b@x.com") == []
+    assert mood_store.list_mood_partitions() == [mood_store.user_mood_path("a@x.com")]
+
+
+def test_tracker_adopts_legacy_history_on_first_load(store):
+    import streamlit as st
+    from components.mood_dashboard import MoodTracker
+
+    (store / "mood_data.json").write_text(json.dumps([_baseline_entry("2024-01-01T09:00:00", "good")]))
+    st.session_state.pop("mood_data", None)
+    MoodTracker("a@x.com")
+    assert [e["mood_level"] for e in st.session_state.mood_data] == ["good"]
+
+
+def test_append_only_touches_one_partition(store):
+    mood_store.append_mood_entry("a@x.com", {"timestamp": "2024-01-01T09:00:00", "mood_level": "good"})
+    mood_store.append_mood_entry("a@x.com", {"timestamp": "2024-01-02T09:00:00", "mood_level": "great"})
+    mood_store.append_mood_entry("b@x.com", {"timestamp": "2024-01-02T10:00:00", "mood_level": "low"})
+
+    # A torn trailing line from an interrupted write is ignored
+    with open(mood_store.user_mood_path("a@x.com"), "a") as f:
+        f.write('{"timestamp": "2024-01-0')
+
+    assert [e["mood_level"] for e in mood_store.load_user_moods("a@x.com")] == ["good", "great"]
+    assert len(mood_store.list_mood_partitions()) == 2
+
+    # ...and the next append starts on a line of its own
+    mood_store.append_mood_entry("a@x.com", {"timestamp": "2024-01-03T09:00:00", "mood_level": "okay"})
+    assert [e["mood_level"] for e in mood_store.load_user_moods("a@x.com")] == ["good", "great", "okay"]
+
+    mood_store.rewrite_user_moods("a@x.com", [])
+    assert mood_store.load_user_moods("a@x.com") == []
+    assert len(mood_store.load_user_moods("b@x.com")) == 1
+    assert not os.path.exists(mood_store.user_mood_path("a@x.com") + ".tmp")
+
+
+def test_tracker_frame_is_typed_and_appended_incrementally(store):
+    from datetime import datetime, timedelta
+
+    import streamlit as st
+    from components.mood_dashboard import MoodTracker
+
+    tracker = MoodTracker("a@x.com")
+    now = datetime.now()
+    tracker.add_mood_entry("good", timestamp=(now - timedelta(days=40)).isoformat())
+    tracker.add_mood_entry("low", timestamp=(now - timedelta(days=2)).isoformat())
+
+    full = tracker.get_full_mood_dataframe()
+    assert str(full["mood_level"].dtype) == "category"
+    assert list(full["mood_numeric"]) == [4, 2]
+
+    # Later entries extend the cached frame, back-dated ones keep it sorted
+    tracker.add_mood_entry("great", timestamp=(now - timedelta(days=1)).isoformat())
+    tracker.add_mood_entry("okay", timestamp=(now - timedelta(days=3)).isoformat())
+    assert tracker.get_full_mood_dataframe() is not full
+    recent = tracker.get_mood_dataframe(7)
+    assert list(recent["mood_level"]) == ["okay", "low", "great"]
+    assert recent.index.is_monotonic_increasing
+
+    # A fresh tracker rebuilt from disk sees the same data
+    del st.session_state["mood_data"]
+    rebuilt = MoodTracker("a@x.com").get_mood_dataframe(7)
+    assert list(rebuilt["mood_numeric"]) == [3, 2, 5]
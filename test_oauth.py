@@ -100,3 +100,73 @@ def test_invalid_state_rejected():
     from auth.oauth_utils import verify_oauth_state
 
     assert verify_oauth_state("invalid-state") is None
+
+
+# -----------------------------
+# Offline Flow Tests (stub provider)
+# -----------------------------
+
+@pytest.fixture
+def stub_provider():
+    """Run a local stub provider and register it as the GitHub provider"""
+    from auth.oauth_config import oauth_config
+    from auth.oauth_stub import StubOAuthProvider
+    from auth import oauth_utils
+    from auth.http_client import reset_http_session
+
+    previous = oauth_config.providers.get("github")
+    reset_http_session()
+    oauth_utils._user_info_cache.clear()
+
+    with StubOAuthProvider() as stub:
+        oauth_config.providers["github"] = stub.as_provider("github")
+        yield stub
+
+    if previous is None:
+        oauth_config.providers.pop("github", None)
+    else:
+        oauth_config.providers["github"] = previous
+    reset_http_session()
+
+
+def test_token_exchange_and_user_info_reuse_connection(stub_provider):
+    """Ensure the flow runs offline over a single pooled keep-alive connection"""
+    from auth.oauth_utils import exchange_code_for_token, get_user_info
+
+    token_data = exchange_code_for_token("github", stub_provider.issue_code())
+    assert token_data["access_token"]
+
+    user = get_user_info("github", token_data["access_token"])
+    assert user["email"] == "stub.user@example.com"
+    assert user["provider_id"] == "4242"
+
+    assert len(stub_provider.connections) == 1
+
+
+def test_user_info_is_cached(stub_provider):
+    """Ensure repeated user-info lookups for one token hit the provider once"""
+    from auth.oauth_utils import exchange_code_for_token, get_user_info
+
+    access_token = exchange_code_for_token("github", stub_provider.issue_code())["access_token"]
+    first = get_user_info("github", access_token)
+    second = get_user_info("github", access_token)
+
+    assert first == second
+    assert stub_provider.request_counts["/userinfo"] == 1
+
+
+def test_github_email_fallback(stub_provider):
+    """Ensure the GitHub emails endpoint is used when the profile has no email"""
+    from auth.oauth_utils import exchange_code_for_token, get_user_info
+
+    stub_provider.user = {**stub_provider.user, "email": None}
+    stub_provider.emails = [
+        {"email": "secondary@example.com", "primary": False, "verified": True},
+        {"email": "primary@example.com", "primary": True, "verified": True},
+    ]
+
+    access_token = exchange_code_for_token("github", stub_provider.issue_code())["access_token"]
+    user = get_user_info("github", access_token)
+
+    assert user["email"] == "primary@example.com"
+    assert stub_provider.request_counts["/user/emails"] == 1
@@ -4,7 +4,7 @@ Tests NIST guidelines compliance and strength calculation
 """
 
 import unittest
-from auth.password_validator import PasswordValidator, get_password_strength, validate_password_strength
+from auth.password_validator import PasswordValidator, get_password_strength, validate_password_strength, validate_passwords
 
 
 class TestPasswordValidator(unittest.TestCase):
@@ -199,6 +199,25 @@ class TestPasswordValidator(unittest.TestCase):
         # Should be valid if it passes other checks
         self.assertIsInstance(is_valid, bool)
 
+    def test_single_pass_scan_matches_pattern_helpers(self):
+        """Test that the single-pass scanner agrees with the individual pattern checks"""
+        samples = ["test12345", "testdcba", "testaceg", "testaaaa", "Testqwerty",
+                   "MyStr0ng!Pass", "ZYXW9876", "a1b2c3d4", "", "!!!", "poiuy#Home"]
+        for pwd in samples:
+            scan = PasswordValidator._scan(pwd)
+            self.assertEqual(scan['sequential'], PasswordValidator._has_sequential_chars(pwd), pwd)
+            self.assertEqual(scan['repeated'], PasswordValidator._has_repeated_chars(pwd), pwd)
+            self.assertEqual(scan['keyboard_pattern'], PasswordValidator._has_keyboard_pattern(pwd), pwd)
+
+    def test_validate_many(self):
+        """Test batch validation keeps input order and matches single validation"""
+        passwords = ["short", "MyStr0ng!Pass", "password", "MyStr0ng!Pass", "qwertyui"]
+        results = PasswordValidator.validate_many(passwords)
+        self.assertEqual(len(results), len(passwords))
+        for pwd, result in zip(passwords, results):
+            self.assertEqual(result, PasswordValidator.validate_password(pwd))
+        self.assertEqual(validate_passwords(iter(passwords)), results)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+from components.physio_correlation import (
+    LAGS,
+    METRICS,
+    correlate_mood_with_physio,
+    lagged_correlations,
+    rolling_correlations,
+)
+
+
+def _data(days=60, seed=5):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2025-03-01", periods=days, freq="D")
+    sleep = rng.normal(420, 45, days)
+    # Mood follows the previous night's sleep
+    mood = 3 + 0.02 * (np.roll(sleep, 1) - 420) + rng.normal(0, 0.3, days)
+    records = [
+        {"period": f"{d.date()}", "hrv_ms": float(h), "resting_hr": 60.0, "sleep_minutes": float(s),
+         "sleep_efficiency": 0.9, "steps": float(st), "active_minutes": 30.0}
+        for d, h, s, st in zip(dates, rng.normal(55, 10, days), sleep, rng.normal(7000, 2000, days))
+    ]
+    mood_df = pd.DataFrame({"date": dates[1:], "mood_numeric": mood[1:]})
+    return mood_df, records
+
+
+def _daily(mood_df, records):
+    wearables = pd.DataFrame(records).assign(date=lambda d: pd.to_datetime(d["period"]))
+    daily = wearables.set_index("date")[METRICS].join(mood_df.set_index("date"), how="outer")
+    daily.loc[daily.index[::9], "hrv_ms"] = np.nan  # gaps are skipped pairwise
+    return daily
+
+
+def test_lag_matrix_and_rolling_match_pandas():
+    daily = _daily(*_data())
+    matrix = lagged_correlations(daily)
+    assert list(matrix.columns) == LAGS and list(matrix.index) == METRICS
+    for metric in ("hrv_ms", "sleep_minutes", "steps"):
+        for lag in LAGS:
+            expected = daily[metric].corr(daily["mood_numeric"].shift(-lag))
+            assert np.isclose(matrix.at[metric, lag], expected)
+    # Constant metrics have no correlation
+    assert matrix.loc["resting_hr"].isna().all()
+    assert matrix.loc["sleep_minutes"].abs().idxmax() == 1
+
+    rolling = rolling_correlations(daily, window=14)
+    expected = daily["hrv_ms"].rolling(14, min_periods=7).corr(daily["mood_numeric"])
+    assert np.allclose(rolling["hrv_ms"], expected, equal_nan=True)
+
+
+def test_lag_insight_and_cached_results():
+    mood_df, records = _data()
+    results = correlate_mood_with_physio(mood_df, records, cache_key=("a@x.com", (1, 1), (2, 2)))
+    assert any("1 day later" in insight for insight in results["insights"])
+    assert len(results["charts"]) == 3
+
+    cached = correlate_mood_with_physio(pd.DataFrame(), [], cache_key=("a@x.com", (1, 1), (2, 2)))
+    assert cached["insights"] == results["insights"]
+    assert cached["lagged"].equals(results["lagged"])
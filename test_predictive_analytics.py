@@ -0,0 +1,65 @@
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from components import predictive_analytics as pa
+from components.fast_forecast import forecast_ets
+
+needs_arima = pytest.mark.skipif(not pa.ARIMA_AVAILABLE, reason="statsmodels not installed")
+
+
+@pytest.fixture
+def series():
+    pa._model_cache.clear()
+    rng = np.random.default_rng(0)
+    index = pd.date_range("2024-01-01", periods=45, freq="D")
+    return pd.Series(np.clip(3 + np.sin(np.arange(45) / 3) + rng.normal(0, 0.5, 45), 1, 5), index=index)
+
+
+@needs_arima
+def test_cached_model_is_reused_and_updated_without_refitting(series):
+    first = pa.forecast_arima(series[:40], 7, model_key="a@x.com")
+
+    with mock.patch.object(pa, "_load_statsmodels", side_effect=AssertionError("refit")):
+        # Unchanged data: the same result object comes straight from the cache
+        assert pa.forecast_arima(series[:40], 7, model_key="a@x.com") is first
+        # New days are appended, revised or shifted windows re-filtered
+        appended = pa.forecast_arima(series[:42], 7, model_key="a@x.com")
+        shifted = pa.forecast_arima(series[2:43], 7, model_key="a@x.com")
+
+    assert len(appended["forecast"]) == 7 and appended["forecast"].index[0] == series.index[42]
+    assert shifted["confidence_intervals"].shape == (7, 2)
+
+    # Close to what a full refit on the same data gives
+    refit = pa.forecast_arima(series[:42], 7)
+    assert np.abs(appended["forecast"].values - refit["forecast"].values).max() < 0.1
+
+
+@needs_arima
+def test_full_refit_after_enough_updates(series):
+    pa.forecast_arima(series[:20], 7, model_key="b@x.com")
+    with mock.patch.object(pa, "_load_statsmodels", wraps=pa._load_statsmodels) as load:
+        pa.forecast_arima(series[:20 + pa.REFIT_EVERY + 1], 7, model_key="b@x.com")
+    assert load.call_count == 1
+
+
+def test_ets_follows_weekly_pattern_with_widening_intervals():
+    index = pd.date_range("2024-01-01", periods=56, freq="D")
+    weekly = np.array([2.0, 3, 3, 3.5, 4, 4.5, 2.5])
+    series = pd.Series(np.tile(weekly, 8), index=index).drop(index[[10, 30]])  # days without entries
+
+    result = forecast_ets(series, 14)
+    assert result["model_type"].startswith("Holt-Winters")
+    assert np.abs(result["forecast"].to_numpy() - np.tile(weekly, 2)).max() < 0.3
+    widths = np.diff(result["confidence_intervals"], axis=1).ravel()
+    assert (result["confidence_intervals"][:, 0] <= result["forecast"].to_numpy()).all()
+    assert widths[-1] >= widths[0]
+
+
+def test_predict_mood_trends_uses_ets_by_default(series):
+    mood_log = pd.DataFrame({"timestamp": series.index, "mood_score": series.values})
+    result = pa.predict_mood_trends(mood_log, forecast_days=7)
+    assert result["model_info"].startswith("Using Holt")
+    assert len(result["forecast"]) == 7
@@ -0,0 +1,69 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from auth import session_tokens
+
+
+class TestSessionTokens(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.original_db = session_tokens.SESSION_DB
+        session_tokens.SESSION_DB = os.path.join(self.tmpdir.name, "users.db")
+        session_tokens._revocation_checks.clear()
+        session_tokens._verified.clear()
+
+    def tearDown(self):
+        session_tokens.SESSION_DB = self.original_db
+        session_tokens._revocation_checks.clear()
+        session_tokens._verified.clear()
+        self.tmpdir.cleanup()
+
+    def test_issue_and_verify(self):
+        profile = {"name": "Test User", "font_size": "Medium"}
+        token = session_tokens.issue_session_token("test@example.com", profile)
+        payload = session_tokens.verify_session_token(token)
+        self.assertEqual(payload["sub"], "test@example.com")
+        self.assertEqual(payload["prf"], profile)
+        # Second verification is served from the cache
+        self.assertEqual(session_tokens.verify_session_token(token), payload)
+
+    def test_tampered_token_rejected(self):
+        token = session_tokens.issue_session_token("test@example.com", {})
+        version, body, signature = token.split(".")
+        forged = session_tokens._b64encode(b'{"jti":"x","sub":"admin@example.com","iat":0,"exp":9999999999,"prf":{}}')
+        self.assertIsNone(session_tokens.verify_session_token(f"{version}.{forged}.{signature}"))
+        self.assertIsNone(session_tokens.verify_session_token('{"email": "test@example.com"}'))
+        self.assertIsNone(session_tokens.verify_session_token(None))
+
+    def test_expired_token_rejected(self):
+        token = session_tokens.issue_session_token("test@example.com", {}, ttl_seconds=-1)
+        self.assertIsNone(session_tokens.verify_session_token(token))
+
+    def test_revoked_token_rejected(self):
+        token = session_tokens.issue_session_token("test@example.com", {})
+        self.assertIsNotNone(session_tokens.verify_session_token(token))
+        self.assertTrue(session_tokens.revoke_session_token(token))
+        self.assertIsNone(session_tokens.verify_session_token(token))
+
+        # Revocations survive a reload of the in-memory list
+        session_tokens._revocation_checks.clear()
+        self.assertIsNone(session_tokens.verify_session_token(token))
+
+    def test_revocation_in_another_process_is_seen(self):
+        token = session_tokens.issue_session_token("test@example.com", {})
+        self.assertIsNotNone(session_tokens.verify_session_token(token))
+
+        # Another worker revokes the token: it only writes the shared table
+        payload = session_tokens.verify_session_token(token)
+        with sqlite3.connect(session_tokens.SESSION_DB) as conn:
+            conn.execute("INSERT INTO revoked_sessions (jti, expires_at) VALUES (?, ?)",
+                         (payload["jti"], payload["exp"]))
+        # Seen once this process's cached answer expires (REVOCATION_RECHECK_SECONDS)
+        session_tokens._revocation_checks.pop(payload["jti"])
+        self.assertIsNone(session_tokens.verify_session_token(token))
+
+
+if __name__ == "__main__":
+    unittest.main()
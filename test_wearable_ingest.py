@@ -0,0 +1,48 @@
+import io
+
+import pandas as pd
+import pytest
+
+from core import wearable_store
+from core.wearable_ingest import import_wearable_csv, map_columns, normalize_timestamps
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(wearable_store, "WEARABLE_DIR", str(tmp_path / "wearables"))
+    wearable_store.set_consent("a@x.com", True)
+
+
+def test_map_columns_accepts_common_spellings():
+    assert map_columns(["Timestamp", "HRV_ms", "Resting HR", "steps", "notes"]) == {
+        "Timestamp": "timestamp", "HRV_ms": "hrv_ms", "Resting HR": "resting_hr", "steps": "steps"}
+    with pytest.raises(ValueError):
+        map_columns(["steps"])
+
+
+def test_timestamps_match_per_record_normalization():
+    values = pd.Series(["2025-01-01 07:00:00", "2025-01-01T07:00:00.250000", "2025-01-02", "bad"])
+    text, valid = normalize_timestamps(values)
+    assert list(valid) == [True, True, True, False]
+    assert list(text[valid]) == [wearable_store._normalize_timestamp(v) for v in values[:3]]
+
+    for series in (pd.Series(["2025-01-01T07:00:00Z"]), pd.Series(["2025-01-01T07:00:00.5+02:00", "2025-01-02T23:00:00+02:00"]),
+                   pd.Series(["2025-01-01T07:00:00+02:00", "2025-01-01T07:00:00-05:00"])):
+        text, valid = normalize_timestamps(series)
+        assert valid.all() and list(text) == [wearable_store._normalize_timestamp(v) for v in series]
+
+
+def test_import_in_chunks_upserts_and_skips_bad_rows(store):
+    csv = "Timestamp,hrv_ms,Steps,notes\n" + "".join(
+        f"2025-01-01T{h:02d}:00:00,{50 + h},{'' if h == 3 else h * 100},x\n" for h in range(10)) + "oops,1,2,x\n"
+
+    assert import_wearable_csv("a@x.com", io.StringIO(csv), "oura", chunksize=4) == (10, 1)
+    records = wearable_store.load_wearable_records("a@x.com")
+    assert len(records) == 10 and records[3]["steps"] is None and records[9]["hrv_ms"] == 59
+    assert {r["provider"] for r in records} == {"oura"}
+    assert "oura" in wearable_store.load_wearable_metadata("a@x.com")["providers"]
+
+    # Re-importing the same export updates rows in place
+    import_wearable_csv("a@x.com", io.StringIO(csv.replace(",50,", ",70,")), "oura", chunksize=4)
+    records = wearable_store.load_wearable_records("a@x.com")
+    assert len(records) == 10 and records[0]["hrv_ms"] == 70
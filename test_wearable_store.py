@@ -0,0 +1,121 @@
+import json
+import os
+import sqlite3
+
+import numpy as np
+import pytest
+
+from core import wearable_store
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(wearable_store, "WEARABLE_DIR", str(tmp_path / "wearables"))
+    return tmp_path / "wearables"
+
+
+def test_legacy_json_is_imported_once(store):
+    os.makedirs(store)
+    legacy = {
+        "consent": True,
+        "providers": {"oura": {"connected": True}},
+        "goals": {"steps": {"target": 8000, "frequency": "daily"}},
+        "records": [
+            {"timestamp": "2025-01-02T07:00:00", "provider": "oura", "hrv_ms": 50.5, "steps": 7000},
+            {"timestamp": "2025-01-01T07:00:00", "provider": "oura", "hrv_ms": 48.0, "steps": None},
+        ],
+    }
+    (store / "wearables_a_at_x_dot_com.json").write_text(json.dumps(legacy))
+
+    data = wearable_store.load_user_wearables("a@x.com")
+    assert data["consent"] is True and data["goals"] == legacy["goals"]
+    assert [r["timestamp"] for r in data["records"]] == ["2025-01-01T07:00:00", "2025-01-02T07:00:00"]
+    assert data["records"][1]["steps"] == 7000 and data["records"][0]["steps"] is None
+    assert (store / "wearables_a_at_x_dot_com.json.migrated").exists()
+    assert wearable_store.load_user_wearables("a@x.com") == data
+
+    # Deleting the user's data removes the migrated backup too
+    wearable_store.clear_user_wearables("a@x.com")
+    assert os.listdir(store) == []
+
+
+def test_upserts_merge_on_timestamp_and_provider(store):
+    with pytest.raises(PermissionError):
+        wearable_store.append_records("b@x.com", [{"timestamp": "2025-01-01T07:00:00"}], "fitbit")
+    wearable_store.set_consent("b@x.com", True)
+
+    first = [{"timestamp": f"2025-01-{d:02d}T07:00:00Z", "hrv_ms": 40.0 + d, "steps": np.int64(5000)} for d in range(1, 11)]
+    assert wearable_store.append_records("b@x.com", first, "fitbit") == 10
+    version = wearable_store.wearable_data_version("b@x.com")
+
+    # Same keys again: missing and NaN values keep what is stored, others overwrite
+    update = [{"timestamp": "2025-01-03T07:00:00+00:00", "hrv_ms": float("nan"), "steps": 9000},
+              {"timestamp": "2025-01-03T07:00:00+00:00", "resting_hr": 61}]
+    wearable_store.append_records("b@x.com", update, "fitbit")
+    wearable_store.append_records("b@x.com", [{"timestamp": "2025-01-03T07:00:00Z", "steps": 1}], "oura")
+
+    records = wearable_store.load_wearable_records("b@x.com")
+    assert len(records) == 11
+    day3 = [r for r in records if r["timestamp"].startswith("2025-01-03") and r["provider"] == "fitbit"]
+    assert day3 == [{"timestamp": "2025-01-03T07:00:00+00:00", "provider": "fitbit", "hrv_ms": 43.0,
+                     "resting_hr": 61, "sleep_minutes": None, "sleep_efficiency": None, "steps": 9000,
+                     "active_minutes": None}]
+    assert wearable_store.wearable_data_version("b@x.com") > version
+
+    window = wearable_store.load_wearable_records("b@x.com", start="2025-01-05", end="2025-01-07")
+    assert [r["timestamp"][:10] for r in window] == ["2025-01-05", "2025-01-06"]
+    assert set(wearable_store.load_wearable_metadata("b@x.com")["providers"]) == {"fitbit", "oura"}
+
+
+def test_metadata_updates_leave_records_alone(store):
+    wearable_store.set_consent("c@x.com", True)
+    wearable_store.append_records("c@x.com", [{"timestamp": "2025-01-01T07:00:00", "steps": 10}], "oura")
+    wearable_store.set_goals("c@x.com", {"steps": {"target": 9000}})
+    meta = wearable_store.set_provider_connection("c@x.com", "oura", True)
+    assert meta["providers"]["oura"] == {"connected": True} and "records" not in meta
+    assert wearable_store.load_user_wearables("c@x.com")["records"][0]["steps"] == 10
+
+    wearable_store.clear_user_wearables("c@x.com")
+    assert wearable_store.load_user_wearables("c@x.com") == {"consent": False, "providers": {}, "records": []}
+    assert wearable_store.wearable_data_version("c@x.com") == 0
+
+
+def test_rollup_tiers_follow_upserts_and_outlive_raw_retention(store):
+    wearable_store.set_consent("d@x.com", True)
+    # Two providers, three readings an hour over two days
+    rows = [{"timestamp": f"2025-02-0{d}T{h:02d}:{m:02d}:00", "hrv_ms": 40.0 + h, "steps": 10 * m}
+            for d in (1, 2) for h in range(24) for m in (0, 20, 40)]
+    wearable_store.append_records("d@x.com", rows, "fitbit")
+    wearable_store.append_records("d@x.com", [{"timestamp": "2025-02-01T05:30:00", "hrv_ms": 100.0, "steps": 7}], "oura")
+
+    hourly = wearable_store.load_wearable_rollup("d@x.com", "hourly", start="2025-02-01T05", end="2025-02-01T07")
+    assert [r["period"] for r in hourly] == ["2025-02-01T05:00:00", "2025-02-01T06:00:00"]
+    assert hourly[0]["hrv_ms"] == pytest.approx((45 * 3 + 100) / 4) and hourly[0]["steps"] == 607
+    assert hourly[0]["sleep_minutes"] is None
+
+    daily = wearable_store.load_wearable_rollup("d@x.com", "daily")
+    assert [r["period"] for r in daily] == ["2025-02-01", "2025-02-02"]
+    assert daily[1]["steps"] == 24 * 600 and daily[1]["hrv_ms"] == pytest.approx(51.5)
+
+    # An upsert replaces the reading in its hour and day instead of adding to them
+    wearable_store.append_records("d@x.com", [{"timestamp": "2025-02-02T00:00:00", "steps": 1000}], "fitbit")
+    assert wearable_store.load_wearable_rollup("d@x.com", "daily", start="2025-02-02")[0]["steps"] == 24 * 600 + 1000
+
+    meta = wearable_store.set_raw_retention("d@x.com", 30)
+    assert meta["raw_retention_days"] == 30 and "rollup_version" not in meta
+    assert wearable_store.load_wearable_records("d@x.com") == []
+    assert wearable_store.load_wearable_rollup("d@x.com", "daily") == daily[:1] + [dict(daily[1], steps=24 * 600 + 1000)]
+
+
+def test_rollups_are_built_for_existing_stores(store):
+    wearable_store.set_consent("e@x.com", True)
+    wearable_store.append_records("e@x.com", [{"timestamp": "2025-01-01T07:00:00", "steps": 10}], "oura")
+    path = wearable_store.user_wearable_path("e@x.com")
+    with sqlite3.connect(path) as conn:
+        conn.execute("DELETE FROM rollup_hourly")
+        conn.execute("DELETE FROM rollup_daily")
+        conn.execute("DELETE FROM meta WHERE key = 'rollup_version'")
+    wearable_store._initialized_paths.discard(path)
+    assert wearable_store.load_wearable_rollup("e@x.com") == [
+        {"period": "2025-01-01", "hrv_ms": None, "resting_hr": None, "sleep_minutes": None,
+         "sleep_efficiency": None, "steps": 10, "active_minutes": None}]
@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from components.weather_correlation import FixtureWeatherProvider, analyze_weather_mood_correlation, get_weather_data
+from core import weather_cache
+from core.mood_store import MOOD_LEVELS
+
+NOW = datetime(2025, 6, 30, 12)
+
+
+@pytest.fixture
+def provider(tmp_path, monkeypatch):
+    monkeypatch.setattr(weather_cache, "WEATHER_DIR", str(tmp_path / "weather"))
+    return FixtureWeatherProvider.synthetic(datetime(2025, 1, 1), datetime(2025, 6, 30), seed=4)
+
+
+def test_only_missing_days_are_fetched(provider):
+    first = weather_cache.cached_weather(40.71, -74.01, datetime(2025, 3, 1), datetime(2025, 3, 31), provider, NOW)
+    assert len(first) == 31 and len(provider.calls) == 1
+
+    # A nearby location in the same grid cell, overlapping on both sides
+    second = weather_cache.cached_weather(40.73, -73.99, datetime(2025, 2, 20), datetime(2025, 4, 5), provider, NOW)
+    assert provider.calls[1:] == [(datetime(2025, 2, 20), datetime(2025, 2, 28)),
+                                  (datetime(2025, 4, 1), datetime(2025, 4, 5))]
+    assert len(second) == 45
+    assert second.set_index("time").loc["2025-03-01":"2025-03-31"].equals(first.set_index("time"))
+
+    weather_cache.cached_weather(40.71, -74.01, datetime(2025, 2, 20), datetime(2025, 4, 5), provider, NOW)
+    assert len(provider.calls) == 3
+
+
+def test_recent_days_expire(provider):
+    start = NOW - timedelta(days=20)
+    weather_cache.cached_weather(40.71, -74.01, start, NOW, provider, NOW)
+    later = NOW + timedelta(seconds=weather_cache.RECENT_TTL_SECONDS + 1)
+    weather_cache.cached_weather(40.71, -74.01, start, NOW, provider, later)
+    # Only the days that were still recent when fetched are refetched
+    assert provider.calls[1] == (datetime(2025, 6, 24), datetime(2025, 6, 30))
+
+
+def test_weather_mood_analysis_runs_offline(provider):
+    rng = np.random.default_rng(0)
+    weather = get_weather_data(40.71, -74.01, datetime(2025, 4, 1), datetime(2025, 6, 29), provider=provider)
+    warm_days = weather["time"][weather["temp_avg"] > weather["temp_avg"].median()]
+    mood = pd.DataFrame({
+        "timestamp": weather["time"] + pd.Timedelta(hours=9),
+        "mood_level": np.where(weather["time"].isin(warm_days), "great", "low"),
+    })
+    mood.loc[rng.random(len(mood)) < 0.1, "mood_level"] = MOOD_LEVELS[2]
+    results = analyze_weather_mood_correlation(mood, weather)
+    assert results["data_points"] == 90
+    assert results["correlations"]["temp_avg"] > 0.5
+    assert any("better" in insight for insight in results["insights"])
+
+
+def test_fixture_file_is_parsed_once(provider, tmp_path, monkeypatch):
+    from components import weather_correlation
+
+    path = tmp_path / "weather.csv"
+    provider.frame.reset_index().to_csv(path, index=False)
+    monkeypatch.setattr(weather_correlation, "WEATHER_FIXTURE", str(path))
+    weather_correlation._fixture_provider.cache_clear()
+    first = weather_correlation.default_weather_provider()
+    assert weather_correlation.default_weather_provider() is first
+    weather_correlation._fixture_provider.cache_clear()
+
+    # A missing fixture disables weather instead of raising on every render
+    monkeypatch.setattr(weather_correlation, "WEATHER_FIXTURE", str(tmp_path / "missing.csv"))
+    assert weather_correlation.default_weather_provider() is None
+
+
+def test_fixture_days_are_not_cached_as_real_weather(provider):
+    get_weather_data(40.71, -74.01, datetime(2025, 3, 1), datetime(2025, 3, 31), provider=provider)
+    cell = weather_cache.grid_cell(40.71, -74.01)
+    assert weather_cache._load(weather_cache.weather_cache_path(cell, "fixture"))
+    assert weather_cache._load(weather_cache.weather_cache_path(cell, "meteostat")) == {}